@@ -0,0 +1,245 @@
+import bisect
+import threading
+
+# Bucket default histogram: durasi (detik) dan ukuran (byte/karakter)
+TIME_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join('{0}="{1}"'.format(name, value) for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), fn=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Mengembalikan metrik anak untuk kombinasi nilai label tertentu.
+
+        Parameters:
+        *values (str): Nilai label sesuai urutan `labelnames`.
+
+        Returns:
+        _Metric: Metrik anak.
+
+        Raises:
+        ValueError: Jika jumlah nilai label tidak sesuai.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError('Expected {0} label values for {1}'.format(len(self.labelnames), self.name))
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        if self.fn is not None:
+            # Nilai dibaca saat render: angka, atau dict {tuple nilai label: angka}
+            value = self.fn()
+            if not isinstance(value, dict):
+                value = {(): value}
+            samples = []
+            for values, number in value.items():
+                child = _Value()
+                child.value = number
+                samples.append((tuple(str(item) for item in values), child))
+            return samples
+        if not self.labelnames:
+            return [((), self.labels())]
+        return list(self._children.items())
+
+    def render(self):
+        lines = [
+            '# HELP {0} {1}'.format(self.name, self.documentation),
+            '# TYPE {0} {1}'.format(self.name, self.kind),
+        ]
+        for values, child in self._samples():
+            lines.extend(child._render(self.name, self.labelnames, values))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+    def _render(self, name, labelnames, values):
+        return ['{0}{1} {2}'.format(name, _format_labels(labelnames, values), _format_value(self.value))]
+
+
+class Counter(_Metric):
+    """
+    Counter yang hanya bertambah (misalnya jumlah pesan). Jika `fn` diberikan, nilai dibaca dari `fn()`
+    saat metrik dirender (untuk counter yang sudah dihitung di tempat lain).
+    """
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        """
+        Menambah counter tanpa label.
+        """
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """
+    Nilai yang bisa naik turun. Jika `fn` diberikan, nilai dibaca dari `fn()` saat metrik dirender;
+    `fn` dapat mengembalikan angka, atau dict {tuple nilai label: angka} untuk gauge berlabel.
+    """
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        """
+        Mengatur nilai gauge tanpa label.
+        """
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def _render(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            lines.append('{0}_bucket{1} {2}'.format(
+                name, _format_labels(labelnames, values, ('le', _format_value(float(bound)))), cumulative))
+        labels = _format_labels(labelnames, values)
+        lines.append('{0}_sum{1} {2}'.format(name, labels, repr(self.sum)))
+        lines.append('{0}_count{1} {2}'.format(name, labels, cumulative))
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Histogram dengan bucket tetap (misalnya durasi atau ukuran payload).
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        """
+        Mencatat satu nilai pada histogram tanpa label.
+        """
+        self.labels().observe(value)
+
+
+class Registry:
+    """
+    Kumpulan metrik yang dirender dalam format teks Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError('Duplicate metric: {0}'.format(metric.name))
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=(), fn=None):
+        return self._add(Counter(name, documentation, labelnames, fn))
+
+    def gauge(self, name, documentation, labelnames=(), fn=None):
+        return self._add(Gauge(name, documentation, labelnames, fn))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """
+        Merender semua metrik.
+
+        Returns:
+        str: Metrik dalam format teks Prometheus.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def instrument_zwsp(registry, zwsp_module):
+    """
+    Mendaftarkan histogram waktu dan ukuran encode/decode ZWSP, lalu memasang timing hook di modul `zwsp`.
+
+    Parameters:
+    registry (Registry): Registry tujuan.
+    zwsp_module (module): Modul `zwsp`.
+
+    Returns:
+    None
+    """
+    names = {mode: name for name, mode in zwsp_module.MODE_NAMES.items()}
+    seconds = registry.histogram(
+        'zwsp_codec_seconds', 'Waktu encode/decode ZWSP.', ('operation', 'mode'))
+    sizes = registry.histogram(
+        'zwsp_codec_input_chars', 'Panjang input encode/decode ZWSP (karakter).', ('operation', 'mode'),
+        buckets=SIZE_BUCKETS)
+
+    def hook(operation, mode, elapsed, input_len, output_len):
+        label = names.get(mode, str(mode))
+        seconds.labels(operation, label).observe(elapsed)
+        sizes.labels(operation, label).observe(input_len)
+
+    zwsp_module.set_timing_hook(hook)
@@ -0,0 +1,135 @@
+import collections
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class StartupTimer:
+    """
+    Mencatat durasi setiap tahap startup service: import modul (`import:*`), inisialisasi objek saat
+    import (`init:*`), dan backend yang dijalankan di lifespan atau saat pertama kali dipakai (`start:*`).
+    """
+
+    def __init__(self):
+        """
+        Inisialisasi objek StartupTimer. Waktu mulai dicatat saat objek dibuat, sehingga objek sebaiknya
+        dibuat sebelum import modul lain.
+        """
+        self.created = time.perf_counter()
+        self.phases = collections.OrderedDict()
+        self.ready = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Context manager yang mencatat durasi satu tahap startup.
+
+        Parameters:
+        name (str): Nama tahap, misalnya `import:fastapi` atau `start:mqtt`.
+
+        Yields:
+        None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def mark_ready(self, service: str):
+        """
+        Mencatat waktu service siap melayani request dan menulis ringkasan tahap startup ke log.
+
+        Parameters:
+        service (str): Nama service untuk log.
+
+        Returns:
+        float: Waktu sejak StartupTimer dibuat sampai siap (detik).
+        """
+        self.ready = time.perf_counter() - self.created
+        logger.info('%s ready in %.1f ms (%s)', service, self.ready * 1000,
+                    ', '.join('{0} {1:.1f} ms'.format(name, seconds * 1000) for name, seconds in self.phases.items()))
+        return self.ready
+
+    def stats(self):
+        """
+        Mengembalikan durasi startup.
+
+        Returns:
+        dict: Waktu sampai siap (detik, None jika lifespan belum berjalan) dan durasi setiap tahap (detik).
+        """
+        return {'ready_seconds': self.ready, 'phases': dict(self.phases)}
+
+    def register_metrics(self, registry):
+        """
+        Mendaftarkan durasi startup ke registry `/metrics`.
+
+        Parameters:
+        registry (Registry): Registry tujuan.
+
+        Returns:
+        None
+        """
+        registry.gauge('startup_phase_seconds', 'Durasi setiap tahap startup (import, inisialisasi, lifespan).',
+                       ('phase',), fn=lambda: {(name,): seconds for name, seconds in self.phases.items()})
+        registry.gauge('startup_ready_seconds', 'Waktu dari import modul aplikasi sampai siap melayani request.',
+                       fn=lambda: -1 if self.ready is None else self.ready)
+
+
+class Lazy:
+    """
+    Objek yang dibuat pada pemakaian pertama (misalnya client MQTT), sehingga import modul aplikasi tidak
+    mengimport atau menginisialisasi backend yang berat. Pembuatan objek dicatat sebagai tahap `start:<nama>`.
+    """
+
+    def __init__(self, name: str, factory, timer: StartupTimer = None):
+        """
+        Inisialisasi objek Lazy.
+
+        Parameters:
+        name (str): Nama objek untuk pencatatan waktu.
+        factory (Callable[[], Any]): Fungsi pembuat objek.
+        timer (StartupTimer): Pencatat waktu startup (opsional).
+        """
+        self.name = name
+        self._factory = factory
+        self._timer = timer
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Mengembalikan objek, membuatnya terlebih dahulu jika belum ada.
+
+        Returns:
+        Any: Objek hasil factory.
+        """
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    timer = self._timer.phase('start:' + self.name) if self._timer is not None else contextlib.nullcontext()
+                    with timer:
+                        self._value = self._factory()
+        return self._value
+
+    def set(self, value):
+        """
+        Mengganti objek tanpa memanggil factory (misalnya client tiruan pada benchmark).
+
+        Parameters:
+        value (Any): Objek pengganti.
+
+        Returns:
+        None
+        """
+        self._value = value
+
+    @property
+    def created(self):
+        """
+        True jika objek sudah dibuat.
+        """
+        return self._value is not None
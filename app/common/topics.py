@@ -0,0 +1,38 @@
+import os
+
+
+def subscription(topic: str = 'zwsp', shared_group: str = None):
+    """
+    Membentuk filter subscription MQTT receiver: `<topic>/#` mencakup topik dasar dan semua shard dari
+    sender (lihat `app.sender.topics.TopicRouter`). Dengan `shared_group`, subscription menjadi shared
+    subscription MQTT v5 (`$share/<group>/<topic>/#`) sehingga broker membagi pesan di antara semua
+    receiver dalam grup.
+
+    Parameters:
+    topic (str): Topik dasar.
+    shared_group (str): Nama grup shared subscription (opsional).
+
+    Returns:
+    str: Filter subscription.
+
+    Raises:
+    ValueError: Jika topik atau nama grup tidak valid.
+    """
+    if not topic or '+' in topic or '#' in topic:
+        raise ValueError('Invalid MQTT topic: {0!r}'.format(topic))
+    if shared_group is not None and (not shared_group or any(char in shared_group for char in '/+#')):
+        raise ValueError('Invalid MQTT shared subscription group: {0!r}'.format(shared_group))
+    filter_ = '{0}/#'.format(topic)
+    if shared_group:
+        filter_ = '$share/{0}/{1}'.format(shared_group, filter_)
+    return filter_
+
+
+def subscription_from_env():
+    """
+    Membentuk filter subscription MQTT dari variabel environment `MQTT_TOPIC` dan `MQTT_SHARED_GROUP`.
+
+    Returns:
+    str: Filter subscription.
+    """
+    return subscription(os.getenv("MQTT_TOPIC") or "zwsp", os.getenv("MQTT_SHARED_GROUP") or None)
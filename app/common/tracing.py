@@ -0,0 +1,255 @@
+import collections
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+# Nama user property MQTT v5 untuk metadata trace; payload (teks carrier) tidak diubah sama sekali
+PROP_SOURCE = 'zwsp-src'
+PROP_SEQ = 'zwsp-seq'
+PROP_TS = 'zwsp-ts'
+
+# Tahap latensi yang dicatat receiver (detik):
+# - transit: publish di sender sampai pesan diterima receiver (jam kedua host harus sinkron)
+# - queue: pesan diterima sampai decode dimulai (menunggu batch dan slot decode executor)
+# - decode: decode ZWSP
+# - fanout: membentuk data, serialisasi, dan memasukkan frame ke antrean semua client WebSocket
+# - delivery: frame masuk antrean client sampai terkirim ke socket (dicatat per frame, semua pesan)
+# - end_to_end: publish di sender sampai fan-out selesai
+STAGES = ('transit', 'queue', 'decode', 'fanout', 'delivery', 'end_to_end')
+QUANTILES = (0.5, 0.99)
+
+
+class Trace(collections.namedtuple('Trace', 'source topic seq sent_ns received_ns received')):
+    """
+    Metadata trace satu pesan: sumber, topik, nomor urut, waktu publish di sender (ns sejak epoch),
+    serta waktu diterima receiver (ns sejak epoch dan `time.perf_counter()`).
+    """
+    __slots__ = ()
+
+
+class TraceStamper:
+    """
+    Membuat user property trace untuk setiap pesan yang dipublish sender. Nomor urut dihitung per topik,
+    sehingga receiver yang hanya menerima sebagian shard tetap dapat mendeteksi pesan yang hilang.
+    """
+
+    def __init__(self, source: str = None):
+        """
+        Inisialisasi objek TraceStamper.
+
+        Parameters:
+        source (str): ID sender; default-nya `<hostname>-<pid>`, sehingga restart sender memulai urutan baru.
+        """
+        self.source = source or '{0}-{1}'.format(socket.gethostname(), os.getpid())
+        self._seq = {}
+
+    def properties(self, topic: str):
+        """
+        Membuat user property trace untuk pesan berikutnya pada topik tertentu.
+
+        Parameters:
+        topic (str): Topik MQTT tujuan.
+
+        Returns:
+        list[tuple[str, str]]: Pasangan (nama, nilai) user property.
+        """
+        seq = self._seq.get(topic, 0) + 1
+        self._seq[topic] = seq
+        return [(PROP_SOURCE, self.source), (PROP_SEQ, str(seq)), (PROP_TS, str(time.time_ns()))]
+
+
+def parse(properties, topic: str):
+    """
+    Mengambil metadata trace dari properti pesan MQTT dan mencatat waktu diterima.
+
+    Parameters:
+    properties (dict): Properti pesan dari client MQTT; `user_property` berisi pasangan (nama, nilai).
+    topic (str): Topik pesan.
+
+    Returns:
+    Trace | None: Metadata trace, atau None jika pesan tidak membawa trace.
+    """
+    received_ns, received = time.time_ns(), time.perf_counter()
+    pairs = properties.get('user_property') if isinstance(properties, dict) else None
+    if not pairs:
+        return None
+    if isinstance(pairs[0], str):
+        pairs = [pairs]
+    values = dict(pair for pair in pairs if len(pair) == 2)
+    try:
+        return Trace(values[PROP_SOURCE], topic, int(values[PROP_SEQ]), int(values[PROP_TS]), received_ns, received)
+    except (KeyError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """
+    Mencatat latensi per tahap untuk pesan yang membawa trace dan mendeteksi celah nomor urut.
+
+    Setiap tahap menyimpan `window` sampel terakhir, sehingga persentil mencerminkan trafik terbaru dan
+    memori tetap terbatas. Nomor urut diperiksa per (sumber, topik): nomor yang melompat dihitung sebagai
+    pesan hilang (`gaps`), nomor yang mundur atau berulang dihitung sebagai `out_of_order`.
+    """
+
+    def __init__(self, window: int = 4096):
+        """
+        Inisialisasi objek LatencyTracker.
+
+        Parameters:
+        window (int): Jumlah sampel terakhir yang disimpan per tahap.
+
+        Raises:
+        ValueError: Jika `window` < 1.
+        """
+        if window < 1:
+            raise ValueError('window must be at least 1')
+        self.window = window
+        self._samples = {stage: collections.deque(maxlen=window) for stage in STAGES}
+        self._last_seq = {}
+        self.traced = 0
+        self.gaps = 0
+        self.out_of_order = 0
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Mencatat satu sampel latensi.
+
+        Parameters:
+        stage (str): Nama tahap (lihat `STAGES`).
+        seconds (float): Latensi dalam detik.
+
+        Returns:
+        None
+        """
+        self._samples[stage].append(seconds)
+
+    def _check_sequence(self, trace: Trace):
+        key = (trace.source, trace.topic)
+        last = self._last_seq.get(key)
+        if last is not None and trace.seq <= last:
+            self.out_of_order += 1
+            return
+        if last is not None and trace.seq > last + 1:
+            missing = trace.seq - last - 1
+            self.gaps += missing
+            logger.warning('Sequence gap on %s from %s: %d message(s) missing before #%d',
+                           trace.topic, trace.source, missing, trace.seq)
+        self._last_seq[key] = trace.seq
+
+    def record(self, trace: Trace, decode_start: float, decode_end: float, fanout_end: float):
+        """
+        Mencatat latensi semua tahap satu pesan. Waktu tahap berasal dari `time.perf_counter()`.
+
+        Parameters:
+        trace (Trace): Metadata trace pesan.
+        decode_start (float): Waktu decode dimulai.
+        decode_end (float): Waktu decode selesai.
+        fanout_end (float): Waktu fan-out ke antrean WebSocket selesai.
+
+        Returns:
+        None
+        """
+        self.traced += 1
+        self._check_sequence(trace)
+        transit = (trace.received_ns - trace.sent_ns) / 1e9
+        samples = self._samples
+        samples['transit'].append(transit)
+        samples['queue'].append(decode_start - trace.received)
+        samples['decode'].append(decode_end - decode_start)
+        samples['fanout'].append(fanout_end - decode_end)
+        samples['end_to_end'].append(transit + fanout_end - trace.received)
+
+    def percentiles(self, stage: str, quantiles=QUANTILES):
+        """
+        Menghitung persentil (nearest-rank) latensi satu tahap dari sampel terakhir.
+
+        Parameters:
+        stage (str): Nama tahap.
+        quantiles (tuple[float]): Kuantil (0 - 1).
+
+        Returns:
+        dict[float, float]: Latensi (detik) per kuantil; kosong jika belum ada sampel.
+        """
+        ordered = sorted(self._samples[stage])
+        if not ordered:
+            return {}
+        return {q: ordered[max(0, min(len(ordered) - 1, int(round(q * len(ordered))) - 1))] for q in quantiles}
+
+    def stats(self):
+        """
+        Mengembalikan ringkasan latensi dan nomor urut.
+
+        Returns:
+        dict: Jumlah pesan ber-trace, pesan hilang, pesan tidak berurutan, serta jumlah sampel, p50, p99,
+        dan nilai maksimal (milidetik) setiap tahap.
+        """
+        stages = {}
+        for stage in STAGES:
+            samples = self._samples[stage]
+            if not samples:
+                continue
+            values = self.percentiles(stage)
+            stages[stage] = {
+                'samples': len(samples),
+                'p50_ms': values[0.5] * 1000,
+                'p99_ms': values[0.99] * 1000,
+                'max_ms': max(samples) * 1000,
+            }
+        return {
+            'traced': self.traced,
+            'gaps': self.gaps,
+            'out_of_order': self.out_of_order,
+            'stages': stages,
+        }
+
+
+def register_metrics(registry, tracker: LatencyTracker):
+    """
+    Mendaftarkan metrik trace ke registry `/metrics`: persentil latensi per tahap dan counter nomor urut.
+
+    Parameters:
+    registry (Registry): Registry tujuan.
+    tracker (LatencyTracker): Tracker sumber data.
+
+    Returns:
+    None
+    """
+    def latency():
+        values = {}
+        for stage in STAGES:
+            for q, seconds in tracker.percentiles(stage).items():
+                values[(stage, q)] = seconds
+        return values
+
+    registry.gauge('zwsp_trace_latency_seconds', 'Persentil latensi per tahap dari sampel trace terakhir.',
+                   ('stage', 'quantile'), fn=latency)
+    registry.counter('zwsp_trace_messages_total', 'Jumlah pesan yang membawa trace.', fn=lambda: tracker.traced)
+    registry.counter('zwsp_trace_sequence_gaps_total', 'Jumlah pesan hilang berdasarkan nomor urut.',
+                     fn=lambda: tracker.gaps)
+    registry.counter('zwsp_trace_out_of_order_total', 'Jumlah pesan dengan nomor urut mundur atau berulang.',
+                     fn=lambda: tracker.out_of_order)
+
+
+def stamper_from_env():
+    """
+    Membuat TraceStamper untuk sender jika `TRACE_ENABLED` diaktifkan.
+
+    Returns:
+    TraceStamper | None: None jika trace tidak diaktifkan (pesan dipublish tanpa user property).
+    """
+    if (os.getenv("TRACE_ENABLED") or "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return TraceStamper(os.getenv("TRACE_SOURCE") or None)
+
+
+def tracker_from_env():
+    """
+    Membuat LatencyTracker untuk receiver dari variabel environment `TRACE_WINDOW`.
+
+    Returns:
+    LatencyTracker: Tracker latensi.
+    """
+    return LatencyTracker(int(os.getenv("TRACE_WINDOW") or 4096))
@@ -0,0 +1,191 @@
+import collections
+import hashlib
+import os
+import sys
+import time
+
+# Perkiraan overhead satu entri cache (key, node OrderedDict, objek DecodeResult) dalam byte
+ENTRY_OVERHEAD = 256
+
+
+def message_key(msg: str):
+    """
+    Menghitung key konten pesan: hash BLAKE2b 128-bit dari byte UTF-8 pesan. Cache dan filter duplikat
+    hanya menyimpan key ini, bukan pesan aslinya.
+
+    Parameters:
+    msg (str): Pesan yang disandikan.
+
+    Returns:
+    bytes: Digest 16 byte.
+    """
+    return hashlib.blake2b(msg.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class DecodeCache:
+    """
+    Cache LRU hasil `zwsp.decode` dengan key (hash pesan, mode).
+
+    Sender menyembunyikan nilai suhu yang sama di banyak pesan, dan redelivery QoS MQTT menghasilkan
+    pesan yang persis sama, sehingga hasil decode dapat dipakai ulang. Cache dibatasi jumlah entri dan
+    perkiraan ukuran memori; entri yang paling lama tidak dipakai dibuang lebih dulu. Cache hanya diakses
+    dari event loop sehingga tidak memakai lock.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Inisialisasi objek DecodeCache.
+
+        Parameters:
+        max_entries (int): Jumlah entri maksimal.
+        max_bytes (int): Perkiraan ukuran maksimal semua hasil yang disimpan (byte).
+
+        Raises:
+        ValueError: Jika `max_entries` atau `max_bytes` < 1.
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError('max_entries and max_bytes must be at least 1')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _cost(result):
+        return sys.getsizeof(result.hidden) + sys.getsizeof(result.carrier) + ENTRY_OVERHEAD
+
+    def get(self, key: bytes, mode):
+        """
+        Mengambil hasil decode dari cache.
+
+        Parameters:
+        key (bytes): Key pesan dari `message_key`.
+        mode (int | None): Mode decode.
+
+        Returns:
+        DecodeResult | None: Hasil decode, atau None jika tidak ada di cache.
+        """
+        entry = self._entries.get((key, mode))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((key, mode))
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: bytes, mode, result):
+        """
+        Menyimpan hasil decode. Hasil yang lebih besar dari `max_bytes` tidak disimpan.
+
+        Parameters:
+        key (bytes): Key pesan dari `message_key`.
+        mode (int | None): Mode decode.
+        result (DecodeResult): Hasil decode.
+
+        Returns:
+        None
+        """
+        cost = self._cost(result)
+        if cost > self.max_bytes:
+            return
+        old = self._entries.pop((key, mode), None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[(key, mode)] = (result, cost)
+        self.bytes += cost
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_cost) = self._entries.popitem(last=False)
+            self.bytes -= evicted_cost
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Mengembalikan metrik cache.
+
+        Returns:
+        dict: Jumlah entri, perkiraan ukuran (byte), hit, miss, dan entri yang dibuang.
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class DuplicateFilter:
+    """
+    Mendeteksi pesan yang persis sama dalam rentang waktu tertentu (misalnya redelivery QoS 1 atau retry
+    sender), agar pesan tersebut tidak di-broadcast ulang ke semua client WebSocket.
+    """
+
+    def __init__(self, window_ms: float, max_entries: int = 65536):
+        """
+        Inisialisasi objek DuplicateFilter.
+
+        Parameters:
+        window_ms (float): Rentang waktu (milidetik) sejak pesan pertama kali diterima.
+        max_entries (int): Jumlah key maksimal yang diingat; key terlama dilupakan lebih dulu.
+
+        Raises:
+        ValueError: Jika `window_ms` <= 0 atau `max_entries` < 1.
+        """
+        if window_ms <= 0 or max_entries < 1:
+            raise ValueError('window_ms must be positive and max_entries must be at least 1')
+        self.window = window_ms / 1000
+        self.max_entries = max_entries
+        # key -> waktu pertama kali diterima, urut dari yang terlama
+        self._seen = collections.OrderedDict()
+        self.suppressed = 0
+
+    def is_duplicate(self, key: bytes):
+        """
+        Memeriksa apakah pesan dengan key yang sama sudah diterima dalam rentang waktu, lalu mencatatnya.
+
+        Parameters:
+        key (bytes): Key pesan dari `message_key`.
+
+        Returns:
+        bool: True jika pesan merupakan duplikat.
+        """
+        now = time.monotonic()
+        seen = self._seen
+        # Key yang sudah kedaluwarsa dibuang dari depan (urutan waktu)
+        horizon = now - self.window
+        while seen:
+            oldest = next(iter(seen))
+            if seen[oldest] > horizon and len(seen) < self.max_entries:
+                break
+            del seen[oldest]
+
+        if key in seen:
+            self.suppressed += 1
+            return True
+        seen[key] = now
+        return False
+
+    def __len__(self):
+        return len(self._seen)
+
+
+def from_env():
+    """
+    Membuat DecodeCache dan DuplicateFilter dari variabel environment `DECODE_CACHE_SIZE`,
+    `DECODE_CACHE_BYTES`, dan `DEDUP_WINDOW_MS`.
+
+    Returns:
+    tuple[DecodeCache | None, DuplicateFilter | None]: None untuk fitur yang dinonaktifkan (nilai 0).
+    """
+    size = int(os.getenv("DECODE_CACHE_SIZE") or 4096)
+    cache = None
+    if size > 0:
+        cache = DecodeCache(size, int(os.getenv("DECODE_CACHE_BYTES") or 16 * 1024 * 1024))
+    window = float(os.getenv("DEDUP_WINDOW_MS") or 0)
+    return cache, DuplicateFilter(window) if window > 0 else None
@@ -0,0 +1,250 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import zwsp
+
+from .cache import message_key
+
+# Jalur eksekusi decode
+PATH_INLINE = 'inline'
+PATH_THREAD = 'thread'
+PATH_PROCESS = 'process'
+
+
+def _init_worker(max_decompressed_size: int):
+    """
+    Initializer worker process: menyamakan batas ukuran dekompresi dengan process utama.
+    """
+    zwsp.compression.MAX_DECOMPRESSED_SIZE = max_decompressed_size
+
+
+def _run_recorded(fn, arg, mode):
+    """
+    Dijalankan di worker process: memanggil `fn(arg, mode)` sambil mencatat panggilan timing hook
+    `zwsp`, agar process utama dapat meneruskannya ke hook miliknya (metrik codec).
+
+    Returns:
+    tuple: Hasil `fn` dan daftar argumen setiap panggilan hook.
+    """
+    calls = []
+    previous = zwsp.set_timing_hook(lambda *args: calls.append(args))
+    try:
+        return fn(arg, mode), calls
+    finally:
+        zwsp.set_timing_hook(previous)
+
+
+class DecodeExecutor:
+    """
+    Menjalankan `zwsp.decode` di luar event loop sesuai ukuran pesan.
+
+    Pesan kecil didekode langsung (inline) karena biaya berpindah thread lebih besar dari decode itu
+    sendiri, pesan sedang didekode di thread pool, dan pesan besar di process pool sehingga receiver
+    dapat memakai semua core. Jumlah pesan yang berada di pool dibatasi `max_pending`; pemanggil
+    berikutnya menunggu di event loop sampai ada slot kosong, sehingga antrean pool tidak tumbuh tanpa batas.
+    """
+
+    def __init__(self, mode=zwsp.MODE_AUTO, inline_limit: int = 4096, process_limit: int = 256 * 1024,
+                 threads: int = 4, processes: int = 0, max_pending: int = 64, cache=None):
+        """
+        Inisialisasi objek DecodeExecutor.
+
+        Parameters:
+        mode (int | None): Mode encoding yang digunakan untuk decode.
+        inline_limit (int): Panjang pesan (karakter) maksimal yang didekode langsung di event loop.
+        process_limit (int): Panjang pesan minimal yang didekode di process pool.
+        threads (int): Jumlah worker thread pool.
+        processes (int): Jumlah worker process pool; 0 berarti semua pesan besar memakai thread pool.
+        max_pending (int): Jumlah maksimal pesan yang berada di pool (sedang diproses atau antre).
+        cache (DecodeCache): Cache hasil decode opsional; pesan yang sama tidak didekode ulang.
+
+        Raises:
+        ValueError: Jika `threads` atau `max_pending` < 1.
+        """
+        if threads < 1 or max_pending < 1:
+            raise ValueError('threads and max_pending must be at least 1')
+
+        self.mode = mode
+        self.inline_limit = inline_limit
+        self.process_limit = process_limit
+        self.threads = threads
+        self.processes = processes
+        self.max_pending = max_pending
+        self.cache = cache
+
+        # Pool dibuat saat pertama kali dibutuhkan
+        self._thread_pool = None
+        self._process_pool = None
+        self._slots = None
+
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.counts = {PATH_INLINE: 0, PATH_THREAD: 0, PATH_PROCESS: 0}
+        self.seconds = {PATH_INLINE: 0.0, PATH_THREAD: 0.0, PATH_PROCESS: 0.0}
+        self.errors = 0
+
+    def _path_for_length(self, length: int):
+        if length <= self.inline_limit:
+            return PATH_INLINE
+        if self.processes > 0 and length >= self.process_limit:
+            return PATH_PROCESS
+        return PATH_THREAD
+
+    def _pool(self, path: str):
+        if path == PATH_PROCESS:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    self.processes, initializer=_init_worker,
+                    initargs=(zwsp.compression.MAX_DECOMPRESSED_SIZE,),
+                )
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix='zwsp-decode')
+        return self._thread_pool
+
+    async def decode(self, msg: str, key: bytes = None):
+        """
+        Mendekode pesan tanpa memblokir event loop (kecuali pesan kecil). Jika cache aktif, hasil decode
+        pesan yang sama diambil dari cache.
+
+        Parameters:
+        msg (str): Pesan yang akan didekode.
+        key (bytes): Key pesan dari `message_key` jika sudah dihitung pemanggil (opsional).
+
+        Returns:
+        DecodeResult: Hasil `zwsp.decode`.
+
+        Raises:
+        TypeError: Jika pesan tidak dapat didekode.
+        """
+        if self.cache is None:
+            return await self._run(self._path_for_length(len(msg)), zwsp.decode, msg)
+
+        key = key or message_key(msg)
+        result = self.cache.get(key, self.mode)
+        if result is None:
+            result = await self._run(self._path_for_length(len(msg)), zwsp.decode, msg)
+            self.cache.put(key, self.mode, result)
+        return result
+
+    async def _run(self, path: str, fn, arg):
+        """
+        Menjalankan `fn(arg, mode)` pada jalur eksekusi yang dipilih sambil mencatat metrik.
+        """
+        start = time.perf_counter()
+        try:
+            if path == PATH_INLINE:
+                return fn(arg, self.mode)
+
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_pending)
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+            try:
+                async with self._slots:
+                    loop = asyncio.get_running_loop()
+                    hook = zwsp.get_timing_hook()
+                    if path != PATH_PROCESS or hook is None:
+                        return await loop.run_in_executor(self._pool(path), fn, arg, self.mode)
+                    # Timing hook tidak terpasang di worker process: waktu codec dicatat di sana lalu
+                    # diteruskan ke hook process ini
+                    result, calls = await loop.run_in_executor(self._pool(path), _run_recorded, fn, arg, self.mode)
+                    for call in calls:
+                        hook(*call)
+                    return result
+            finally:
+                self.pending -= 1
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.counts[path] += 1
+            self.seconds[path] += time.perf_counter() - start
+
+    async def decode_many(self, msgs, keys=None):
+        """
+        Mendekode banyak pesan sekaligus dengan `zwsp.decode_many` dalam satu kali eksekusi. Jalur
+        eksekusi dipilih berdasarkan total panjang pesan. Jika cache aktif, hanya pesan unik yang belum
+        ada di cache yang didekode.
+
+        Parameters:
+        msgs (list[str]): Daftar pesan yang akan didekode.
+        keys (list[bytes]): Key setiap pesan dari `message_key` (opsional).
+
+        Returns:
+        list[DecodeResult]: Hasil decode setiap pesan.
+
+        Raises:
+        TypeError: Jika ada pesan yang tidak dapat didekode.
+        """
+        if self.cache is None:
+            path = self._path_for_length(sum(len(msg) for msg in msgs))
+            return await self._run(path, zwsp.decode_many, msgs)
+
+        keys = keys or [message_key(msg) for msg in msgs]
+        results = [self.cache.get(key, self.mode) for key in keys]
+        # Key -> pesan yang belum ada di cache (duplikat dalam satu batch hanya didekode sekali)
+        missing = {key: msg for key, msg, result in zip(keys, msgs, results) if result is None}
+        if missing:
+            path = self._path_for_length(sum(len(msg) for msg in missing.values()))
+            decoded = await self._run(path, zwsp.decode_many, list(missing.values()))
+            fresh = dict(zip(missing, decoded))
+            for key, result in fresh.items():
+                self.cache.put(key, self.mode, result)
+            results = [fresh[key] if result is None else result for key, result in zip(keys, results)]
+        return results
+
+    def stats(self):
+        """
+        Mengembalikan metrik executor.
+
+        Returns:
+        dict: Jumlah pesan dan total waktu per jalur, jumlah pesan non-inline yang belum selesai
+        (termasuk yang menunggu slot), nilai maksimalnya, jumlah error, dan metrik cache (None jika
+        cache tidak aktif).
+        """
+        return {
+            'counts': dict(self.counts),
+            'seconds': dict(self.seconds),
+            'pending': self.pending,
+            'max_pending_seen': self.max_pending_seen,
+            'errors': self.errors,
+            'cache': None if self.cache is None else self.cache.stats(),
+        }
+
+    def shutdown(self):
+        """
+        Menghentikan thread pool dan process pool.
+
+        Returns:
+        None
+        """
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+
+def from_env(mode, cache=None):
+    """
+    Membuat DecodeExecutor dari variabel environment `DECODE_*`.
+
+    Parameters:
+    mode (int | None): Mode encoding yang digunakan untuk decode.
+    cache (DecodeCache): Cache hasil decode opsional.
+
+    Returns:
+    DecodeExecutor: Executor yang sudah dikonfigurasi.
+    """
+    return DecodeExecutor(
+        mode,
+        inline_limit=int(os.getenv("DECODE_INLINE_LIMIT") or 4096),
+        process_limit=int(os.getenv("DECODE_PROCESS_LIMIT") or 256 * 1024),
+        threads=int(os.getenv("DECODE_THREADS") or 4),
+        processes=int(os.getenv("DECODE_PROCESSES") or 0),
+        max_pending=int(os.getenv("DECODE_MAX_PENDING") or 64),
+        cache=cache,
+    )
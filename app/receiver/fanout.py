@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import os
+import struct
+
+logger = logging.getLogger('uvicorn.error')
+
+# Peran process receiver (FANOUT_ROLE):
+# - none: satu process melakukan subscribe MQTT, decode, dan melayani WebSocket (default)
+# - ingest: subscribe MQTT dan decode, lalu mengirim frame yang sudah diserialisasi ke semua worker
+# - worker: hanya melayani WebSocket; frame diterima dari process ingest (tanpa MQTT maupun decode)
+ROLE_NONE = 'none'
+ROLE_INGEST = 'ingest'
+ROLE_WORKER = 'worker'
+ROLES = (ROLE_NONE, ROLE_INGEST, ROLE_WORKER)
+
+DEFAULT_SOCKET = '/tmp/zwsp-fanout.sock'
+
+# Frame ingest -> worker: panjang payload (uint32) dan nomor urut (uint64, 0 jika riwayat nonaktif), lalu
+# payload JSON yang sama dengan frame WebSocket
+_FRAME = struct.Struct('>IQ')
+# Handshake worker -> ingest: nomor urut terakhir yang dimiliki worker (int64, -1 berarti hanya frame live)
+_HELLO = struct.Struct('>q')
+# Pesan worker -> ingest (pesan `POST /receive` yang diteruskan): panjang (uint32), lalu pesan UTF-8
+_FORWARD = struct.Struct('>I')
+
+
+class FrameBusServer:
+    """
+    Sisi process ingest dari bus frame lokal (Unix domain socket).
+
+    Setiap frame yang di-broadcast ke WebSocket dikirim apa adanya (sudah diserialisasi) ke semua worker,
+    sehingga pesan hanya didekode dan diserialisasi satu kali walaupun koneksi WebSocket tersebar di
+    beberapa process. Worker yang terhubung (ulang) mengirim nomor urut terakhirnya dan menerima frame
+    yang terlewat dari RingBuffer riwayat sebelum frame live. Worker yang buffer kirimnya melebihi
+    `max_buffer` byte diputus dan akan terhubung ulang dari nomor urut terakhirnya.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET, history=None, max_buffer: int = 64 * 1024 * 1024,
+                 on_forward=None):
+        """
+        Inisialisasi objek FrameBusServer.
+
+        Parameters:
+        path (str): Path Unix domain socket.
+        history (MessageHistory): Riwayat untuk catch-up worker (opsional).
+        max_buffer (int): Ukuran buffer kirim maksimal per worker (byte).
+        on_forward (Callable[[str], Awaitable]): Fungsi penerima pesan yang diteruskan worker (opsional).
+
+        Raises:
+        ValueError: Jika `max_buffer` < 1.
+        """
+        if max_buffer < 1:
+            raise ValueError('max_buffer must be at least 1')
+        self.path = path
+        self.history = history
+        self.max_buffer = max_buffer
+        self.on_forward = on_forward
+        self._server = None
+        self._workers = set()
+        self.frames = 0
+        self.disconnects = 0
+        self.forwarded = 0
+
+    async def start(self):
+        """
+        Membuka Unix domain socket (file socket lama dihapus) yang hanya dapat diakses user yang sama.
+
+        Returns:
+        None
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+        os.chmod(self.path, 0o600)
+        logger.info('Fan-out bus listening on %s', self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            (since,) = _HELLO.unpack(await reader.readexactly(_HELLO.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+
+        # Tidak ada await dari sini sampai worker terdaftar, sehingga frame catch-up dan frame live
+        # masuk ke buffer kirim secara berurutan tanpa celah maupun duplikat
+        replayed = 0
+        if since >= 0 and self.history is not None:
+            ring = self.history.ring
+            start = since if ring.first_seq is None else max(since, ring.first_seq - 1)
+            for seq, payload in ring.since(start, self.history.seq):
+                writer.writelines((_FRAME.pack(len(payload), seq), payload))
+                replayed += 1
+        self._workers.add(writer)
+        logger.info('Fan-out worker connected (%d workers, %d frames replayed)', len(self._workers), replayed)
+
+        try:
+            while True:
+                (length,) = _FORWARD.unpack(await reader.readexactly(_FORWARD.size))
+                msg = (await reader.readexactly(length)).decode('utf-8', 'surrogatepass')
+                self.forwarded += 1
+                if self.on_forward is not None:
+                    try:
+                        await self.on_forward(msg)
+                    except Exception as exc:
+                        logger.warning('Forwarded message failed: %r', exc)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._workers.discard(writer)
+            writer.close()
+            logger.info('Fan-out worker disconnected (%d workers)', len(self._workers))
+
+    def publish(self, payload: bytes, seq: int = 0):
+        """
+        Mengirim satu frame ke semua worker tanpa menunggu (hanya mengisi buffer kirim).
+
+        Parameters:
+        payload (bytes): Frame JSON.
+        seq (int): Nomor urut frame (0 jika riwayat nonaktif).
+
+        Returns:
+        None
+        """
+        header = _FRAME.pack(len(payload), seq)
+        for writer in list(self._workers):
+            transport = writer.transport
+            if transport.get_write_buffer_size() > self.max_buffer:
+                logger.warning('Disconnecting slow fan-out worker (%d bytes buffered)', transport.get_write_buffer_size())
+                self._workers.discard(writer)
+                self.disconnects += 1
+                transport.abort()
+                continue
+            writer.writelines((header, payload))
+        self.frames += 1
+
+    def worker_count(self):
+        """
+        Mengembalikan jumlah worker yang terhubung.
+
+        Returns:
+        int: Jumlah worker.
+        """
+        return len(self._workers)
+
+    async def close(self):
+        """
+        Menutup socket dan semua koneksi worker.
+
+        Returns:
+        None
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._workers):
+            writer.close()
+        self._workers.clear()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class FrameBusClient:
+    """
+    Sisi process worker dari bus frame lokal: menerima frame dari process ingest dan menyiarkannya ke
+    koneksi WebSocket lokal dengan `ConnectionManager.broadcast_frame`. Koneksi yang terputus dicoba
+    ulang dengan jeda yang meningkat, dimulai dari nomor urut terakhir yang diterima.
+    """
+
+    def __init__(self, path: str, ws_manager, reconnect_delay: float = 0.1, max_reconnect_delay: float = 2.0):
+        """
+        Inisialisasi objek FrameBusClient.
+
+        Parameters:
+        path (str): Path Unix domain socket process ingest.
+        ws_manager (ConnectionManager): Pengelola koneksi WebSocket lokal.
+        reconnect_delay (float): Jeda awal sebelum mencoba terhubung ulang (detik).
+        max_reconnect_delay (float): Jeda maksimal (detik).
+        """
+        self.path = path
+        self.ws_manager = ws_manager
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._writer = None
+        self._task = None
+        self.frames = 0
+        self.reconnects = 0
+
+    @property
+    def connected(self):
+        """
+        True jika terhubung ke process ingest.
+        """
+        return self._writer is not None
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as exc:
+                logger.debug('Fan-out bus unavailable (%r), retrying in %.1fs', exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            delay = self.reconnect_delay
+            history = self.ws_manager.history
+            writer.write(_HELLO.pack(history.seq if history is not None else -1))
+            self._writer = writer
+            logger.info('Connected to fan-out bus %s', self.path)
+            try:
+                while True:
+                    length, seq = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+                    payload = await reader.readexactly(length)
+                    self.frames += 1
+                    await self.ws_manager.broadcast_frame(payload, seq)
+            except (asyncio.IncompleteReadError, ConnectionError) as exc:
+                logger.warning('Fan-out bus disconnected: %r', exc)
+            finally:
+                self._writer = None
+                writer.close()
+            self.reconnects += 1
+
+    def start(self):
+        """
+        Menjalankan koneksi ke process ingest di background.
+
+        Returns:
+        None
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def forward(self, msg: str):
+        """
+        Meneruskan pesan (dari `POST /receive` pada worker) ke process ingest untuk didekode dan di-broadcast.
+
+        Parameters:
+        msg (str): Pesan yang disandikan.
+
+        Returns:
+        bool: False jika tidak terhubung ke process ingest.
+        """
+        if self._writer is None:
+            return False
+        data = msg.encode('utf-8', 'surrogatepass')
+        self._writer.writelines((_FORWARD.pack(len(data)), data))
+        return True
+
+    async def close(self):
+        """
+        Menghentikan koneksi ke process ingest.
+
+        Returns:
+        None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def role_from_env():
+    """
+    Membaca peran process dari variabel environment `FANOUT_ROLE`.
+
+    Returns:
+    str: `none`, `ingest`, atau `worker`.
+
+    Raises:
+    ValueError: Jika peran tidak dikenal.
+    """
+    role = os.getenv("FANOUT_ROLE") or ROLE_NONE
+    if role not in ROLES:
+        raise ValueError("Unknown FANOUT_ROLE: {0}".format(role))
+    return role
+
+
+def server_from_env(history=None, on_forward=None):
+    """
+    Membuat FrameBusServer dari variabel environment `FANOUT_SOCKET` dan `FANOUT_MAX_BUFFER`.
+
+    Parameters:
+    history (MessageHistory): Riwayat untuk catch-up worker (opsional).
+    on_forward (Callable[[str], Awaitable]): Fungsi penerima pesan yang diteruskan worker (opsional).
+
+    Returns:
+    FrameBusServer: Bus frame sisi ingest.
+    """
+    return FrameBusServer(
+        os.getenv("FANOUT_SOCKET") or DEFAULT_SOCKET,
+        history,
+        max_buffer=int(os.getenv("FANOUT_MAX_BUFFER") or 64 * 1024 * 1024),
+        on_forward=on_forward,
+    )
+
+
+def client_from_env(ws_manager):
+    """
+    Membuat FrameBusClient dari variabel environment `FANOUT_SOCKET`.
+
+    Parameters:
+    ws_manager (ConnectionManager): Pengelola koneksi WebSocket lokal.
+
+    Returns:
+    FrameBusClient: Bus frame sisi worker.
+    """
+    return FrameBusClient(os.getenv("FANOUT_SOCKET") or DEFAULT_SOCKET, ws_manager)
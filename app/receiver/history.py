@@ -0,0 +1,462 @@
+import asyncio
+import bisect
+import collections
+import itertools
+import logging
+import os
+import struct
+import threading
+
+import orjson
+
+logger = logging.getLogger('uvicorn.error')
+
+# Header record log: nomor urut (uint64) dan panjang payload (uint32), big-endian
+_RECORD = struct.Struct('>QI')
+_SEGMENT_SUFFIX = '.log'
+
+
+class RingBuffer:
+    """
+    Buffer melingkar berisi frame JSON terbaru beserta nomor urutnya, dibatasi jumlah dan total byte.
+    Nomor urut selalu berurutan tanpa celah, sehingga posisi sebuah nomor dapat dihitung langsung.
+    """
+
+    def __init__(self, capacity: int = 1024, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Inisialisasi objek RingBuffer.
+
+        Parameters:
+        capacity (int): Jumlah frame maksimal.
+        max_bytes (int): Total ukuran payload maksimal (byte).
+
+        Raises:
+        ValueError: Jika `capacity` atau `max_bytes` < 1.
+        """
+        if capacity < 1 or max_bytes < 1:
+            raise ValueError('capacity and max_bytes must be at least 1')
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._entries = collections.deque()
+        self.bytes = 0
+
+    def append(self, seq: int, payload: bytes):
+        self._entries.append((seq, payload))
+        self.bytes += len(payload)
+        while len(self._entries) > self.capacity or (self.bytes > self.max_bytes and len(self._entries) > 1):
+            _, dropped = self._entries.popleft()
+            self.bytes -= len(dropped)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    @property
+    def first_seq(self):
+        """
+        Nomor urut frame terlama yang masih disimpan, atau None jika kosong.
+        """
+        return self._entries[0][0] if self._entries else None
+
+    def since(self, seq: int, upto: int):
+        """
+        Mengembalikan frame dengan nomor urut di antara (`seq`, `upto`].
+
+        Parameters:
+        seq (int): Nomor urut terakhir yang sudah dimiliki client.
+        upto (int): Nomor urut terakhir yang diambil.
+
+        Returns:
+        list[tuple[int, bytes]]: Pasangan (nomor urut, payload).
+        """
+        if not self._entries:
+            return []
+        first = self._entries[0][0]
+        start = max(0, seq + 1 - first)
+        stop = max(start, upto + 1 - first)
+        return list(itertools.islice(self._entries, start, stop))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SegmentLog:
+    """
+    Log append-only di disk lokal, dibagi menjadi beberapa file segmen `<nomor urut pertama>.log`.
+
+    Setiap record berisi header (nomor urut, panjang) dan payload JSON. Append hanya memasukkan record ke
+    antrean di memori; thread terpisah menulis dan menjalankan fsync secara batch setiap `fsync_ms`
+    milidetik, sehingga event loop tidak pernah menunggu disk. Segmen terlama dihapus jika total ukuran
+    atau jumlah record melebihi batas. Record yang terpotong di akhir segmen (crash) dibuang saat start.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, max_bytes: int = 1024 ** 3,
+                 max_messages: int = 0, fsync_ms: float = 100):
+        """
+        Inisialisasi objek SegmentLog dan memulihkan nomor urut terakhir dari segmen yang ada.
+
+        Parameters:
+        directory (str): Direktori segmen (dibuat jika belum ada).
+        segment_bytes (int): Ukuran satu segmen sebelum berpindah ke segmen baru.
+        max_bytes (int): Total ukuran semua segmen maksimal.
+        max_messages (int): Jumlah record maksimal (0 berarti hanya dibatasi ukuran).
+        fsync_ms (float): Jarak antar penulisan batch dan fsync (milidetik).
+
+        Raises:
+        ValueError: Jika `segment_bytes` atau `max_bytes` < 1, atau `max_messages`/`fsync_ms` negatif.
+        """
+        if segment_bytes < 1 or max_bytes < 1 or max_messages < 0 or fsync_ms < 0:
+            raise ValueError('Invalid segment log limits')
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.fsync_interval = fsync_ms / 1000
+
+        os.makedirs(directory, exist_ok=True)
+        # Nomor urut pertama setiap segmen (urut) dan ukurannya
+        self._segments = collections.OrderedDict()
+        self._file = None
+        self._file_lock = threading.Lock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flusher = None
+        self.last_seq = 0
+        self.appended = 0
+        self.fsyncs = 0
+        # Posisi (segmen, offset) setelah record terakhir setiap pembacaan, agar potongan replay berikutnya
+        # tidak memindai ulang segmen dari awal
+        self._resume = collections.OrderedDict()
+        self._recover()
+
+    def _path(self, first_seq: int):
+        return os.path.join(self.directory, '{0:020d}{1}'.format(first_seq, _SEGMENT_SUFFIX))
+
+    def _recover(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(_SEGMENT_SUFFIX))
+        for name in names:
+            first_seq = int(name[:-len(_SEGMENT_SUFFIX)])
+            self._segments[first_seq] = os.path.getsize(self._path(first_seq))
+        if not self._segments:
+            return
+        last_first = next(reversed(self._segments))
+        path = self._path(last_first)
+        valid = 0
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        while valid + _RECORD.size <= len(data):
+            seq, length = _RECORD.unpack_from(data, valid)
+            if valid + _RECORD.size + length > len(data):
+                break
+            self.last_seq = seq
+            valid += _RECORD.size + length
+        if valid < len(data):
+            logger.warning('Truncating %d trailing bytes of %s', len(data) - valid, path)
+            with open(path, 'r+b') as handle:
+                handle.truncate(valid)
+            self._segments[last_first] = valid
+        if not self.last_seq:
+            self.last_seq = last_first - 1
+
+    def append(self, seq: int, payload: bytes):
+        """
+        Menambahkan record ke antrean tulis (tanpa I/O).
+
+        Parameters:
+        seq (int): Nomor urut.
+        payload (bytes): Payload JSON.
+
+        Returns:
+        None
+        """
+        with self._pending_lock:
+            self._pending.append((seq, payload))
+        self.last_seq = seq
+        self.appended += 1
+        if self._flusher is None:
+            self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self._pending:
+                await loop.run_in_executor(None, self.flush)
+
+    def flush(self):
+        """
+        Menulis semua record di antrean ke segmen lalu menjalankan fsync (dipanggil dari thread).
+
+        Returns:
+        None
+        """
+        with self._file_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            for seq, payload in batch:
+                if self._file is None or self._segments[next(reversed(self._segments))] >= self.segment_bytes:
+                    self._rotate(seq)
+                self._file.write(_RECORD.pack(seq, len(payload)))
+                self._file.write(payload)
+                self._segments[next(reversed(self._segments))] += _RECORD.size + len(payload)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+            self._enforce_retention()
+
+    def _rotate(self, seq: int):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        if self._segments and self._file is None and \
+                self._segments[next(reversed(self._segments))] < self.segment_bytes:
+            # Segmen terakhir dari run sebelumnya masih bisa ditambah
+            first_seq = next(reversed(self._segments))
+        else:
+            first_seq = seq
+            self._segments[first_seq] = 0
+        self._file = open(self._path(first_seq), 'ab')
+
+    def _enforce_retention(self):
+        while len(self._segments) > 1:
+            oldest = next(iter(self._segments))
+            total_bytes = sum(self._segments.values())
+            total_messages = self.last_seq - oldest + 1
+            if total_bytes <= self.max_bytes and (not self.max_messages or total_messages <= self.max_messages):
+                return
+            del self._segments[oldest]
+            try:
+                os.remove(self._path(oldest))
+            except OSError as exc:
+                logger.warning('Cannot remove log segment %s: %r', self._path(oldest), exc)
+
+    @property
+    def first_seq(self):
+        """
+        Nomor urut record terlama yang masih disimpan, atau None jika log kosong.
+        """
+        return next(iter(self._segments), None) if self._segments else None
+
+    def read(self, since: int, upto: int, limit: int = 256):
+        """
+        Membaca record dengan nomor urut di antara (`since`, `upto`], maksimal `limit` record (dipanggil
+        dari thread). Record yang belum ditulis ke disk juga diikutsertakan.
+
+        Parameters:
+        since (int): Nomor urut terakhir yang sudah dimiliki client.
+        upto (int): Nomor urut terakhir yang diambil.
+        limit (int): Jumlah record maksimal.
+
+        Returns:
+        list[tuple[int, bytes]]: Pasangan (nomor urut, payload).
+        """
+        entries = []
+        with self._file_lock:
+            if self._file is not None:
+                self._file.flush()
+            starts = list(self._segments)
+            # Segmen pertama yang perlu dibaca: segmen terakhir yang dimulai pada atau sebelum since + 1
+            index = max(0, bisect.bisect_right(starts, since + 1) - 1)
+            resume_segment, offset = self._resume.pop(since, (None, 0))
+            for first_seq in starts[index:]:
+                if first_seq > upto or len(entries) >= limit:
+                    break
+                with open(self._path(first_seq), 'rb') as handle:
+                    if first_seq == resume_segment:
+                        handle.seek(offset)
+                    while len(entries) < limit:
+                        header = handle.read(_RECORD.size)
+                        if len(header) < _RECORD.size:
+                            break
+                        seq, length = _RECORD.unpack(header)
+                        if seq <= since:
+                            handle.seek(length, os.SEEK_CUR)
+                            continue
+                        if seq > upto:
+                            return entries
+                        entries.append((seq, handle.read(length)))
+                    if entries:
+                        self._resume[entries[-1][0]] = (first_seq, handle.tell())
+                        while len(self._resume) > 64:
+                            self._resume.popitem(last=False)
+            with self._pending_lock:
+                pending = list(self._pending)
+        last = entries[-1][0] if entries else since
+        for seq, payload in pending:
+            if len(entries) >= limit or seq > upto:
+                break
+            if seq > last:
+                entries.append((seq, payload))
+        return entries
+
+    async def close(self):
+        """
+        Menghentikan penulisan periodik, menulis sisa record, dan menutup segmen.
+
+        Returns:
+        None
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class MessageHistory:
+    """
+    Riwayat frame yang di-broadcast ke client WebSocket, agar client yang terhubung ulang dengan
+    `/ws?since=<seq>` dapat mengejar pesan yang terlewat sebelum menerima pesan live.
+
+    Setiap frame diberi nomor urut (`seq`) yang naik terus; frame terbaru disimpan di RingBuffer, dan jika
+    SegmentLog diberikan, semua frame juga ditulis ke disk sehingga riwayat bertahan setelah restart.
+    """
+
+    def __init__(self, ring: RingBuffer, log: SegmentLog = None, chunk_size: int = 256):
+        """
+        Inisialisasi objek MessageHistory.
+
+        Parameters:
+        ring (RingBuffer): Buffer frame terbaru di memori.
+        log (SegmentLog): Log di disk (opsional).
+        chunk_size (int): Jumlah frame dalam satu frame replay.
+        """
+        self.ring = ring
+        self.log = log
+        self.chunk_size = chunk_size
+        # Nomor urut melanjutkan log di disk setelah restart
+        self.seq = log.last_seq if log is not None else 0
+
+    def append(self, data: dict):
+        """
+        Menyalin data dengan nomor urut (key `seq`), menyerialisasi salinan ke JSON, lalu menyimpannya.
+        Dict milik pemanggil tidak diubah.
+
+        Parameters:
+        data (dict): Data yang akan di-broadcast.
+
+        Returns:
+        tuple[dict, bytes]: Salinan data dengan key `seq` dan frame JSON-nya.
+        """
+        self.seq += 1
+        data = dict(data, seq=self.seq)
+        payload = orjson.dumps(data)
+        self.ring.append(self.seq, payload)
+        if self.log is not None:
+            self.log.append(self.seq, payload)
+        return data, payload
+
+    def add(self, seq: int, payload: bytes):
+        """
+        Menyimpan frame yang sudah memiliki nomor urut (misalnya frame dari process ingest). Jika nomor
+        urut tidak melanjutkan frame sebelumnya, RingBuffer dikosongkan agar nomor urutnya tetap tanpa celah.
+
+        Parameters:
+        seq (int): Nomor urut frame.
+        payload (bytes): Frame JSON.
+
+        Returns:
+        None
+        """
+        if seq != self.seq + 1:
+            self.ring.clear()
+        self.seq = seq
+        self.ring.append(seq, payload)
+        if self.log is not None:
+            self.log.append(seq, payload)
+
+    @property
+    def first_seq(self):
+        """
+        Nomor urut frame terlama yang masih dapat di-replay (None jika belum ada frame).
+        """
+        for source in (self.log, self.ring):
+            if source is not None and source.first_seq is not None:
+                return source.first_seq
+        return None
+
+    async def replay(self, since: int, upto: int):
+        """
+        Menghasilkan frame dengan nomor urut di antara (`since`, `upto`] dalam potongan `chunk_size` frame.
+        Frame lama dibaca dari log di disk (di thread), frame terbaru dari RingBuffer.
+
+        Parameters:
+        since (int): Nomor urut terakhir yang sudah dimiliki client.
+        upto (int): Nomor urut terakhir yang diambil (nomor urut saat client terhubung).
+
+        Returns:
+        AsyncIterator[list[tuple[int, bytes]]]: Potongan pasangan (nomor urut, payload).
+        """
+        loop = asyncio.get_running_loop()
+        cursor = since
+        while cursor < upto:
+            ring_first = self.ring.first_seq
+            if ring_first is not None and cursor + 1 >= ring_first:
+                chunk = self.ring.since(cursor, min(upto, cursor + self.chunk_size))
+            elif self.log is not None:
+                chunk = await loop.run_in_executor(None, self.log.read, cursor, upto, self.chunk_size)
+            else:
+                chunk = self.ring.since(cursor, min(upto, (ring_first or upto) - 1 + self.chunk_size))
+            if not chunk:
+                return
+            cursor = chunk[-1][0]
+            yield chunk
+
+    def stats(self):
+        """
+        Mengembalikan metrik riwayat.
+
+        Returns:
+        dict: Nomor urut terakhir dan terlama, jumlah dan ukuran frame di memori, serta metrik log.
+        """
+        return {
+            'seq': self.seq,
+            'first_seq': self.first_seq,
+            'ring_entries': len(self.ring),
+            'ring_bytes': self.ring.bytes,
+            'log_appended': None if self.log is None else self.log.appended,
+            'log_fsyncs': None if self.log is None else self.log.fsyncs,
+        }
+
+    async def close(self):
+        """
+        Menulis sisa record log ke disk (dipanggil saat aplikasi dimatikan).
+
+        Returns:
+        None
+        """
+        if self.log is not None:
+            await self.log.close()
+
+
+def from_env(with_log: bool = True):
+    """
+    Membuat MessageHistory dari variabel environment `WS_HISTORY_*` dan `WS_LOG_*`.
+
+    Parameters:
+    with_log (bool): False untuk mengabaikan `WS_LOG_DIR` (misalnya pada worker fan-out, agar hanya
+        process ingest yang menulis log).
+
+    Returns:
+    MessageHistory | None: None jika `WS_HISTORY_SIZE` bernilai 0.
+    """
+    size = int(os.getenv("WS_HISTORY_SIZE") or 1024)
+    if size <= 0:
+        return None
+    ring = RingBuffer(size, int(os.getenv("WS_HISTORY_BYTES") or 8 * 1024 * 1024))
+    log = None
+    if with_log and os.getenv("WS_LOG_DIR"):
+        log = SegmentLog(
+            os.getenv("WS_LOG_DIR"),
+            segment_bytes=int(os.getenv("WS_LOG_SEGMENT_BYTES") or 64 * 1024 * 1024),
+            max_bytes=int(os.getenv("WS_LOG_MAX_BYTES") or 1024 ** 3),
+            max_messages=int(os.getenv("WS_LOG_MAX_MESSAGES") or 0),
+            fsync_ms=float(os.getenv("WS_LOG_FSYNC_MS") or 100),
+        )
+    return MessageHistory(ring, log, chunk_size=int(os.getenv("WS_REPLAY_CHUNK") or 256))
@@ -1,39 +1,106 @@
-from typing import Any
-from fastapi import FastAPI, APIRouter, WebSocket
-from pydantic import BaseModel
+from ..common.startup import Lazy, StartupTimer
+
+# Durasi setiap tahap startup dicatat sejak modul ini mulai diimport (lihat `startup_phase_seconds` di `/metrics`)
+startup = StartupTimer()
+
+from typing import Any, TYPE_CHECKING
+with startup.phase('import:fastapi'):
+    from fastapi import FastAPI, APIRouter, HTTPException, WebSocket, Response
+    from pydantic import BaseModel
 import logging
 from contextlib import asynccontextmanager
-from gmqtt import Client as MQTTClient
-from fastapi_mqtt import FastMQTT, MQTTConfig
 from dotenv import load_dotenv
 import os
-
-import zwsp
+import time
+
+with startup.phase('import:zwsp'):
+    import zwsp
+from ..common import metrics, topics, tracing
+from .cache import message_key, from_env as decode_cache_from_env
+from .decoder import from_env as decode_executor_from_env
+from . import fanout
+from .history import from_env as message_history_from_env
+from .pipeline import from_env as batch_pipeline_from_env
 from .websocket_manager import ConnectionManager
 
+if TYPE_CHECKING:
+    from gmqtt import Client as MQTTClient
+
 # Load variabel environment dari file .env
 load_dotenv(override=True)
 
-# Mengatur logger untuk debugging
+# Peran process dalam mode multi-process: none (default, satu process), ingest, atau worker
+fanout_role = fanout.role_from_env()
+
+# Mode encoding ZWSP yang digunakan (zwsp, full, packed, atau auto). Default-nya zwsp seperti sender;
+# auto dapat melayani producer dengan mode berbeda, tetapi deteksinya tidak selalu bisa dibedakan
+zwsp_mode = zwsp.MODE_NAMES[os.getenv("ZWSP_MODE") or "zwsp"]
+# Nama mode untuk dilaporkan ke client WebSocket
+mode_labels = {mode: name for name, mode in zwsp.MODE_NAMES.items()}
+# Batas ukuran payload hasil dekompresi (codec kompresi dideteksi otomatis dari header pesan)
+zwsp.compression.MAX_DECOMPRESSED_SIZE = int(os.getenv("ZWSP_MAX_DECOMPRESSED_SIZE") or zwsp.compression.MAX_DECOMPRESSED_SIZE)
+
+# Mengatur logger untuk debugging. Semua log memakai format lazy (`%s`), sehingga level yang tidak aktif
+# (misalnya LOG_LEVEL=INFO di produksi) tidak memformat isi pesan sama sekali
 logger = logging.getLogger('uvicorn.error')
-logger.setLevel(logging.DEBUG)
-
-# Konfigurasi MQTT
-mqtt_config = MQTTConfig(
-    host=os.getenv("MQTT_HOST", "0.0.0.0"),
-    port=int(os.getenv("MQTT_PORT", 1883)),
-    keepalive=60,
-    username=os.getenv("MQTT_USERNAME", "admin"),
-    password=os.getenv("MQTT_PASSWORD", "hivemq"),
-    ssl=False,
-)
-fast_mqtt = FastMQTT(config=mqtt_config)
+logger.setLevel(os.getenv("LOG_LEVEL") or "DEBUG")
+
+# Metrik runtime untuk endpoint `/metrics` (format teks Prometheus)
+registry = metrics.Registry()
+metrics.instrument_zwsp(registry, zwsp)
+messages_received = registry.counter(
+    'zwsp_messages_received_total', 'Jumlah pesan yang diterima receiver.', ('source',))
+receive_seconds = registry.histogram(
+    'zwsp_receive_seconds', 'Waktu penanganan satu pesan (decode dan broadcast).', ('source',))
+mqtt_payload_bytes = registry.histogram(
+    'mqtt_payload_bytes', 'Ukuran payload MQTT yang diterima (byte).', buckets=metrics.SIZE_BUCKETS)
+broadcast_seconds = registry.histogram(
+    'websocket_broadcast_seconds', 'Waktu fan-out satu broadcast ke antrean semua client WebSocket.')
+
+# Latensi per tahap untuk pesan MQTT yang membawa trace dari sender (TRACE_ENABLED di sender), lihat `/trace`
+tracker = tracing.tracker_from_env()
+tracing.register_metrics(registry, tracker)
+startup.register_metrics(registry)
+
+# Topik yang di-subscribe: `<MQTT_TOPIC>/#` mencakup topik dasar dan semua shard dari sender. Jika
+# MQTT_SHARED_GROUP diatur, subscription menjadi shared subscription MQTT v5 (`$share/<group>/...`)
+# sehingga broker membagi pesan di antara semua receiver dalam grup yang sama
+mqtt_subscription = topics.subscription_from_env()
+
+
+def _create_mqtt():
+    """
+    Membuat client MQTT dan mendaftarkan callback-nya. Dipanggil saat lifespan dimulai, sehingga import
+    modul ini tidak mengimport fastapi_mqtt/gmqtt.
+
+    Returns:
+    FastMQTT: Client MQTT.
+    """
+    from fastapi_mqtt import FastMQTT, MQTTConfig
+
+    # Konfigurasi MQTT
+    mqtt_config = MQTTConfig(
+        host=os.getenv("MQTT_HOST", "0.0.0.0"),
+        port=int(os.getenv("MQTT_PORT", 1883)),
+        keepalive=60,
+        username=os.getenv("MQTT_USERNAME", "admin"),
+        password=os.getenv("MQTT_PASSWORD", "hivemq"),
+        ssl=False,
+    )
+    client = FastMQTT(config=mqtt_config)
+    client.on_connect()(connect)
+    client.on_disconnect()(disconnect)
+    client.on_message()(receive_message_mqtt)
+    return client
+
+fast_mqtt = Lazy('mqtt', _create_mqtt, startup)
 
 
 @asynccontextmanager
 async def _lifespan(_app: FastAPI):
     """
-    Mengelola life-cycle aplikasi FastAPI untuk memulai dan menghentikan koneksi MQTT.
+    Mengelola life-cycle aplikasi FastAPI untuk memulai dan menghentikan koneksi MQTT. Process worker
+    fan-out tidak terhubung ke MQTT, melainkan ke bus frame process ingest.
 
     Parameters:
     _app (FastAPI): Aplikasi FastAPI.
@@ -41,16 +108,167 @@ async def _lifespan(_app: FastAPI):
     Yields:
     None
     """
-    await fast_mqtt.mqtt_startup()
+    mqtt = None
+    if fanout_role != fanout.ROLE_WORKER:
+        mqtt = fast_mqtt.get()
+        with startup.phase('start:mqtt_connect'):
+            await mqtt.mqtt_startup()
+    if frame_bus is not None:
+        with startup.phase('start:fanout_bus'):
+            await frame_bus.start()
+    if bus_client is not None:
+        bus_client.start()
+    startup.mark_ready('Receiver ({0})'.format(fanout_role))
     yield
-    await fast_mqtt.mqtt_shutdown()
+    if bus_client is not None:
+        await bus_client.close()
+    if mqtt is not None:
+        await mqtt.mqtt_shutdown()
+    if batch_pipeline is not None:
+        await batch_pipeline.close()
+    if frame_bus is not None:
+        await frame_bus.close()
+    await ws_manager.close()
+    if history is not None:
+        await history.close()
+    decoder.shutdown()
 
 # Membuat instance aplikasi FastAPI dengan pengelola life-cycle
 app = FastAPI(lifespan=_lifespan)
 router = APIRouter()
 
-# Membuat instance ConnectionManager untuk mengelola koneksi WebSocket
-ws_manager = ConnectionManager()
+# Riwayat pesan untuk replay `/ws?since=<seq>`: WS_HISTORY_SIZE/WS_HISTORY_BYTES pesan terakhir di memori,
+# dan jika WS_LOG_DIR diisi, log append-only di disk (lihat variabel environment WS_LOG_* di README)
+# Dengan FANOUT_ROLE=worker, log hanya ditulis oleh process ingest
+with startup.phase('init:history'):
+    history = message_history_from_env(with_log=fanout_role != fanout.ROLE_WORKER)
+
+# Mode multi-process (FANOUT_ROLE): process ingest melakukan subscribe MQTT dan decode, lalu mengirim frame
+# yang sudah diserialisasi ke process worker melalui Unix domain socket FANOUT_SOCKET; worker (misalnya
+# `uvicorn --workers N`) hanya melayani WebSocket. Pesan `POST /receive` pada worker diteruskan ke ingest
+frame_bus = None
+if fanout_role == fanout.ROLE_INGEST:
+    frame_bus = fanout.server_from_env(history, on_forward=lambda msg: ingest_message(msg, source="forwarded"))
+
+# Membuat instance ConnectionManager untuk mengelola koneksi WebSocket. Setiap client memiliki antrean
+# keluar sebesar WS_QUEUE_SIZE pesan; WS_OVERFLOW_POLICY menentukan tindakan ketika antrean client yang
+# lambat penuh (drop-oldest, drop-newest, atau disconnect)
+ws_manager = ConnectionManager(
+    queue_size=int(os.getenv("WS_QUEUE_SIZE") or 256),
+    overflow_policy=os.getenv("WS_OVERFLOW_POLICY") or "drop-oldest",
+    observe_broadcast=broadcast_seconds.observe,
+    observe_delivery=lambda seconds: tracker.observe("delivery", seconds),
+    history=history,
+    bus=frame_bus,
+)
+bus_client = fanout.client_from_env(ws_manager) if fanout_role == fanout.ROLE_WORKER else None
+
+# Hasil decode disimpan di cache LRU berdasarkan hash pesan (DECODE_CACHE_SIZE, DECODE_CACHE_BYTES), dan
+# pesan yang persis sama dalam DEDUP_WINDOW_MS milidetik tidak di-broadcast ulang (default nonaktif)
+decode_cache, duplicates = decode_cache_from_env()
+
+# Decode dijalankan di luar event loop: pesan kecil langsung, pesan sedang di thread pool, dan pesan
+# besar di process pool (lihat variabel environment DECODE_* di README)
+decoder = decode_executor_from_env(zwsp_mode, decode_cache)
+
+
+def is_duplicate(msg: str):
+    """
+    Menghitung key pesan (jika cache atau filter duplikat aktif) dan memeriksa apakah pesan merupakan duplikat.
+
+    Parameters:
+    msg (str): Pesan yang disandikan.
+
+    Returns:
+    tuple[bytes | None, bool]: Key pesan dan status duplikat.
+    """
+    if decode_cache is None and duplicates is None:
+        return None, False
+    key = message_key(msg)
+    return key, duplicates is not None and duplicates.is_duplicate(key)
+
+
+def message_data(msg: str, result: zwsp.DecodeResult, topic: str = None):
+    """
+    Membentuk data satu pesan yang dikirim ke client WebSocket.
+
+    Parameters:
+    msg (str): Pesan yang disandikan.
+    result (DecodeResult): Hasil decode pesan.
+    topic (str): Topik MQTT pesan (None untuk pesan dari `POST /receive`).
+
+    Returns:
+    dict: Data pesan.
+    """
+    hidden_msg, carrier_msg = result
+    # fmt: off
+    data = {
+            "encoded_message": msg,
+            "decoded_message": carrier_msg+hidden_msg,
+            "hidden_message": hidden_msg,
+            "carrier_message": carrier_msg,
+            "mode": mode_labels[result.mode],
+    }
+    if topic is not None:
+        data["topic"] = topic
+    return data
+
+
+# Pesan MQTT dapat dikumpulkan menjadi batch (INGEST_BATCH_SIZE pesan atau INGEST_MAX_DELAY_MS
+# milidetik) lalu dikirim sebagai satu frame WebSocket. None berarti mode per pesan (latensi terendah)
+batch_pipeline = batch_pipeline_from_env(decoder, ws_manager, message_data, tracker)
+
+registry.gauge('websocket_connections', 'Jumlah koneksi WebSocket aktif.',
+               fn=lambda: len(ws_manager.active_connections))
+registry.gauge('websocket_subscription_groups', 'Jumlah filter langganan berbeda di antara client WebSocket.',
+               fn=ws_manager.group_count)
+registry.gauge('websocket_queue_depth', 'Total pesan di antrean keluar semua client WebSocket.',
+               fn=lambda: sum(ws_manager.queue_depths()))
+registry.gauge('websocket_queue_depth_max', 'Antrean keluar terpanjang di antara client WebSocket.',
+               fn=lambda: max(ws_manager.queue_depths(), default=0))
+registry.counter('websocket_frames_sent_total', 'Jumlah frame WebSocket yang terkirim.',
+                 fn=lambda: ws_manager.sent_total)
+registry.counter('websocket_frames_dropped_total', 'Jumlah frame WebSocket yang dibuang karena antrean penuh.',
+                 fn=lambda: ws_manager.dropped_total)
+registry.counter('zwsp_decode_executor_total', 'Jumlah eksekusi decode per jalur.', ('path',),
+                 fn=lambda: {(path,): count for path, count in decoder.counts.items()})
+registry.counter('zwsp_decode_executor_seconds_total', 'Total waktu decode per jalur (termasuk menunggu slot).', ('path',),
+                 fn=lambda: {(path,): seconds for path, seconds in decoder.seconds.items()})
+registry.counter('zwsp_decode_errors_total', 'Jumlah pesan yang gagal didekode.', fn=lambda: decoder.errors)
+registry.gauge('zwsp_decode_executor_pending', 'Jumlah decode di pool yang belum selesai.', fn=lambda: decoder.pending)
+if decode_cache is not None:
+    registry.counter('zwsp_decode_cache_hits_total', 'Jumlah decode yang dilayani dari cache.', fn=lambda: decode_cache.hits)
+    registry.counter('zwsp_decode_cache_misses_total', 'Jumlah decode yang tidak ada di cache.', fn=lambda: decode_cache.misses)
+    registry.counter('zwsp_decode_cache_evictions_total', 'Jumlah entri cache yang dibuang.', fn=lambda: decode_cache.evictions)
+    registry.gauge('zwsp_decode_cache_entries', 'Jumlah entri cache decode.', fn=lambda: len(decode_cache))
+    registry.gauge('zwsp_decode_cache_bytes', 'Perkiraan ukuran cache decode (byte).', fn=lambda: decode_cache.bytes)
+if duplicates is not None:
+    registry.counter('zwsp_duplicates_suppressed_total', 'Jumlah pesan duplikat yang tidak di-broadcast ulang.',
+                     fn=lambda: duplicates.suppressed)
+if history is not None:
+    registry.gauge('websocket_history_seq', 'Nomor urut pesan WebSocket terakhir.', fn=lambda: history.seq)
+    registry.gauge('websocket_history_entries', 'Jumlah pesan di buffer replay.', fn=lambda: len(history.ring))
+    registry.gauge('websocket_history_bytes', 'Ukuran pesan di buffer replay (byte).', fn=lambda: history.ring.bytes)
+    registry.counter('websocket_replayed_total', 'Jumlah pesan yang dikirim ulang lewat replay.',
+                     fn=lambda: ws_manager.replayed_total)
+    if history.log is not None:
+        registry.counter('websocket_log_fsyncs_total', 'Jumlah fsync log pesan.', fn=lambda: history.log.fsyncs)
+if frame_bus is not None:
+    registry.gauge('fanout_workers', 'Jumlah process worker yang terhubung ke bus fan-out.', fn=frame_bus.worker_count)
+    registry.counter('fanout_frames_total', 'Jumlah frame yang dikirim ke worker.', fn=lambda: frame_bus.frames)
+    registry.counter('fanout_worker_disconnects_total', 'Jumlah worker lambat yang diputus.', fn=lambda: frame_bus.disconnects)
+    registry.counter('fanout_forwarded_total', 'Jumlah pesan `POST /receive` yang diteruskan worker.',
+                     fn=lambda: frame_bus.forwarded)
+if bus_client is not None:
+    registry.gauge('fanout_connected', '1 jika worker terhubung ke process ingest.', fn=lambda: int(bus_client.connected))
+    registry.counter('fanout_frames_received_total', 'Jumlah frame yang diterima dari process ingest.',
+                     fn=lambda: bus_client.frames)
+    registry.counter('fanout_reconnects_total', 'Jumlah koneksi ulang ke process ingest.', fn=lambda: bus_client.reconnects)
+if batch_pipeline is not None:
+    registry.counter('ingest_batches_total', 'Jumlah batch yang dikirim pipeline.', fn=lambda: batch_pipeline.batches)
+    registry.counter('ingest_batch_messages_total', 'Jumlah pesan yang dikirim dalam batch.', fn=lambda: batch_pipeline.messages)
+    registry.gauge('ingest_pending', 'Jumlah pesan yang sedang dikumpulkan menjadi batch.',
+                   fn=lambda: batch_pipeline.stats()['pending'])
 
 
 class CodedMessage(BaseModel):
@@ -73,6 +291,28 @@ def index():
     }
 
 
+@router.get("/metrics")
+def get_metrics():
+    """
+    Endpoint metrik runtime dalam format teks Prometheus.
+
+    Returns:
+    Response: Metrik receiver.
+    """
+    return Response(registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/trace")
+def get_trace():
+    """
+    Endpoint ringkasan latensi end-to-end: p50/p99 setiap tahap (milidetik) dan deteksi celah nomor urut.
+
+    Returns:
+    dict: Statistik dari LatencyTracker.
+    """
+    return tracker.stats()
+
+
 @router.post("/receive")
 async def receive_message(msg: CodedMessage):
     """
@@ -82,34 +322,46 @@ async def receive_message(msg: CodedMessage):
     msg (CodedMessage): Object CodedMessage yang berisi pesan yang disandikan.
 
     Returns:
-    dict: Status penerimaan dan data pesan yang telah didesandikan.
+    dict: Status penerimaan (`received`, atau `duplicate` jika pesan yang sama baru saja diterima dan
+    tidak di-broadcast ulang) dan data pesan yang telah didesandikan. Pada worker fan-out hanya status
+    `forwarded` (tanpa data), karena pesan didekode oleh process ingest.
+
+    Raises:
+    HTTPException: 503 jika process worker fan-out tidak terhubung ke process ingest.
     """
+    start = time.perf_counter()
+    messages_received.labels("http").inc()
+
+    # Worker fan-out tidak mendekode maupun menyiarkan sendiri: pesan diteruskan ke process ingest, yang
+    # mendekode dan mengirimkannya ke semua worker (hasilnya diterima client melalui `/ws`)
+    if bus_client is not None:
+        if not bus_client.forward(msg.message):
+            raise HTTPException(status_code=503, detail="Ingest process is not connected")
+        receive_seconds.labels("http").observe(time.perf_counter() - start)
+        return {"status" : "forwarded"}
+
+    key, duplicate = is_duplicate(msg.message)
 
     # Mendekode pesan
-    decoded_msg, carrier_msg = zwsp.decode(msg.message, zwsp.MODE_ZWSP)
+    result = await decoder.decode(msg.message, key)
 
     # Log informasi pesan untuk debugging
-    # fmt: off
-    logger.debug(f'\n Original message: {msg.message}\n Decoded secret message: {decoded_msg}')
+    logger.debug('\n Original message: %s\n Decoded secret message: %s', msg.message, result.hidden)
 
     # Mempersiapkan data untuk dikirimkan melalui WebSocket
-    data = {
-            "encoded_message": msg.message,
-            "decoded_message": carrier_msg+decoded_msg,
-            "hidden_message":decoded_msg,
-            "carrier_message": carrier_msg,
-    }
+    data = message_data(msg.message, result)
 
     # Mengirimkan data ke semua koneksi WebSocket yang terhubung
-    await ws_manager.broadcast_json(data)
+    if not duplicate:
+        await ws_manager.broadcast_json(data)
+    receive_seconds.labels("http").observe(time.perf_counter() - start)
 
     return {
-        "status" : "received",
+        "status" : "duplicate" if duplicate else "received",
         "data" : data,
     }
 
-@fast_mqtt.on_connect()
-def connect(client: MQTTClient, flags: int, rc: int, properties: Any):
+def connect(client: "MQTTClient", flags: int, rc: int, properties: Any):
     """
     Callback yang dipanggil ketika terhubung ke broker MQTT.
 
@@ -122,11 +374,10 @@ def connect(client: MQTTClient, flags: int, rc: int, properties: Any):
     Returns:
     None
     """
-    client.subscribe("zwsp") # Subscribe ke topik yg berjudul "zwsp"
-    logger.info(f"Connected: {client} | {flags} | {rc}, | {properties}")
+    client.subscribe(mqtt_subscription) # Subscribe ke topik "zwsp" beserta semua shard-nya
+    logger.info("Connected: %s | %s | %s, | %s", client, flags, rc, properties)
 
-@fast_mqtt.on_disconnect()
-def disconnect(client: MQTTClient, packet, exc=None):
+def disconnect(client: "MQTTClient", packet, exc=None):
     """
     Callback yang dipanggil ketika terputus dari broker MQTT.
 
@@ -139,8 +390,7 @@ def disconnect(client: MQTTClient, packet, exc=None):
     """
     logger.info("MQTT disconnected")
 
-@fast_mqtt.on_message()
-async def receive_message_mqtt(client: MQTTClient, topic: str, payload: bytes, qos:int, properties: Any):
+async def receive_message_mqtt(client: "MQTTClient", topic: str, payload: bytes, qos:int, properties: Any):
     """
     Callback yang dipanggil ketika pesan diterima dari broker MQTT.
 
@@ -154,29 +404,63 @@ async def receive_message_mqtt(client: MQTTClient, topic: str, payload: bytes, q
     Returns:
     None
     """
+    # Metadata trace dibaca dari user property MQTT v5 (None jika sender tidak mengirim trace)
+    trace = tracing.parse(properties, topic)
+    mqtt_payload_bytes.observe(len(payload))
 
     # Mendekode payload dari bytes ke string
     msg = payload.decode()
-    logger.info(f"Received message: {topic} | {msg} | {qos} | {properties}")
+    logger.debug("Received message: %s | %s | %s | %s", topic, msg, qos, properties)
+    await ingest_message(msg, topic, trace)
+
+async def ingest_message(msg: str, topic: str = None, trace=None, source: str = "mqtt"):
+    """
+    Mendekode pesan dan menyiarkannya ke client WebSocket (dan worker fan-out), untuk pesan MQTT maupun
+    pesan `POST /receive` yang diteruskan worker.
+
+    Parameters:
+    msg (str): Pesan yang disandikan.
+    topic (str): Topik MQTT pesan (None untuk pesan yang diteruskan worker).
+    trace (Trace): Metadata trace pesan (opsional).
+    source (str): Asal pesan untuk label metrik (`mqtt` atau `forwarded`).
+
+    Returns:
+    None
+    """
+    start = time.perf_counter()
+    messages_received.labels(source).inc()
+
+    # Pesan duplikat (misalnya redelivery QoS 1) tidak didekode maupun di-broadcast ulang
+    key, duplicate = is_duplicate(msg)
+    if duplicate:
+        logger.debug("Dropping duplicate message on %s", topic)
+        receive_seconds.labels(source).observe(time.perf_counter() - start)
+        return
+
+    # Mode batch: pesan hanya dimasukkan ke batch, decode dan broadcast dilakukan oleh pipeline
+    if batch_pipeline is not None:
+        batch_pipeline.submit(msg, trace, key, topic)
+        receive_seconds.labels(source).observe(time.perf_counter() - start)
+        return
 
     # Mendekode pesan yang dienkode menggunakan ZWSP
-    hidden_msg, carrier_msg = zwsp.decode(msg, zwsp.MODE_ZWSP)
-    decoded_msg = carrier_msg+hidden_msg
+    decode_start = time.perf_counter()
+    result = await decoder.decode(msg, key)
+    decode_end = time.perf_counter()
 
     # Mempersiapkan data untuk dikirimkan melalui WebSocket
-    # fmt: off
-    data = {
-            "encoded_message": msg,
-            "decoded_message":decoded_msg,
-            "hidden_message":hidden_msg,
-            "carrier_message": carrier_msg,
-    }
+    data = message_data(msg, result, topic)
 
     # Log informasi pesan untuk debugging
-    logger.debug(f'\nencoded_message: {msg}\ndecoded_message: {decoded_msg}\nhidden_message: {hidden_msg}\ncarrier_message: {carrier_msg}')
+    logger.debug('\nencoded_message: %s\ndecoded_message: %s\nhidden_message: %s\ncarrier_message: %s',
+                 msg, data["decoded_message"], data["hidden_message"], data["carrier_message"])
 
     # Mengirimkan data (dalam bentuk json) ke semua koneksi WebSocket yang terhubung
     await ws_manager.broadcast_json(data)
+    end = time.perf_counter()
+    receive_seconds.labels(source).observe(end - start)
+    if trace is not None:
+        tracker.record(trace, decode_start, decode_end, end)
 
 @router.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
@@ -189,13 +473,28 @@ async def websocket_endpoint(ws: WebSocket):
     Returns:
     None
     """
-    await ws_manager.connect(ws) # Menerima koneksi WebSocket
+    # Client dapat memilih format frame dengan query parameter, misalnya `/ws?format=msgpack`, dan meminta
+    # pesan yang terlewat sejak nomor urut tertentu, misalnya `/ws?since=1200`
+    try:
+        since = ws.query_params.get("since")
+        since = int(since) if since else None
+        await ws_manager.connect(ws, ws.query_params.get("format") or "json", since) # Menerima koneksi WebSocket
+    except ValueError:
+        await ws.close(code=1003) # Format frame atau nomor urut tidak didukung
+        return
     try:
-        # infinite loop diterapkan agar koneksi dua arah tetap terjaga
+        # infinite loop diterapkan agar koneksi dua arah tetap terjaga. Pesan dari client berupa filter
+        # langganan, misalnya {"type": "subscribe", "topics": ["zwsp/3"], "fields": ["hidden_message"]}
         while True:
-            await ws.receive() # Menunggu pesan dari WebSocket
+            message = await ws.receive() # Menunggu pesan dari WebSocket
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("text") or message.get("bytes")
+            if raw:
+                ws_manager.handle_message(ws, raw)
     except:
-        ws_manager.disconnect(ws) # Menghapus koneksi WebSocket jika terjadi kesalahan atau koneksi ditutup
+        pass
+    ws_manager.disconnect(ws) # Menghapus koneksi WebSocket jika terjadi kesalahan atau koneksi ditutup
 
 # Menyertakan router dalam aplikasi FastAPI
 app.include_router(router)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class BatchPipeline:
+    """
+    Tahap ingest yang mengumpulkan pesan MQTT sampai `batch_size` pesan atau `max_delay_ms` milidetik,
+    mendekode semuanya dalam satu kali `decode_many`, lalu mengirim satu frame WebSocket berisi
+    seluruh batch:
+
+        {"type": "batch", "count": n, "messages": [data, ...]}
+
+    Batch dikirim sesuai urutan kedatangan pesan.
+    """
+
+    def __init__(self, decoder, ws_manager, build, batch_size: int = 100, max_delay_ms: float = 10, tracker=None):
+        """
+        Inisialisasi objek BatchPipeline.
+
+        Parameters:
+        decoder (DecodeExecutor): Executor yang digunakan untuk decode.
+        ws_manager (ConnectionManager): Pengelola koneksi WebSocket tujuan broadcast.
+        build (Callable[[str, DecodeResult, str], dict]): Fungsi pembentuk data satu pesan untuk client
+            (pesan, hasil decode, topik).
+        batch_size (int): Jumlah pesan maksimal dalam satu batch.
+        max_delay_ms (float): Waktu tunggu maksimal (milidetik) sejak pesan pertama dalam batch.
+        tracker (LatencyTracker): Tracker opsional untuk latensi pesan yang membawa trace.
+
+        Raises:
+        ValueError: Jika `batch_size` < 1 atau `max_delay_ms` < 0.
+        """
+        if batch_size < 1 or max_delay_ms < 0:
+            raise ValueError('batch_size must be at least 1 and max_delay_ms must not be negative')
+
+        self.decoder = decoder
+        self.ws_manager = ws_manager
+        self.build = build
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.tracker = tracker
+
+        # Pesan yang sedang dikumpulkan: (pesan, trace, key cache, topik)
+        self._pending = []
+        self._timer = None
+        # Lock menjaga urutan batch ketika decode batch sebelumnya belum selesai
+        self._lock = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.messages = 0
+        self.errors = 0
+
+    def submit(self, msg: str, trace=None, key: bytes = None, topic: str = None):
+        """
+        Menambahkan pesan ke batch yang sedang dikumpulkan. Tidak menunggu decode maupun broadcast.
+
+        Parameters:
+        msg (str): Pesan yang disandikan.
+        trace (Trace): Metadata trace pesan (opsional).
+        key (bytes): Key pesan dari `message_key` jika sudah dihitung (opsional).
+        topic (str): Topik MQTT pesan (opsional).
+
+        Returns:
+        None
+        """
+        self._pending.append((msg, trace, key, topic))
+        if len(self._pending) >= self.batch_size:
+            self._flush_soon()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush_soon)
+
+    def _flush_soon(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._process(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _decode(self, batch):
+        """
+        Mendekode satu batch. Jika ada pesan yang rusak, batch didekode ulang per pesan agar pesan
+        lain tetap terkirim; pesan yang rusak dilewati.
+
+        Returns:
+        list[tuple[str, DecodeResult, str]]: Pesan, hasil decode, dan topik.
+        """
+        msgs = [msg for msg, _, _, _ in batch]
+        keys = [key for _, _, key, _ in batch]
+        topics = [topic for _, _, _, topic in batch]
+        try:
+            return list(zip(msgs, await self.decoder.decode_many(msgs, keys if all(keys) else None), topics))
+        except TypeError:
+            pass
+
+        decoded = []
+        for msg, _, key, topic in batch:
+            try:
+                decoded.append((msg, await self.decoder.decode(msg, key), topic))
+            except TypeError:
+                self.errors += 1
+                logger.warning('Dropping undecodable message (%d chars)', len(msg))
+        return decoded
+
+    async def _process(self, batch):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            decode_start = time.perf_counter()
+            decoded = await self._decode(batch)
+            decode_end = time.perf_counter()
+            if not decoded:
+                return
+            messages = [self.build(msg, result, topic) for msg, result, topic in decoded]
+            self.batches += 1
+            self.messages += len(messages)
+            logger.debug('Broadcasting batch of %d messages', len(messages))
+            await self.ws_manager.broadcast_json({
+                "type": "batch",
+                "count": len(messages),
+                "messages": messages,
+            })
+            if self.tracker is not None:
+                # Semua pesan dalam satu batch berbagi waktu decode dan fan-out yang sama
+                fanout_end = time.perf_counter()
+                for _, trace, _, _ in batch:
+                    if trace is not None:
+                        self.tracker.record(trace, decode_start, decode_end, fanout_end)
+
+    async def close(self):
+        """
+        Memproses sisa pesan dan menunggu semua batch selesai dikirim.
+
+        Returns:
+        None
+        """
+        self._flush_soon()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self):
+        """
+        Mengembalikan metrik pipeline.
+
+        Returns:
+        dict: Jumlah batch dan pesan yang dikirim, pesan yang sedang dikumpulkan, dan pesan yang gagal didekode.
+        """
+        return {
+            'batches': self.batches,
+            'messages': self.messages,
+            'pending': len(self._pending),
+            'errors': self.errors,
+        }
+
+
+def from_env(decoder, ws_manager, build, tracker=None):
+    """
+    Membuat BatchPipeline dari variabel environment `INGEST_BATCH_SIZE` dan `INGEST_MAX_DELAY_MS`.
+
+    Parameters:
+    decoder (DecodeExecutor): Executor yang digunakan untuk decode.
+    ws_manager (ConnectionManager): Pengelola koneksi WebSocket tujuan broadcast.
+    build (Callable[[str, DecodeResult, str], dict]): Fungsi pembentuk data satu pesan untuk client
+        (pesan, hasil decode, topik).
+    tracker (LatencyTracker): Tracker opsional untuk latensi pesan yang membawa trace.
+
+    Returns:
+    BatchPipeline | None: None jika `INGEST_BATCH_SIZE` tidak diatur atau bernilai 1 (mode per pesan).
+    """
+    batch_size = int(os.getenv("INGEST_BATCH_SIZE") or 1)
+    if batch_size <= 1:
+        return None
+    return BatchPipeline(
+        decoder, ws_manager, build,
+        batch_size=batch_size,
+        max_delay_ms=float(os.getenv("INGEST_MAX_DELAY_MS") or 10),
+        tracker=tracker,
+    )
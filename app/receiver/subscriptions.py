@@ -0,0 +1,175 @@
+import orjson
+
+# Field data pesan yang dapat dipilih client; `seq` (jika riwayat aktif) selalu disertakan
+FIELDS = ('encoded_message', 'decoded_message', 'hidden_message', 'carrier_message', 'mode', 'topic')
+
+# Jumlah hasil pencocokan topik yang diingat per filter
+_TOPIC_CACHE_SIZE = 1024
+
+
+def topic_matches(pattern: str, topic: str):
+    """
+    Mencocokkan topik MQTT dengan filter topik yang boleh memakai wildcard `+` (satu level) dan `#`
+    (level ini dan seterusnya, harus di akhir).
+
+    Parameters:
+    pattern (str): Filter topik, misalnya `zwsp/+` atau `zwsp/#`.
+    topic (str): Topik pesan.
+
+    Returns:
+    bool: True jika topik cocok.
+    """
+    pattern_levels = pattern.split('/')
+    topic_levels = topic.split('/')
+    for index, level in enumerate(pattern_levels):
+        if level == '#':
+            return True
+        if index >= len(topic_levels) or (level != '+' and level != topic_levels[index]):
+            return False
+    return len(pattern_levels) == len(topic_levels)
+
+
+def _valid_pattern(pattern):
+    if not isinstance(pattern, str) or not pattern:
+        return False
+    levels = pattern.split('/')
+    for index, level in enumerate(levels):
+        if ('#' in level or '+' in level) and len(level) > 1:
+            return False
+        if level == '#' and index != len(levels) - 1:
+            return False
+    return True
+
+
+class Subscription:
+    """
+    Filter langganan satu client WebSocket: topik MQTT (dengan wildcard), field yang dikirim, dan
+    predikat pesan (`has_hidden` dan `modes`). Filter dengan isi yang sama memiliki `key` yang sama,
+    sehingga ConnectionManager dapat menghitung proyeksi satu kali untuk semua client dengan filter itu.
+    """
+
+    def __init__(self, topics=None, fields=None, has_hidden: bool = None, modes=None):
+        """
+        Inisialisasi objek Subscription.
+
+        Parameters:
+        topics (Iterable[str]): Filter topik MQTT; None berarti semua pesan, termasuk pesan tanpa topik
+            (misalnya dari `POST /receive`).
+        fields (Iterable[str]): Field yang dikirim (lihat `FIELDS`); None berarti semua field.
+        has_hidden (bool): Jika diisi, hanya pesan yang memiliki (True) atau tidak memiliki (False) pesan rahasia.
+        modes (Iterable[str]): Nama mode ZWSP yang diterima; None berarti semua mode.
+
+        Raises:
+        ValueError: Jika ada filter topik atau field yang tidak valid.
+        """
+        for values in (topics, fields, modes):
+            if values is not None and not all(isinstance(value, str) for value in values):
+                raise ValueError('topics, fields and modes must contain strings')
+        self.topics = None if topics is None else tuple(sorted(set(topics)))
+        self.fields = None if fields is None else tuple(sorted(set(fields)))
+        self.has_hidden = has_hidden
+        self.modes = None if modes is None else frozenset(modes)
+        for pattern in self.topics or ():
+            if not _valid_pattern(pattern):
+                raise ValueError('Invalid topic filter: {0!r}'.format(pattern))
+        for field in self.fields or ():
+            if field not in FIELDS:
+                raise ValueError('Unknown field: {0!r}'.format(field))
+        if has_hidden is not None and not isinstance(has_hidden, bool):
+            raise ValueError('has_hidden must be a boolean')
+        self.key = (self.topics, self.fields, has_hidden, None if self.modes is None else tuple(sorted(self.modes)))
+        self._topic_cache = {}
+
+    def describe(self):
+        """
+        Mengembalikan isi filter untuk dikirim kembali ke client.
+
+        Returns:
+        dict: `topics`, `fields`, `has_hidden`, dan `modes`.
+        """
+        topics, fields, has_hidden, modes = self.key
+        return {
+            'topics': None if topics is None else list(topics),
+            'fields': None if fields is None else list(fields),
+            'has_hidden': has_hidden,
+            'modes': None if modes is None else list(modes),
+        }
+
+    def _topic_allowed(self, topic):
+        if topic is None:
+            return False
+        allowed = self._topic_cache.get(topic)
+        if allowed is None:
+            if len(self._topic_cache) >= _TOPIC_CACHE_SIZE:
+                self._topic_cache.clear()
+            allowed = self._topic_cache[topic] = any(topic_matches(pattern, topic) for pattern in self.topics)
+        return allowed
+
+    def _project(self, data: dict):
+        if self.topics is not None and not self._topic_allowed(data.get('topic')):
+            return None
+        if self.has_hidden is not None and bool(data.get('hidden_message')) != self.has_hidden:
+            return None
+        if self.modes is not None and data.get('mode') not in self.modes:
+            return None
+        if self.fields is None:
+            return data
+        projected = {field: data[field] for field in self.fields if field in data}
+        if 'seq' in data:
+            projected['seq'] = data['seq']
+        return projected
+
+    def apply(self, data: dict):
+        """
+        Menerapkan filter ke data broadcast (satu pesan atau frame batch dari BatchPipeline).
+
+        Parameters:
+        data (dict): Data broadcast.
+
+        Returns:
+        dict | None: Data hasil proyeksi, atau None jika tidak ada pesan yang lolos filter.
+        """
+        if data.get('type') != 'batch':
+            return self._project(data)
+        messages = [projected for projected in map(self._project, data['messages']) if projected is not None]
+        if not messages:
+            return None
+        frame = {'type': 'batch', 'count': len(messages), 'messages': messages}
+        if 'seq' in data:
+            frame['seq'] = data['seq']
+        return frame
+
+
+def parse(raw):
+    """
+    Membaca pesan kontrol dari client WebSocket:
+
+        {"type": "subscribe", "topics": [...], "fields": [...], "has_hidden": true, "modes": [...]}
+        {"type": "unsubscribe"}
+
+    Semua key selain `type` pada `subscribe` bersifat opsional.
+
+    Parameters:
+    raw (str | bytes): Pesan JSON dari client.
+
+    Returns:
+    Subscription | None: Filter baru, atau None untuk `unsubscribe` (kembali menerima semua pesan).
+
+    Raises:
+    ValueError: Jika pesan bukan JSON object, jenisnya tidak dikenal, atau filternya tidak valid.
+    """
+    try:
+        message = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
+        raise ValueError('Control message is not valid JSON') from exc
+    if not isinstance(message, dict):
+        raise ValueError('Control message must be a JSON object')
+    kind = message.get('type')
+    if kind == 'unsubscribe':
+        return None
+    if kind != 'subscribe':
+        raise ValueError('Unknown control message type: {0!r}'.format(kind))
+    for name in ('topics', 'fields', 'modes'):
+        if message.get(name) is not None and not isinstance(message[name], list):
+            raise ValueError('{0} must be a list'.format(name))
+    return Subscription(message.get('topics'), message.get('fields'), message.get('has_hidden'), message.get('modes'))
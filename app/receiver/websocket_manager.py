@@ -1,35 +1,328 @@
+import asyncio
+import logging
+import time
+import orjson
 from fastapi import WebSocket
-from typing import List
+from typing import Dict
+
+from . import subscriptions
+
+# msgpack bersifat opsional; tanpa msgpack, format `msgpack` tidak dapat dipilih client
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack bersifat opsional
+    msgpack = None
+
+# Kebijakan ketika antrean keluar sebuah koneksi penuh (client lambat)
+POLICY_DROP_OLDEST = 'drop-oldest'
+POLICY_DROP_NEWEST = 'drop-newest'
+POLICY_DISCONNECT = 'disconnect'
+OVERFLOW_POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_DISCONNECT)
+
+# Close code WebSocket untuk client yang diputus karena terlalu lambat ("Try Again Later")
+CLOSE_SLOW_CONSUMER = 1013
+
+# Format frame yang dapat dipilih client saat connect (`/ws?format=...`):
+# - json: frame teks JSON (default, kompatibel dengan UI)
+# - binary: JSON yang sama dalam frame binary (UTF-8), tanpa konversi ke str
+# - msgpack: frame binary MessagePack yang lebih ringkas (membutuhkan paket msgpack)
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'binary'
+FORMAT_MSGPACK = 'msgpack'
+FRAME_FORMATS = (FORMAT_JSON, FORMAT_BINARY, FORMAT_MSGPACK)
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def available_formats():
+    """
+    Mengembalikan format frame yang dapat digunakan pada environment ini.
+
+    Returns:
+    list[str]: Nama format.
+    """
+    return [fmt for fmt in FRAME_FORMATS if fmt != FORMAT_MSGPACK or msgpack is not None]
+
+
+def _replay_frame(payloads, fmt: str):
+    """
+    Menyusun satu frame replay `{"type": "replay", "count": n, "messages": [...]}` dari frame JSON
+    yang tersimpan di riwayat. Untuk format JSON, frame disusun dengan menggabungkan byte tanpa
+    serialisasi ulang.
+
+    Parameters:
+    payloads (list[bytes]): Frame JSON dari riwayat.
+    fmt (str): Format frame.
+
+    Returns:
+    str | bytes: Frame teks (str) atau frame binary (bytes).
+    """
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb({'type': 'replay', 'count': len(payloads),
+                              'messages': [orjson.loads(payload) for payload in payloads]})
+    encoded = b'{"type":"replay","count":%d,"messages":[%b]}' % (len(payloads), b','.join(payloads))
+    return encoded if fmt == FORMAT_BINARY else encoded.decode('utf-8')
+
+
+def _serialize(data, fmt: str):
+    """
+    Menserialisasi data ke frame siap kirim untuk format tertentu.
+
+    Parameters:
+    data (Any): Data yang dapat diserialisasi ke JSON.
+    fmt (str): Format frame.
+
+    Returns:
+    str | bytes: Frame teks (str) atau frame binary (bytes).
+    """
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(data)
+    encoded = orjson.dumps(data)
+    return encoded if fmt == FORMAT_BINARY else encoded.decode('utf-8')
+
+
+class _Connection:
+    """
+    State satu koneksi WebSocket: antrean keluar terbatas, writer task, dan counter.
+    """
+
+    def __init__(self, ws: WebSocket, queue_size: int, fmt: str):
+        self.ws = ws
+        self.format = fmt
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+        self.sent = 0
+        self.dropped = 0
+        self.replayed = 0
+        self.subscription = None
 
 
 class ConnectionManager:
     """
     Kelas untuk mengelola koneksi WebSocket.
+
+    Setiap koneksi memiliki antrean keluar terbatas dan writer task sendiri, sehingga broadcast hanya
+    memasukkan pesan ke antrean (O(1) per client) dan client yang lambat tidak menghambat client lain
+    maupun callback MQTT yang memanggil broadcast.
+
+    Jika `history` diberikan, setiap pesan JSON diberi nomor urut (`seq`) dan disimpan, sehingga client
+    yang connect dengan `since` menerima pesan yang terlewat (frame `replay`) sebelum pesan live.
+
+    Client dapat mengirim filter langganan (lihat `subscriptions.parse`). Koneksi dikelompokkan menurut
+    filter yang sama, sehingga proyeksi dan serialisasi dilakukan satu kali per filter per format,
+    bukan per koneksi.
     """
 
-    def __init__(self):
+    def __init__(self, queue_size: int = 256, overflow_policy: str = POLICY_DROP_OLDEST, observe_broadcast=None,
+                 observe_delivery=None, history=None, bus=None):
         """
         Inisialisasi objek ConnectionManager.
+
+        Parameters:
+        queue_size (int): Kapasitas antrean keluar setiap koneksi.
+        overflow_policy (str): Kebijakan ketika antrean penuh: `drop-oldest`, `drop-newest`, atau `disconnect`.
+        observe_broadcast (Callable[[float], None]): Fungsi opsional penerima durasi setiap broadcast (detik).
+        observe_delivery (Callable[[float], None]): Fungsi opsional penerima waktu setiap frame di antrean
+            sampai terkirim ke socket (detik).
+        history (MessageHistory): Riwayat pesan untuk replay (opsional).
+        bus (FrameBusServer): Bus frame ke process worker (opsional); setiap pesan JSON juga dikirim
+            ke semua worker dalam bentuk yang sudah diserialisasi.
+
+        Raises:
+        ValueError: Jika `queue_size` < 1 atau `overflow_policy` tidak dikenal.
         """
+        if queue_size < 1:
+            raise ValueError('queue_size must be at least 1')
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError('Unknown overflow policy: {0}'.format(overflow_policy))
 
-        # Konstruktor `__init__` menginisialisasi active_connections sebagai daftar kosong untuk menyimpan koneksi WebSocket yang aktif.
-        self.active_connections: List[WebSocket] = []
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.observe_broadcast = observe_broadcast
+        self.observe_delivery = observe_delivery
+        self.history = history
+        self.bus = bus
+        # Koneksi WebSocket yang aktif beserta state-nya (urutan sesuai waktu connect)
+        self.active_connections: Dict[WebSocket, _Connection] = {}
+        # Koneksi yang dikelompokkan menurut key filter (None berarti tanpa filter):
+        # key -> (Subscription, {WebSocket: _Connection})
+        self._groups = {None: (None, {})}
+        # Total frame terkirim/dibuang, termasuk koneksi yang sudah ditutup
+        self.sent_total = 0
+        self.dropped_total = 0
+        self.replayed_total = 0
 
-    async def connect(self, ws: WebSocket):
+    async def connect(self, ws: WebSocket, fmt: str = FORMAT_JSON, since: int = None):
         """
-        Menerima dan menambahkan koneksi WebSocket baru.
+        Menerima dan menambahkan koneksi WebSocket baru, lalu menjalankan writer task-nya.
+
+        Jika `since` diberikan, writer task lebih dulu mengirim semua pesan dengan nomor urut setelah
+        `since` sampai nomor urut saat connect (dalam frame `replay`), diikuti frame
+        `{"type": "replay_done", "seq": ..., "missed": ...}`, lalu pesan live. Pesan live selama replay
+        menunggu di antrean koneksi, sehingga tidak ada pesan yang terlewat atau terkirim dua kali
+        (kecuali antrean penuh dan dibuang sesuai kebijakan overflow).
 
         Parameters:
         ws (WebSocket): Koneksi WebSocket yang diterima.
+        fmt (str): Format frame untuk pesan broadcast JSON (`json`, `binary`, atau `msgpack`).
+        since (int): Nomor urut pesan terakhir yang sudah diterima client (opsional).
 
         Returns:
         None
+
+        Raises:
+        ValueError: Jika format tidak dikenal atau tidak tersedia, atau `since` diberikan tanpa riwayat
+            atau bernilai negatif. Koneksi tidak diterima.
         """
+        if fmt not in available_formats():
+            raise ValueError('Unsupported frame format: {0}'.format(fmt))
+        if since is not None and (self.history is None or since < 0):
+            raise ValueError('Replay is not available' if self.history is None else 'since must not be negative')
 
         # await `ws.accept()` digunakan untuk menerima koneksi WebSocket.
         await ws.accept()
-        # Koneksi yang diterima ditambahkan ke daftar `active_connections`
-        self.active_connections.append(ws)
+        conn = _Connection(ws, self.queue_size, fmt)
+        # Nomor urut dibaca bersamaan dengan pendaftaran koneksi (tanpa await di antaranya): pesan sampai
+        # nomor ini dikirim lewat replay, pesan setelahnya lewat antrean
+        upto = self.history.seq if since is not None else None
+        conn.task = asyncio.create_task(self._writer(conn, since, upto))
+        self.active_connections[ws] = conn
+        self._groups[None][1][ws] = conn
+
+    def _ungroup(self, conn: _Connection):
+        key = None if conn.subscription is None else conn.subscription.key
+        group = self._groups.get(key)
+        if group is not None:
+            group[1].pop(conn.ws, None)
+            if key is not None and not group[1]:
+                del self._groups[key]
+
+    def subscribe(self, ws: WebSocket, subscription):
+        """
+        Mengganti filter langganan sebuah koneksi. Koneksi dipindahkan ke kelompok dengan filter yang sama
+        (objek Subscription dipakai bersama), lalu frame konfirmasi
+        `{"type": "subscribed", "filter": ...}` dikirim lewat antrean koneksi.
+
+        Parameters:
+        ws (WebSocket): Koneksi WebSocket.
+        subscription (Subscription | None): Filter baru; None berarti semua pesan.
+
+        Returns:
+        None
+        """
+        conn = self.active_connections.get(ws)
+        if conn is None:
+            return
+        self._ungroup(conn)
+        key = None if subscription is None else subscription.key
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = (subscription, {})
+        conn.subscription = group[0]
+        group[1][ws] = conn
+        ack = {'type': 'subscribed', 'filter': None if subscription is None else subscription.describe()}
+        self._enqueue(conn, _serialize(ack, conn.format), time.perf_counter())
+
+    def handle_message(self, ws: WebSocket, raw):
+        """
+        Memproses pesan kontrol dari client (`subscribe` atau `unsubscribe`). Pesan yang tidak valid
+        dijawab dengan frame `{"type": "error", "message": ...}`.
+
+        Parameters:
+        ws (WebSocket): Koneksi WebSocket pengirim.
+        raw (str | bytes): Pesan dari client.
+
+        Returns:
+        None
+        """
+        try:
+            subscription = subscriptions.parse(raw)
+        except ValueError as exc:
+            conn = self.active_connections.get(ws)
+            if conn is not None:
+                self._enqueue(conn, _serialize({'type': 'error', 'message': str(exc)}, conn.format), time.perf_counter())
+            return
+        self.subscribe(ws, subscription)
+
+    async def _replay(self, conn: _Connection, since: int, upto: int):
+        """
+        Mengirim pesan dari riwayat dengan nomor urut di antara (`since`, `upto`] ke satu koneksi.
+        """
+        async for chunk in self.history.replay(since, upto):
+            payloads = [payload for _, payload in chunk]
+            if conn.subscription is not None:
+                # Riwayat menyimpan pesan lengkap, sehingga filter diterapkan ulang untuk client berfilter
+                payloads = [orjson.dumps(data) for data in
+                            map(conn.subscription.apply, map(orjson.loads, payloads)) if data is not None]
+            conn.replayed += len(chunk)
+            self.replayed_total += len(chunk)
+            if not payloads:
+                continue
+            frame = _replay_frame(payloads, conn.format)
+            if isinstance(frame, str):
+                await conn.ws.send_text(frame)
+            else:
+                await conn.ws.send_bytes(frame)
+        done = {'type': 'replay_done', 'seq': upto, 'missed': max(0, upto - since - conn.replayed)}
+        frame = _serialize(done, conn.format)
+        if isinstance(frame, str):
+            await conn.ws.send_text(frame)
+        else:
+            await conn.ws.send_bytes(frame)
+
+    async def _writer(self, conn: _Connection, since: int = None, upto: int = None):
+        """
+        Mengirim replay (jika diminta), lalu pesan dari antrean koneksi secara berurutan sampai koneksi
+        ditutup atau gagal.
+        """
+        try:
+            if since is not None:
+                await self._replay(conn, since, upto)
+            while True:
+                frame, enqueued = await conn.queue.get()
+                # Frame sudah diserialisasi saat broadcast, sehingga dikirim apa adanya
+                if isinstance(frame, str):
+                    await conn.ws.send_text(frame)
+                else:
+                    await conn.ws.send_bytes(frame)
+                conn.sent += 1
+                self.sent_total += 1
+                if self.observe_delivery is not None:
+                    self.observe_delivery(time.perf_counter() - enqueued)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Socket mati (client menutup koneksi, jaringan putus, dst.): koneksi dibuang dari daftar
+            logger.debug('WebSocket send failed, dropping connection: %r', exc)
+            if self.active_connections.pop(conn.ws, None) is not None:
+                self._ungroup(conn)
+
+    async def _close_slow(self, conn: _Connection):
+        try:
+            await conn.ws.close(code=CLOSE_SLOW_CONSUMER)
+        except Exception:
+            pass
+
+    def _enqueue(self, conn: _Connection, msg, enqueued: float):
+        """
+        Memasukkan pesan beserta waktu masuk antrean ke antrean koneksi tanpa menunggu, sesuai kebijakan overflow.
+        """
+        queue = conn.queue
+        msg = (msg, enqueued)
+        if not queue.full():
+            queue.put_nowait(msg)
+            return
+
+        conn.dropped += 1
+        self.dropped_total += 1
+        if self.overflow_policy == POLICY_DROP_OLDEST:
+            queue.get_nowait()
+            queue.put_nowait(msg)
+        elif self.overflow_policy == POLICY_DISCONNECT:
+            logger.info('Disconnecting slow WebSocket client (%d messages queued)', queue.qsize())
+            self.disconnect(conn.ws)
+            asyncio.create_task(self._close_slow(conn))
+        # POLICY_DROP_NEWEST: pesan baru diabaikan
 
     async def send_text(self, ws: WebSocket, msg: str):
         """
@@ -63,7 +356,8 @@ class ConnectionManager:
 
     async def broadcast_text(self, msg: str):
         """
-        Menyiarkan pesan teks ke semua koneksi WebSocket yang aktif.
+        Menyiarkan pesan teks ke semua koneksi WebSocket yang aktif. Pesan hanya dimasukkan ke antrean
+        setiap koneksi; pengiriman dilakukan oleh writer task masing-masing.
 
         Parameters:
         msg (str): Pesan teks yang akan disiarkan.
@@ -72,28 +366,91 @@ class ConnectionManager:
         None
         """
 
-        #  Bagian ini mengiterasi semua koneksi dalam `active_connections` dan mengirim pesan teks ke setiap koneksi menggunakan `await self.send_text(conn, msg)`.
-        for conn in self.active_connections:
-            await self.send_text(conn, msg)
+        # Salinan daftar diperlukan karena kebijakan `disconnect` dapat menghapus koneksi selama iterasi
+        enqueued = time.perf_counter()
+        for conn in list(self.active_connections.values()):
+            self._enqueue(conn, msg, enqueued)
+
+    async def broadcast_json(self, json_str_msg):
+        """
+        Menyiarkan pesan berbentuk data JSON ke semua koneksi WebSocket yang aktif. Pesan
+        diserialisasi satu kali per format frame (dengan orjson), lalu objek frame yang sama
+        dimasukkan ke antrean setiap koneksi; pengiriman dilakukan oleh writer task masing-masing.
+        Jika riwayat aktif, salinan pesan diberi key `seq` dan disimpan ke riwayat (`json_str_msg` tidak
+        diubah). Untuk koneksi berfilter, proyeksi dihitung satu kali per kelompok filter; kelompok yang
+        tidak lolos filter dilewati.
+
+        Parameters:
+        json_str_msg (dict): Pesan JSON yang akan disiarkan.
+
+        Returns:
+        None
+        """
+
+        start = time.perf_counter()
+        encoded = None
+        if self.history is not None:
+            json_str_msg, encoded = self.history.append(json_str_msg)
+        if self.bus is not None:
+            if encoded is None:
+                encoded = orjson.dumps(json_str_msg)
+            self.bus.publish(encoded, self.history.seq if self.history is not None else 0)
+        self._fanout(json_str_msg, encoded, start)
+        if self.observe_broadcast is not None:
+            self.observe_broadcast(time.perf_counter() - start)
 
-    async def broadcast_json(self, json_str_msg: str):
+    async def broadcast_frame(self, encoded: bytes, seq: int = 0):
         """
-        Menyiarkan pesan berbentuk data JSON ke semua koneksi WebSocket yang aktif.
+        Menyiarkan frame JSON yang sudah diserialisasi (misalnya dari process ingest) ke semua koneksi
+        WebSocket yang aktif. Frame hanya di-parse jika ada koneksi berfilter atau berformat msgpack.
 
         Parameters:
-        json_str_msg (str): Pesan JSON yang akan disiarkan.
+        encoded (bytes): Frame JSON.
+        seq (int): Nomor urut frame (0 jika tidak ada); disimpan ke riwayat untuk replay.
 
         Returns:
         None
         """
+        start = time.perf_counter()
+        if self.history is not None and seq:
+            self.history.add(seq, encoded)
+        self._fanout(None, encoded, start)
+        if self.observe_broadcast is not None:
+            self.observe_broadcast(time.perf_counter() - start)
 
-        # Bagian ini mengiterasi semua koneksi dalam active_connections dan mengirim pesan berformat JSON ke setiap koneksi menggunakan `await self.send_json(conn, json_str_msg)`.
-        for conn in self.active_connections:
-            await self.send_json(conn, json_str_msg)
+    def _fanout(self, data, encoded, start: float):
+        """
+        Memasukkan frame ke antrean semua koneksi, satu serialisasi per kelompok filter dan format.
+        `data` (dict) atau `encoded` (JSON bytes) boleh None; yang lain dibentuk jika dibutuhkan.
+        """
+        base_frames = {}
+        if encoded is not None:
+            base_frames[FORMAT_BINARY] = encoded
+            base_frames[FORMAT_JSON] = encoded.decode('utf-8')
+        # Salinan daftar diperlukan karena kebijakan `disconnect` dapat menghapus koneksi selama iterasi
+        for subscription, conns in list(self._groups.values()):
+            if not conns:
+                continue
+            if subscription is None:
+                projected, frames = data, base_frames
+            else:
+                if data is None:
+                    data = orjson.loads(encoded)
+                projected, frames = subscription.apply(data), {}
+                if projected is None:
+                    continue
+            for conn in list(conns.values()):
+                frame = frames.get(conn.format)
+                if frame is None:
+                    if projected is None:
+                        data = projected = orjson.loads(encoded)
+                    frame = frames[conn.format] = _serialize(projected, conn.format)
+                self._enqueue(conn, frame, start)
 
     def disconnect(self, ws: WebSocket):
         """
-        Menghapus koneksi WebSocket dari daftar koneksi aktif.
+        Menghapus koneksi WebSocket dari daftar koneksi aktif dan menghentikan writer task-nya.
+        Aman dipanggil lebih dari sekali untuk koneksi yang sama.
 
         Parameters:
         ws (WebSocket): Koneksi WebSocket yang akan dihapus.
@@ -101,6 +458,57 @@ class ConnectionManager:
         Returns:
         None
         """
+        conn = self.active_connections.pop(ws, None)
+        if conn is not None:
+            self._ungroup(conn)
+        if conn is not None and conn.task is not None and conn.task is not asyncio.current_task():
+            conn.task.cancel()
+
+    async def close(self):
+        """
+        Menghentikan semua writer task (dipanggil saat aplikasi dimatikan).
+
+        Returns:
+        None
+        """
+        tasks = [conn.task for conn in self.active_connections.values() if conn.task is not None]
+        self.active_connections.clear()
+        self._groups = {None: (None, {})}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        """
+        Mengembalikan statistik setiap koneksi aktif.
 
-        # `self.active_connections.remove(ws)` digunakan untuk menghapus koneksi yang diberikan dari daftar koneksi aktif
-        self.active_connections.remove(ws)
+        Returns:
+        list[dict]: `client`, `format`, `filter`, `queued`, `sent`, `dropped`, dan `replayed` untuk setiap koneksi.
+        """
+        return [{
+            'client': str(getattr(ws, 'client', None)),
+            'format': conn.format,
+            'filter': None if conn.subscription is None else conn.subscription.describe(),
+            'queued': conn.queue.qsize(),
+            'sent': conn.sent,
+            'dropped': conn.dropped,
+            'replayed': conn.replayed,
+        } for ws, conn in self.active_connections.items()]
+
+    def group_count(self):
+        """
+        Mengembalikan jumlah kelompok filter yang memiliki koneksi aktif.
+
+        Returns:
+        int: Jumlah filter berbeda (termasuk kelompok tanpa filter).
+        """
+        return sum(1 for _, conns in self._groups.values() if conns)
+
+    def queue_depths(self):
+        """
+        Mengembalikan jumlah pesan di antrean setiap koneksi aktif.
+
+        Returns:
+        list[int]: Panjang antrean setiap koneksi.
+        """
+        return [conn.queue.qsize() for conn in self.active_connections.values()]
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+
+import orjson
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+import zwsp
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse yang membaca body request di dalam iteratornya (misalnya hasil `read_body`).
+
+    StreamingResponse bawaan starlette menjalankan `listen_for_disconnect(receive)` bersamaan dengan
+    iterator, sehingga task tersebut mengambil pesan `http.request` berisi body dan iterator menunggu
+    selamanya. Response ini tidak memanggil `receive` sendiri: body hanya dibaca oleh iterator, dan client
+    yang terputus saat upload terdeteksi sebagai ClientDisconnect dari `request.stream()`.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except ClientDisconnect:
+            logger.info('Client disconnected during streaming upload')
+            return
+        if self.background is not None:
+            await self.background()
+
+
+async def _prepend(first: bytes, chunks):
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+async def read_body(chunks, max_array_bytes: int, max_line_bytes: int):
+    """
+    Membaca body request berupa JSON array atau NDJSON (satu item JSON per baris) secara bertahap.
+
+    JSON array harus dibaca utuh sehingga ukurannya dibatasi `max_array_bytes`; NDJSON diproses per baris
+    sehingga upload sebesar apa pun hanya membutuhkan memori sebesar satu potongan data.
+
+    Parameters:
+    chunks (AsyncIterator[bytes]): Potongan body request.
+    max_array_bytes (int): Ukuran maksimal body JSON array.
+    max_line_bytes (int): Panjang maksimal satu baris NDJSON.
+
+    Returns:
+    AsyncIterator[Any]: Item hasil parsing; baris NDJSON yang tidak valid menghasilkan objek ValueError.
+
+    Raises:
+    ValueError: Jika JSON array tidak valid atau melebihi `max_array_bytes`.
+    """
+    # Karakter pertama yang bukan spasi menentukan format body
+    first = b''
+    async for chunk in chunks:
+        first += chunk
+        if first.strip():
+            break
+    first = first.lstrip()
+
+    if first.startswith(b'['):
+        body = bytearray(first)
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > max_array_bytes:
+                raise ValueError('JSON array body exceeds {0} bytes, use NDJSON instead'.format(max_array_bytes))
+        items = orjson.loads(body)
+        del body
+        for item in items:
+            yield item
+        return
+
+    pending = b''
+    async for chunk in _prepend(first, chunks):
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        if len(pending) > max_line_bytes:
+            raise ValueError('NDJSON line exceeds {0} bytes'.format(max_line_bytes))
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if pending.strip():
+        yield _parse_line(pending)
+
+
+def _parse_line(line: bytes):
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as exc:
+        return ValueError('Invalid JSON line: {0}'.format(exc))
+
+
+def _message_of(item, field: str):
+    """
+    Mengambil pesan, pesan rahasia (opsional), dan key shard dari satu item: string, atau objek dengan
+    key `field` serta key `hidden` dan `key` opsional.
+    """
+    if isinstance(item, Exception):
+        raise item
+    if isinstance(item, str):
+        return item, None, item
+    if isinstance(item, dict) and isinstance(item.get(field), str):
+        hidden = item.get('hidden')
+        key = item.get('key')
+        return item[field], None if hidden is None else str(hidden), item[field] if key is None else str(key)
+    raise ValueError('Item must be a string or an object with a string "{0}" field'.format(field))
+
+
+def _encode_hidden(hidden_msgs, mode, compression):
+    # Kompresi hanya tersedia di `encode` per pesan; tanpa kompresi digunakan `encode_many`
+    if compression is not None:
+        return [zwsp.encode(hidden, mode, compression) for hidden in hidden_msgs]
+    return zwsp.encode_many(hidden_msgs, mode)
+
+
+async def send_items(items, hidden_source, publish, mode, compression=None, field: str = 'message',
+                     topic_for=None, qos: int = 0, chunk_size: int = 256):
+    """
+    Mengenkode dan mengirim item secara bertahap per `chunk_size` item, lalu menghasilkan hasil per item
+    sebagai baris NDJSON. Baris terakhir berisi ringkasan (`summary`) termasuk throughput.
+
+    Pesan rahasia default (nilai terbaru dari `hidden_source`) dienkode satu kali per chunk; item dengan
+    key `hidden` dienkode bersama dengan `zwsp.encode_many`.
+
+    Parameters:
+    items (AsyncIterator[Any]): Item dari `read_body`.
+    hidden_source (CachedSource): Sumber pesan rahasia default.
+    publish (Callable[[str, str, int], Any]): Fungsi publish MQTT (topik, payload, qos).
+    mode (int): Mode encoding ZWSP.
+    compression (str): Codec kompresi (hanya untuk MODE_PACKED).
+    field (str): Nama key pesan pada item berbentuk objek.
+    topic_for (Callable[[str], str]): Fungsi penentu topik MQTT dari key pesan.
+    qos (int): QoS MQTT (0, 1, atau 2).
+    chunk_size (int): Jumlah item yang diproses sekaligus.
+
+    Returns:
+    AsyncIterator[bytes]: Baris NDJSON hasil setiap item dan ringkasan.
+    """
+    topic_for = topic_for or (lambda key: 'zwsp')
+    start = time.perf_counter()
+    count = sent = 0
+
+    async def flush(chunk, first_index):
+        nonlocal sent
+        default_hidden = await hidden_source.get()
+        default_encoded = None
+        hidden_msgs = [hidden for _, hidden, _ in chunk if hidden is not None]
+        encoded_iter = iter(_encode_hidden(hidden_msgs, mode, compression) if hidden_msgs else [])
+
+        lines = []
+        for offset, (msg, hidden, key) in enumerate(chunk):
+            index = first_index + offset
+            if isinstance(msg, Exception):
+                lines.append(orjson.dumps({"index": index, "status": "error", "error": str(msg)}))
+                continue
+            if hidden is None:
+                if default_encoded is None:
+                    default_encoded = zwsp.encode(default_hidden, mode, compression)
+                encoded = default_encoded
+            else:
+                encoded = next(encoded_iter)
+            assemble_msg = msg + encoded
+            # Publish gmqtt tidak menunggu PUBACK, sehingga publish dalam satu chunk berjalan pipelined
+            publish(topic_for(key), assemble_msg, qos)
+            sent += 1
+            lines.append(orjson.dumps({"index": index, "status": "sent", "encoded_message": assemble_msg}))
+        # Memberi kesempatan event loop mengirim data di socket MQTT sebelum chunk berikutnya
+        await asyncio.sleep(0)
+        return b'\n'.join(lines) + b'\n'
+
+    chunk = []
+    try:
+        async for item in items:
+            try:
+                chunk.append(_message_of(item, field))
+            except ValueError as exc:
+                chunk.append((exc, None, None))
+            count += 1
+            if len(chunk) >= chunk_size:
+                yield await flush(chunk, count - len(chunk))
+                chunk = []
+        if chunk:
+            yield await flush(chunk, count - len(chunk))
+        error = None
+    except ValueError as exc:
+        # Body tidak valid di tengah stream (misalnya baris NDJSON terlalu panjang)
+        error = str(exc)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "count": count,
+        "sent": sent,
+        "errors": count - sent,
+        "seconds": elapsed,
+        "msgs_per_s": sent / elapsed if elapsed > 0 else 0.0,
+    }
+    if error is not None:
+        summary["error"] = error
+    logger.info('Batch send: %d/%d messages in %.3fs (%.0f msg/s)', sent, count, elapsed, summary["msgs_per_s"])
+    yield orjson.dumps({"summary": summary}) + b'\n'
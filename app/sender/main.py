@@ -1,50 +1,134 @@
-from fastapi import FastAPI, APIRouter
-from fastapi.middleware.cors import CORSMiddleware
-from typing import Any
-from pydantic import BaseModel
+from ..common.startup import Lazy, StartupTimer
+
+# Durasi setiap tahap startup dicatat sejak modul ini mulai diimport (lihat `startup_phase_seconds` di `/metrics`)
+startup = StartupTimer()
+
+with startup.phase('import:fastapi'):
+    from fastapi import FastAPI, APIRouter, Request, Query, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel
+from typing import Any, Optional, TYPE_CHECKING
 import logging
 from contextlib import asynccontextmanager
-from gmqtt import Client as MQTTClient
-from fastapi_mqtt import FastMQTT, MQTTConfig
 from dotenv import load_dotenv
 import os
-import random
-from firebase_admin import credentials, initialize_app, db
-from pathlib import Path
+import time
 
-import zwsp
+with startup.phase('import:zwsp'):
+    import zwsp
+from . import bulk, sources, topics
+from ..common import metrics, tracing
+
+if TYPE_CHECKING:
+    from gmqtt import Client as MQTTClient
 
 # Load variabel environment dari file .env
 load_dotenv(override=True)
 
+# Mode encoding ZWSP yang digunakan (zwsp, full, atau packed), default-nya MODE_ZWSP
+zwsp_mode = zwsp.MODE_NAMES[os.getenv("ZWSP_MODE") or "zwsp"]
+# Codec kompresi sebelum encoding (none, zlib, lzma, zdict, atau auto); hanya untuk mode packed
+zwsp_compression = os.getenv("ZWSP_COMPRESSION") or None
+if zwsp_compression is not None and zwsp_mode != zwsp.MODE_PACKED:
+    raise ValueError("ZWSP_COMPRESSION requires ZWSP_MODE=packed")
+
 # Mengatur logger untuk debugging
+# Semua log memakai format lazy (`%s`), sehingga level yang tidak aktif (misalnya LOG_LEVEL=INFO di
+# produksi) tidak memformat isi pesan sama sekali
 logger = logging.getLogger('uvicorn.error')
-logger.setLevel(logging.DEBUG)
-
-# Konfigurasi MQTT
-mqtt_config = MQTTConfig(
-    host=os.getenv("MQTT_HOST", "0.0.0.0"),
-    port=int(os.getenv("MQTT_PORT", 1883)),
-    keepalive=60,
-    username=os.getenv("MQTT_USERNAME", "admin"),
-    password=os.getenv("MQTT_PASSWORD", "hivemq"),
-    ssl=False,
-)
+logger.setLevel(os.getenv("LOG_LEVEL") or "DEBUG")
+
+# Metrik runtime untuk endpoint `/metrics` (format teks Prometheus)
+registry = metrics.Registry()
+metrics.instrument_zwsp(registry, zwsp)
+messages_published = registry.counter(
+    'zwsp_messages_published_total', 'Jumlah pesan yang dipublish ke MQTT.', ('endpoint',))
+publish_seconds = registry.histogram('mqtt_publish_seconds', 'Waktu pemanggilan publish MQTT.')
+payload_chars = registry.histogram(
+    'mqtt_payload_chars', 'Panjang pesan yang dipublish (karakter).', buckets=metrics.SIZE_BUCKETS)
+send_seconds = registry.histogram('zwsp_send_seconds', 'Waktu penanganan `/send` (ambil nilai, encode, publish).')
+
+
+def _create_mqtt():
+    """
+    Membuat client MQTT dan mendaftarkan callback-nya. Dipanggil saat lifespan dimulai (atau publish
+    pertama), sehingga import modul ini tidak mengimport fastapi_mqtt/gmqtt.
+
+    Returns:
+    FastMQTT: Client MQTT.
+    """
+    from fastapi_mqtt import FastMQTT, MQTTConfig
+
+    # Konfigurasi MQTT
+    mqtt_config = MQTTConfig(
+        host=os.getenv("MQTT_HOST", "0.0.0.0"),
+        port=int(os.getenv("MQTT_PORT", 1883)),
+        keepalive=60,
+        username=os.getenv("MQTT_USERNAME", "admin"),
+        password=os.getenv("MQTT_PASSWORD", "hivemq"),
+        ssl=False,
+    )
+    client = FastMQTT(config=mqtt_config)
+    client.on_connect()(connect)
+    client.on_disconnect()(disconnect)
+    return client
+
+fast_mqtt = Lazy('mqtt', _create_mqtt, startup)
+
+# Sumber pesan rahasia (suhu terakhir) dengan cache: firebase (default), file, atau sqlite. Nilai diperbarui
+# di background sehingga `/send` tidak menunggu query ke database (lihat HIDDEN_* di README). Koneksi ke
+# backend (misalnya inisialisasi Firebase) baru dibuat saat pengambilan pertama di lifespan
+with startup.phase('init:hidden_source'):
+    hidden_source = sources.from_env()
+
+# Topik MQTT tujuan: MQTT_TOPIC (default "zwsp"), atau `<MQTT_TOPIC>/<shard>` jika MQTT_TOPIC_SHARDS > 0
+# sehingga beberapa receiver dalam satu shared subscription dapat membagi beban decode
+topic_router = topics.from_env()
+
+# Metadata trace (ID sender, nomor urut per topik, dan waktu publish) dikirim sebagai user property MQTT v5
+# jika TRACE_ENABLED diaktifkan, sehingga receiver dapat mengukur latensi end-to-end (lihat `/trace` receiver)
+trace_stamper = tracing.stamper_from_env()
+
+registry.gauge('hidden_value_age_seconds', 'Umur nilai pesan rahasia di cache (-1 jika belum ada).',
+               fn=lambda: -1 if hidden_source.age() is None else hidden_source.age())
+startup.register_metrics(registry)
+registry.counter('hidden_cache_events_total', 'Kejadian cache pesan rahasia.', ('event',),
+                 fn=lambda: {(event,): getattr(hidden_source, event)
+                             for event in ('hits', 'refreshes', 'pushes', 'errors', 'stale_served')})
+
+
+def publish(topic: str, payload: str, qos: int = 0, endpoint: str = "send"):
+    """
+    Mempublish pesan ke MQTT sambil mencatat metrik.
+
+    Parameters:
+    topic (str): Topik MQTT.
+    payload (str): Pesan yang sudah disandikan.
+    qos (int): QoS MQTT.
+    endpoint (str): Nama endpoint asal pesan untuk label metrik.
 
-fast_mqtt = FastMQTT(config=mqtt_config)
+    Returns:
+    None
+    """
+    start = time.perf_counter()
+    if trace_stamper is None:
+        fast_mqtt.get().publish(topic, payload, qos=qos)
+    else:
+        fast_mqtt.get().publish(topic, payload, qos=qos, user_property=trace_stamper.properties(topic))
+    publish_seconds.observe(time.perf_counter() - start)
+    messages_published.labels(endpoint).inc()
+    payload_chars.observe(len(payload))
 
-fb_creds_loc = Path('firebase_service_account.json').resolve()
-cred = credentials.Certificate(fb_creds_loc)
-fb_default_app = initialize_app(cred, {
-    'databaseURL': os.getenv('FIREBASE_DB_URL')
-})
-db_ref = db.reference('/Temp')
+# Batas ukuran upload `/send/batch`: body JSON array dibaca utuh, sedangkan NDJSON diproses per baris
+send_batch_max_array_bytes = int(os.getenv("SEND_BATCH_MAX_ARRAY_BYTES") or 16 * 1024 * 1024)
+send_batch_max_line_bytes = int(os.getenv("SEND_BATCH_MAX_LINE_BYTES") or 1024 * 1024)
 
 
 @asynccontextmanager
 async def _lifespan(_app: FastAPI):
     """
-    Mengelola life-cycle aplikasi FastAPI untuk memulai dan menghentikan koneksi MQTT.
+    Mengelola life-cycle aplikasi FastAPI untuk memulai dan menghentikan koneksi MQTT. Backend berat
+    (client MQTT dan sumber pesan rahasia) diinisialisasi di sini, bukan saat modul diimport.
 
     Parameters:
     _app (FastAPI): Aplikasi FastAPI.
@@ -52,9 +136,15 @@ async def _lifespan(_app: FastAPI):
     Yields:
     None
     """
-    await fast_mqtt.mqtt_startup()
+    mqtt = fast_mqtt.get()
+    with startup.phase('start:mqtt_connect'):
+        await mqtt.mqtt_startup()
+    with startup.phase('start:hidden_source'):
+        await hidden_source.start()
+    startup.mark_ready('Sender')
     yield
-    await fast_mqtt.mqtt_shutdown()
+    await hidden_source.stop()
+    await mqtt.mqtt_shutdown()
 
 # Membuat instance aplikasi FastAPI dengan pengelola life-cycle
 app = FastAPI(lifespan=_lifespan)
@@ -66,6 +156,8 @@ class Message(BaseModel):
     Model data untuk pesan yang diterima melalui API.
     """
     message: str
+    # Key untuk menentukan shard topik (misalnya ID perangkat); default-nya isi pesan
+    key: Optional[str] = None
 
 
 @router.get("/")
@@ -81,8 +173,19 @@ def index():
     }
 
 
+@router.get("/metrics")
+def get_metrics():
+    """
+    Endpoint metrik runtime dalam format teks Prometheus.
+
+    Returns:
+    Response: Metrik sender.
+    """
+    return Response(registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @router.post("/send")
-def send_message(msg: Message):
+async def send_message(msg: Message):
     """
     Endpoint untuk mengirim pesan melalui MQTT dengan menyembunyikan pesan rahasia di dalamnya yang diencode menggunakan ZWSP.
 
@@ -92,34 +195,58 @@ def send_message(msg: Message):
     Returns:
     dict: Status pengiriman dan data pesan.
     """
+    start = time.perf_counter()
     original_msg = msg.message
 
-    data = db_ref.order_by_child('timestamp').limit_to_last(1).get()
-    hidden_msg = ''
-    for doc in data:
-        hidden_msg = str(int(data[doc]['temperature']))
-        break
+    # Mengambil nilai terbaru dari cache (tanpa I/O selama nilai belum basi)
+    hidden_msg = await hidden_source.get()
 
     # fmt: off
-    encoded_hidden_msg = zwsp.encode(hidden_msg, zwsp.MODE_ZWSP) # Mengenkripsi pesan rahasia
+    encoded_hidden_msg = zwsp.encode(hidden_msg, zwsp_mode, zwsp_compression) # Mengenkripsi pesan rahasia
     assemble_msg = f'{original_msg}{encoded_hidden_msg}' # Menggabungkan pesan asli dengan pesan rahasia
 
     # fmt: off
-    logger.debug(f'\n original: {original_msg} \n hidden: {hidden_msg} \n encoded: {assemble_msg} \n actual: {original_msg+hidden_msg}') # Log informasi pesan untuk debugging
+    logger.debug('\n original: %s \n hidden: %s \n encoded: %s \n actual: %s', original_msg, hidden_msg, assemble_msg, original_msg+hidden_msg) # Log informasi pesan untuk debugging
 
     # Mengirimkan pesan yang telah disandikan melalui MQTT
-    fast_mqtt.publish("zwsp", assemble_msg)
+    topic = topic_router.topic(msg.key or original_msg)
+    publish(topic, assemble_msg)
+    send_seconds.observe(time.perf_counter() - start)
 
     return {
         "status" : "sent",
         "data" : {
             "original_message" : original_msg,
             "encoded_message" : assemble_msg,
+            "topic" : topic,
         }
     }
 
-@fast_mqtt.on_connect()
-def connect(client: MQTTClient, flags: int, rc: int, properties: Any):
+@router.post("/send/batch")
+async def send_batch(request: Request, qos: int = Query(0, ge=0, le=2), field: str = "message"):
+    """
+    Endpoint untuk mengirim banyak pesan sekaligus. Body berupa JSON array atau NDJSON (satu item per
+    baris); setiap item berupa string atau objek dengan key `field` (default `message`) dan key `hidden`
+    opsional untuk pesan rahasia per item, serta key `key` opsional untuk menentukan shard topik.
+
+    Parameters:
+    request (Request): Request HTTP dengan body JSON array atau NDJSON.
+    qos (int): QoS MQTT untuk semua pesan (0, 1, atau 2).
+    field (str): Nama key pesan pada item berbentuk objek.
+
+    Returns:
+    BodyStreamingResponse: Hasil setiap item sebagai NDJSON, diakhiri baris `summary` berisi throughput.
+    """
+    # Body dibaca bertahap selama response dikirim; BodyStreamingResponse tidak ikut membaca `receive`
+    items = bulk.read_body(request.stream(), send_batch_max_array_bytes, send_batch_max_line_bytes)
+    results = bulk.send_items(
+        items, hidden_source,
+        lambda topic, payload, qos: publish(topic, payload, qos, "batch"),
+        zwsp_mode, zwsp_compression, field=field, topic_for=topic_router.topic, qos=qos,
+    )
+    return bulk.BodyStreamingResponse(results, media_type="application/x-ndjson")
+
+def connect(client: "MQTTClient", flags: int, rc: int, properties: Any):
     """
     Callback yang dipanggil ketika terhubung ke broker MQTT.
 
@@ -133,10 +260,9 @@ def connect(client: MQTTClient, flags: int, rc: int, properties: Any):
     None
     """
     client.subscribe("zwsp") # Subscribe ke topik yg berjudul "zwsp"
-    logger.info(f"Connected: {client} | {flags} | {rc}, | {properties}")
+    logger.info("Connected: %s | %s | %s, | %s", client, flags, rc, properties)
 
-@fast_mqtt.on_disconnect()
-def disconnect(client: MQTTClient, packet, exc=None):
+def disconnect(client: "MQTTClient", packet, exc=None):
     """
     Callback yang dipanggil ketika terputus dari broker MQTT.
 
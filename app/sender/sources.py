@@ -0,0 +1,349 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def reading_value(record):
+    """
+    Mengubah satu data pembacaan sensor menjadi pesan rahasia.
+
+    Parameters:
+    record (dict): Data pembacaan dengan key `temperature`.
+
+    Returns:
+    str: Suhu dalam bentuk bilangan bulat.
+    """
+    return str(int(record['temperature']))
+
+
+class HiddenSource:
+    """
+    Sumber nilai pesan rahasia (misalnya suhu terakhir). Subclass mengimplementasikan `fetch`, dan
+    secara opsional `listen` jika backend dapat mengirim perubahan secara push.
+    """
+
+    def fetch(self):
+        """
+        Mengambil nilai terbaru secara blocking.
+
+        Returns:
+        str | None: Nilai terbaru, atau None jika belum ada data.
+        """
+        raise NotImplementedError
+
+    def listen(self, callback):
+        """
+        Mendaftarkan callback yang dipanggil (dari thread mana pun) setiap kali nilai berubah.
+
+        Parameters:
+        callback (Callable[[str | None], None]): Fungsi penerima nilai terbaru.
+
+        Returns:
+        Callable[[], None] | None: Fungsi untuk berhenti mendengarkan, atau None jika backend tidak mendukung push.
+        """
+        return None
+
+
+class FirebaseSource(HiddenSource):
+    """
+    Nilai terbaru dari Firebase Realtime Database (data terakhir berdasarkan `timestamp`).
+
+    SDK Firebase diimport dan diinisialisasi saat pengambilan pertama (di thread, lihat CachedSource),
+    bukan saat objek dibuat, sehingga import aplikasi tidak membaca file kredensial maupun mengimport
+    firebase_admin.
+    """
+
+    def __init__(self, db_url: str, path: str = '/Temp', credentials_file: str = 'firebase_service_account.json'):
+        self.db_url = db_url
+        self.path = path
+        self.credentials_file = credentials_file
+        self._db_ref = None
+        self._lock = threading.Lock()
+
+    @property
+    def db_ref(self):
+        if self._db_ref is None:
+            with self._lock:
+                if self._db_ref is None:
+                    # firebase_admin hanya dibutuhkan jika backend ini digunakan
+                    import firebase_admin
+                    from firebase_admin import credentials, db
+
+                    start = time.perf_counter()
+                    try:
+                        # App default dapat sudah dibuat oleh kode lain dalam process yang sama
+                        firebase_admin.get_app()
+                    except ValueError:
+                        cred = credentials.Certificate(Path(self.credentials_file).resolve())
+                        firebase_admin.initialize_app(cred, {
+                            'databaseURL': self.db_url
+                        })
+                    self._db_ref = db.reference(self.path)
+                    logger.info('Firebase initialized in %.1f ms', (time.perf_counter() - start) * 1000)
+        return self._db_ref
+
+    def fetch(self):
+        data = self.db_ref.order_by_child('timestamp').limit_to_last(1).get()
+        for doc in data or {}:
+            return reading_value(data[doc])
+        return None
+
+    def listen(self, callback):
+        # Event listener Firebase berjalan di thread tersendiri; setiap perubahan memicu pengambilan
+        # nilai terbaru di thread tersebut
+        registration = self.db_ref.listen(lambda event: callback(self.fetch()))
+        return registration.close
+
+
+class FileSource(HiddenSource):
+    """
+    Nilai terbaru dari file lokal untuk pengujian offline. File berisi satu objek JSON, JSON Lines
+    (data dengan `timestamp` terbesar yang digunakan), atau teks biasa yang langsung dipakai sebagai nilai.
+    File hanya dibaca ulang jika waktu modifikasinya berubah.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._mtime = None
+        self._value = None
+
+    def fetch(self):
+        mtime = self.path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            self._value = self._parse(self.path.read_text(encoding='utf-8'))
+            self._mtime = mtime
+        return self._value
+
+    @staticmethod
+    def _parse(text):
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except ValueError:
+            return text
+        records = [record for record in records if isinstance(record, dict) and 'temperature' in record]
+        if not records:
+            return text
+        return reading_value(max(records, key=lambda record: record.get('timestamp', 0)))
+
+
+class SQLiteSource(HiddenSource):
+    """
+    Nilai terbaru dari database SQLite lokal, tabel dengan kolom `temperature` dan `timestamp`.
+    """
+
+    def __init__(self, path: str, table: str = 'readings'):
+        if not table.isidentifier():
+            raise ValueError('Invalid table name: {0}'.format(table))
+        self.path = path
+        self.query = 'SELECT temperature FROM {0} ORDER BY timestamp DESC LIMIT 1'.format(table)
+
+    def fetch(self):
+        # Koneksi dibuka per pengambilan karena fetch dapat dipanggil dari thread yang berbeda
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute(self.query).fetchone()
+        return None if row is None else reading_value({'temperature': row[0]})
+
+
+class CachedSource:
+    """
+    Cache nilai terbaru dari sebuah HiddenSource sehingga `get` tidak melakukan I/O.
+
+    Nilai diperbarui oleh task di background setiap `refresh_interval` detik dan, jika backend mendukung,
+    oleh listener push. Jika nilai lebih tua dari `ttl` detik, `get` menunggu satu pengambilan baru
+    (pengambilan yang bersamaan digabung); jika pengambilan gagal, nilai lama tetap dikembalikan.
+    """
+
+    def __init__(self, source: HiddenSource, ttl: float = 5.0, refresh_interval: float = None):
+        """
+        Inisialisasi objek CachedSource.
+
+        Parameters:
+        source (HiddenSource): Backend sumber nilai.
+        ttl (float): Umur maksimal nilai (detik) sebelum dianggap basi.
+        refresh_interval (float): Interval refresh di background (detik), default setengah dari `ttl`.
+            0 berarti tanpa refresh di background.
+        """
+        self.source = source
+        self.ttl = ttl
+        self.refresh_interval = ttl / 2 if refresh_interval is None else refresh_interval
+
+        self.value = None
+        self.updated_at = None
+        self._inflight = None
+        self._task = None
+        self._unlisten = None
+
+        self.hits = 0
+        self.refreshes = 0
+        self.pushes = 0
+        self.errors = 0
+        self.stale_served = 0
+
+    def _set(self, value):
+        self.value = value
+        self.updated_at = time.monotonic()
+
+    def age(self):
+        """
+        Mengembalikan umur nilai dalam cache (detik), atau None jika belum ada nilai.
+        """
+        return None if self.updated_at is None else time.monotonic() - self.updated_at
+
+    async def refresh(self):
+        """
+        Mengambil nilai terbaru dari backend di thread terpisah. Pemanggilan yang bersamaan menunggu
+        pengambilan yang sama.
+
+        Returns:
+        str | None: Nilai terbaru.
+
+        Raises:
+        Exception: Error dari backend.
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+            self._inflight.add_done_callback(self._refresh_done)
+        return await asyncio.shield(self._inflight)
+
+    def _refresh_done(self, future):
+        if self._inflight is future:
+            self._inflight = None
+        if not future.cancelled():
+            # Menandai error sebagai sudah diambil walaupun semua pemanggil sudah dibatalkan
+            future.exception()
+
+    async def _refresh(self):
+        try:
+            value = await asyncio.to_thread(self.source.fetch)
+        except Exception:
+            self.errors += 1
+            raise
+        self.refreshes += 1
+        self._set(value)
+        return value
+
+    async def get(self):
+        """
+        Mengembalikan nilai terbaru dari cache.
+
+        Returns:
+        str: Nilai terbaru (string kosong jika belum ada data).
+        """
+        age = self.age()
+        if age is not None and age <= self.ttl:
+            self.hits += 1
+            return self.value or ''
+        try:
+            return await self.refresh() or ''
+        except Exception as exc:
+            if age is None:
+                raise
+            self.stale_served += 1
+            logger.warning('Hidden value refresh failed, serving value %.1fs old: %r', age, exc)
+            return self.value or ''
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning('Hidden value refresh failed: %r', exc)
+
+    def _on_push(self, value):
+        self.pushes += 1
+        self._set(value)
+
+    async def start(self):
+        """
+        Mengisi cache dan menjalankan refresh di background serta listener push (jika ada). Kegagalan
+        pengambilan pertama maupun pendaftaran listener hanya dicatat di log, sehingga aplikasi tetap start.
+
+        Returns:
+        None
+        """
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logger.warning('Initial hidden value fetch failed: %r', exc)
+        if self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._refresh_loop())
+        loop = asyncio.get_running_loop()
+        try:
+            self._unlisten = await asyncio.to_thread(
+                self.source.listen, lambda value: loop.call_soon_threadsafe(self._on_push, value))
+        except Exception as exc:
+            # Tanpa listener, nilai tetap diperbarui oleh refresh di background dan oleh `get`
+            logger.warning('Hidden value listener failed, using polling refresh only: %r', exc)
+
+    async def stop(self):
+        """
+        Menghentikan refresh di background dan listener push.
+
+        Returns:
+        None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._unlisten is not None:
+            await asyncio.to_thread(self._unlisten)
+            self._unlisten = None
+
+    def stats(self):
+        """
+        Mengembalikan metrik cache.
+
+        Returns:
+        dict: Umur nilai (detik), jumlah hit, refresh, push, error, dan nilai basi yang dikembalikan.
+        """
+        return {
+            'age_seconds': self.age(),
+            'stale': self.age() is None or self.age() > self.ttl,
+            'hits': self.hits,
+            'refreshes': self.refreshes,
+            'pushes': self.pushes,
+            'errors': self.errors,
+            'stale_served': self.stale_served,
+        }
+
+
+def from_env():
+    """
+    Membuat sumber pesan rahasia dari variabel environment `HIDDEN_SOURCE` (firebase, file, atau sqlite),
+    `HIDDEN_SOURCE_PATH`, `HIDDEN_CACHE_TTL`, dan `HIDDEN_REFRESH_INTERVAL`.
+
+    Returns:
+    CachedSource: Sumber pesan rahasia dengan cache.
+
+    Raises:
+    ValueError: Jika `HIDDEN_SOURCE` tidak dikenal atau `HIDDEN_SOURCE_PATH` tidak diatur untuk file/sqlite.
+    """
+    kind = os.getenv("HIDDEN_SOURCE") or "firebase"
+    path = os.getenv("HIDDEN_SOURCE_PATH")
+    if kind == "firebase":
+        source = FirebaseSource(os.getenv('FIREBASE_DB_URL'), path or '/Temp')
+    elif kind in ("file", "sqlite"):
+        if not path:
+            raise ValueError("HIDDEN_SOURCE_PATH is required for HIDDEN_SOURCE={0}".format(kind))
+        source = FileSource(path) if kind == "file" else SQLiteSource(path)
+    else:
+        raise ValueError("Unknown HIDDEN_SOURCE: {0}".format(kind))
+
+    refresh_interval = os.getenv("HIDDEN_REFRESH_INTERVAL")
+    return CachedSource(
+        source,
+        ttl=float(os.getenv("HIDDEN_CACHE_TTL") or 5),
+        refresh_interval=float(refresh_interval) if refresh_interval else None,
+    )
@@ -0,0 +1,57 @@
+import os
+import zlib
+
+
+class TopicRouter:
+    """
+    Menentukan topik MQTT untuk setiap pesan. Tanpa sharding semua pesan dikirim ke `base`; dengan
+    `shards` > 0 pesan dikirim ke `<base>/<shard>` dengan shard = crc32(key) mod `shards`, sehingga pesan
+    dengan key yang sama selalu masuk ke shard yang sama (urutan per key tetap terjaga).
+    """
+
+    def __init__(self, base: str = 'zwsp', shards: int = 0):
+        """
+        Inisialisasi objek TopicRouter.
+
+        Parameters:
+        base (str): Topik dasar.
+        shards (int): Jumlah shard; 0 berarti tanpa sharding.
+
+        Raises:
+        ValueError: Jika `shards` negatif atau `base` mengandung wildcard MQTT.
+        """
+        if shards < 0:
+            raise ValueError('shards must not be negative')
+        if not base or '+' in base or '#' in base:
+            raise ValueError('Invalid MQTT topic: {0!r}'.format(base))
+        self.base = base
+        self.shards = shards
+        # Nama topik setiap shard dibuat sekali saja
+        self._topics = ['{0}/{1}'.format(base, shard) for shard in range(shards)]
+
+    def topic(self, key: str):
+        """
+        Mengembalikan topik untuk key pesan.
+
+        Parameters:
+        key (str): Key pesan (misalnya ID perangkat, atau isi pesan jika tidak ada key).
+
+        Returns:
+        str: Topik MQTT.
+        """
+        if not self.shards:
+            return self.base
+        return self._topics[zlib.crc32(key.encode('utf-8')) % self.shards]
+
+
+def from_env():
+    """
+    Membuat TopicRouter dari variabel environment `MQTT_TOPIC` dan `MQTT_TOPIC_SHARDS`.
+
+    Returns:
+    TopicRouter: Router topik.
+    """
+    return TopicRouter(
+        os.getenv("MQTT_TOPIC") or "zwsp",
+        int(os.getenv("MQTT_TOPIC_SHARDS") or 0),
+    )
@@ -0,0 +1,138 @@
+# Runner suite benchmark: menjalankan semua (atau sebagian) benchmark, menyimpan hasil sebagai JSON,
+# dan membandingkannya dengan baseline yang tersimpan.
+#
+# Contoh (dari root repository):
+#   python -m benchmarks --quick --output hasil.json
+#   python -m benchmarks --quick --baseline baseline.json --fail-on-regression
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks._common import compare
+
+
+def _suites(quick):
+    """
+    Daftar suite benchmark: nama -> fungsi tanpa argumen yang mengembalikan daftar baris hasil.
+    Import dilakukan di dalam fungsi agar suite yang dependensinya tidak tersedia bisa dilewati.
+    """
+    def codec():
+        from benchmarks import bench_codec
+        return bench_codec.run(bench_codec.QUICK_SIZES if quick else bench_codec.SIZES)
+
+    def modes():
+        from benchmarks import bench_modes
+        return bench_modes.run(size=16 * 1024 if quick else 64 * 1024)
+
+    def compression():
+        from benchmarks import bench_compression
+        return bench_compression.run(repeat=20 if quick else 200)
+
+    def receiver():
+        from benchmarks import bench_receiver
+        return bench_receiver.run(
+            bench_receiver.QUICK_CLIENT_COUNTS if quick else bench_receiver.CLIENT_COUNTS,
+            messages=500 if quick else 2000,
+        )
+
+    def sender():
+        from benchmarks import bench_sender
+        return bench_sender.run(messages=500 if quick else 2000)
+
+    def scaling():
+        from benchmarks import bench_scaling
+        return bench_scaling.run(
+            bench_scaling.QUICK_WORKER_COUNTS if quick else bench_scaling.WORKER_COUNTS,
+            messages=500 if quick else 2000,
+        )
+
+    def startup():
+        from benchmarks import bench_startup
+        return bench_startup.run(repeat=3 if quick else 5)
+
+    return {
+        'codec': codec,
+        'modes': modes,
+        'compression': compression,
+        'receiver': receiver,
+        'sender': sender,
+        'scaling': scaling,
+        'startup': startup,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Suite benchmark ZWSP.')
+    parser.add_argument('--suite', action='append', help='Suite yang dijalankan (boleh diulang, default: semua).')
+    parser.add_argument('--quick', action='store_true', help='Ukuran dan jumlah pesan yang lebih kecil.')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON.')
+    parser.add_argument('--baseline', help='File JSON hasil sebelumnya untuk dibandingkan.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Perubahan relatif minimal yang dilaporkan (default: 0.1).')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit code 1 jika ada regresi.')
+    args = parser.parse_args(argv)
+
+    suites = _suites(args.quick)
+    selected = args.suite or list(suites)
+    unknown = [name for name in selected if name not in suites]
+    if unknown:
+        parser.error('unknown suite: {0}'.format(', '.join(unknown)))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'quick': args.quick,
+        },
+        'results': {},
+        'skipped': {},
+    }
+    for name in selected:
+        print('running {0} ...'.format(name), file=sys.stderr)
+        try:
+            report['results'][name] = suites[name]()
+        except ImportError as exc:
+            # Suite end-to-end membutuhkan dependensi aplikasi (fastapi, fastapi-mqtt, dst.)
+            report['skipped'][name] = str(exc)
+            print('skipped {0}: {1}'.format(name, exc), file=sys.stderr)
+
+    for name, rows in report['results'].items():
+        print('\n[{0}]'.format(name))
+        for row in rows:
+            print('  ' + '  '.join('{0}={1:.2f}'.format(k, v) if isinstance(v, float) else '{0}={1}'.format(k, v)
+                                   for k, v in row.items()))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changes = compare(report['results'], baseline.get('results', {}), args.threshold)
+        regressions = [change for change in changes if change['regression']]
+        print('\nDibandingkan dengan baseline {0}: {1} perubahan, {2} regresi'.format(
+            args.baseline, len(changes), len(regressions)))
+        for change in changes:
+            print('  {0} {1} {2} {3}: {4:.2f} -> {5:.2f} ({6:+.0%})'.format(
+                'REGRESI ' if change['regression'] else 'lebih baik', change['suite'],
+                ','.join('{0}={1}'.format(k, v) for k, v in change['key'].items()),
+                change['metric'], change['baseline'], change['current'], change['ratio'] - 1))
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# Utilitas bersama untuk suite benchmark: pengukuran waktu dan perbandingan dengan baseline.
+import time
+
+# Akhiran nama metrik dan arah perbaikannya (True: semakin besar semakin baik)
+_HIGHER_IS_BETTER = ('_mb_s', '_per_s', '_ops_s')
+_LOWER_IS_BETTER = ('_us', '_ms', '_s')
+
+
+def best_of(fn, repeat):
+    """
+    Menjalankan `fn` sebanyak `repeat` kali dan mengembalikan waktu tercepat (detik).
+
+    Parameters:
+    fn (callable): Fungsi yang diukur.
+    repeat (int): Jumlah pengulangan.
+
+    Returns:
+    float: Waktu eksekusi tercepat dalam detik.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def percentile(samples, pct):
+    """
+    Menghitung persentil (nearest-rank) dari daftar sampel.
+
+    Parameters:
+    samples (list[float]): Sampel.
+    pct (float): Persentil (0 - 100).
+
+    Returns:
+    float: Nilai persentil, atau 0.0 jika tidak ada sampel.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _row_key(row):
+    return tuple(sorted((k, v) for k, v in row.items() if isinstance(v, str)))
+
+
+def _direction(metric):
+    if metric.endswith(_HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(_LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(current, baseline, threshold=0.1):
+    """
+    Membandingkan hasil benchmark dengan baseline.
+
+    Baris dicocokkan berdasarkan field bertipe string (misalnya mode dan ukuran payload); metrik
+    throughput (`*_mb_s`, `*_per_s`) dianggap lebih baik jika naik, metrik waktu (`*_us`, `*_ms`, `*_s`)
+    dianggap lebih baik jika turun.
+
+    Parameters:
+    current (dict): Hasil saat ini, {nama suite: [baris]}.
+    baseline (dict): Hasil baseline dengan format yang sama.
+    threshold (float): Perubahan relatif minimal yang dilaporkan (default: 10%).
+
+    Returns:
+    list[dict]: Daftar perubahan yang melewati threshold, dengan field `regression` True/False.
+    """
+    changes = []
+    for suite, rows in current.items():
+        base_rows = {_row_key(row): row for row in baseline.get(suite, [])}
+        for row in rows:
+            base = base_rows.get(_row_key(row))
+            if base is None:
+                continue
+            for metric, value in row.items():
+                direction = _direction(metric)
+                old = base.get(metric)
+                if not direction or not isinstance(old, (int, float)) or not old:
+                    continue
+                ratio = value / old
+                if abs(ratio - 1) < threshold:
+                    continue
+                changes.append({
+                    'suite': suite,
+                    'key': dict(_row_key(row)),
+                    'metric': metric,
+                    'baseline': old,
+                    'current': value,
+                    'ratio': ratio,
+                    'regression': (ratio - 1) * direction < 0,
+                })
+    return changes
@@ -0,0 +1,79 @@
+# Microbenchmark codec: encode/decode untuk ukuran pesan 10 B sampai 10 MB pada setiap mode.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_codec
+import argparse
+
+import zwsp
+
+from benchmarks._common import best_of
+
+SIZES = [10, 1_000, 100_000, 10_000_000]
+QUICK_SIZES = [10, 1_000, 100_000]
+MODES = ['zwsp', 'full', 'packed']
+
+# Pesan pembawa dan pesan tersembunyi dibentuk dari teks campuran ASCII dan non-ASCII
+SAMPLE = 'Suhu 27.5°C, kelembapan 61% — sensor ruang-1 ok. '
+
+
+def _text(size):
+    return (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+
+
+def run(sizes=None, repeat=3):
+    """
+    Mengukur waktu encode/decode untuk setiap kombinasi ukuran dan mode.
+
+    Parameters:
+    sizes (list[int]): Ukuran pesan tersembunyi dalam karakter (default: `SIZES`).
+    repeat (int): Jumlah pengulangan setiap pengukuran.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+    """
+    results = []
+    for size in sizes or SIZES:
+        hidden = _text(size)
+        hidden_bytes = len(hidden.encode('utf-8'))
+        for mode_name in MODES:
+            mode = zwsp.MODE_NAMES[mode_name]
+            message = 'carrier message ' + zwsp.encode(hidden, mode)
+            # Pesan kecil dijalankan berulang dalam satu pengukuran agar waktunya terukur
+            loops = max(1, 100_000 // size)
+
+            def encode_loop():
+                for _ in range(loops):
+                    zwsp.encode(hidden, mode)
+
+            def decode_loop():
+                for _ in range(loops):
+                    zwsp.decode(message, mode)
+
+            encode_time = best_of(encode_loop, repeat) / loops
+            decode_time = best_of(decode_loop, repeat) / loops
+            results.append({
+                'size': '{0}B'.format(size),
+                'mode': mode_name,
+                'encode_us': encode_time * 1e6,
+                'decode_us': decode_time * 1e6,
+                'encode_mb_s': hidden_bytes / encode_time / 1e6,
+                'decode_mb_s': hidden_bytes / decode_time / 1e6,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark codec ZWSP.')
+    parser.add_argument('--quick', action='store_true', help='Lewati ukuran 10 MB.')
+    parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan (default: 3).')
+    args = parser.parse_args()
+
+    print('{0:<10} {1:<7} {2:>14} {3:>14} {4:>10} {5:>10}'.format(
+        'size', 'mode', 'encode us', 'decode us', 'enc MB/s', 'dec MB/s'))
+    for row in run(QUICK_SIZES if args.quick else SIZES, args.repeat):
+        print('{size:<10} {mode:<7} {encode_us:>14.1f} {decode_us:>14.1f} '
+              '{encode_mb_s:>10.2f} {decode_mb_s:>10.2f}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
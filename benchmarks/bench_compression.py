@@ -0,0 +1,63 @@
+# Benchmark tahap kompresi MODE_PACKED: pengurangan jumlah glyph dan biaya CPU setiap codec.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_compression
+import argparse
+import json
+
+import zwsp
+
+from benchmarks._common import best_of
+
+# Contoh payload yang mewakili trafik sender
+PAYLOADS = {
+    'temperature': '27',
+    'reading_json': json.dumps({'temperature': 27.5, 'humidity': 61, 'timestamp': 1720000000}),
+    'json_list': json.dumps([{'temperature': 27 + i % 3, 'timestamp': 1720000000 + i} for i in range(50)]),
+    'log_line': 'sensor=suhu-ruang-1 status=ok value=27.5 unit=celsius ' * 8,
+    'prose': 'Suhu ruangan saat ini sekitar dua puluh tujuh derajat celcius dan kelembapan normal. ' * 4,
+}
+
+
+def run(repeat=200):
+    """
+    Mengukur ukuran hasil encode dan waktu encode/decode untuk setiap codec.
+
+    Parameters:
+    repeat (int): Jumlah pengulangan setiap pengukuran.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+    """
+    results = []
+    for payload_name, payload in PAYLOADS.items():
+        baseline = len(zwsp.encode(payload, zwsp.MODE_ZWSP))
+        for codec in zwsp.codec_names() + ['auto']:
+            encoded = zwsp.encode(payload, zwsp.MODE_PACKED, codec)
+            assert zwsp.decode(encoded, zwsp.MODE_PACKED)[0] == payload
+            results.append({
+                'payload': payload_name,
+                'codec': codec,
+                'payload_bytes': len(payload.encode('utf-8')),
+                'glyphs': len(encoded),
+                'vs_zwsp': len(encoded) / baseline,
+                'encode_us': best_of(lambda: zwsp.encode(payload, zwsp.MODE_PACKED, codec), repeat) * 1e6,
+                'decode_us': best_of(lambda: zwsp.decode(encoded, zwsp.MODE_PACKED), repeat) * 1e6,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark codec kompresi ZWSP.')
+    parser.add_argument('--repeat', type=int, default=200, help='Jumlah pengulangan (default: 200).')
+    args = parser.parse_args()
+
+    print('{0:<13} {1:<6} {2:>8} {3:>8} {4:>9} {5:>11} {6:>11}'.format(
+        'payload', 'codec', 'bytes', 'glyphs', 'vs zwsp', 'encode us', 'decode us'))
+    for row in run(args.repeat):
+        print('{payload:<13} {codec:<6} {payload_bytes:>8} {glyphs:>8} {vs_zwsp:>9.2f} '
+              '{encode_us:>11.1f} {decode_us:>11.1f}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Benchmark perbandingan mode ZWSP: jumlah glyph per byte payload dan throughput encode/decode.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_modes
+import argparse
+
+import zwsp
+
+from benchmarks._common import best_of
+
+# Contoh payload yang mewakili trafik sender (angka suhu, JSON, teks biasa, teks non-ASCII)
+PAYLOADS = {
+    'temperature': '27',
+    'ascii': 'The quick brown fox jumps over the lazy dog. ',
+    'json': '{"temperature": 27.5, "humidity": 61, "timestamp": 1720000000}',
+    'indonesian': 'Suhu ruangan saat ini sekitar dua puluh tujuh derajat celcius. ',
+    'cjk': '温度は二十七度です。',
+    'emoji': '🌡️🔥❄️',
+}
+
+# Codec dengan alphabet sendiri: lima glyph MODE_FULL diganti WORD JOINER dan BOM (radix 5, padding
+# minimal untuk semua codepoint Unicode sehingga emoji tetap utuh)
+CUSTOM_CODECS = {
+    'wj-bom': zwsp.Codec(['\u200b', '\u200c', '\u200d', '\u2060', '\ufeff']),
+}
+
+
+def run(size=64 * 1024, repeat=5):
+    """
+    Menjalankan benchmark untuk setiap kombinasi mode dan payload.
+
+    Parameters:
+    size (int): Perkiraan ukuran payload (byte UTF-8) untuk pengukuran throughput.
+    repeat (int): Jumlah pengulangan setiap pengukuran.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+    """
+    results = []
+    # MODE_AUTO hanya berlaku untuk decode
+    modes = [(name, mode) for name, mode in zwsp.MODE_NAMES.items() if mode is not zwsp.MODE_AUTO]
+    for mode_name, mode in modes + list(CUSTOM_CODECS.items()):
+        for payload_name, sample in PAYLOADS.items():
+            sample_bytes = len(sample.encode('utf-8'))
+            sample_glyphs = len(zwsp.encode(sample, mode))
+
+            # Payload besar untuk throughput dibuat dengan mengulang contoh payload
+            text = sample * max(1, size // sample_bytes)
+            text_bytes = len(text.encode('utf-8'))
+            encoded = zwsp.encode(text, mode)
+
+            encode_time = best_of(lambda: zwsp.encode(text, mode), repeat)
+            decode_time = best_of(lambda: zwsp.decode(encoded, mode), repeat)
+            results.append({
+                'mode': mode_name,
+                'payload': payload_name,
+                'glyphs_per_byte': sample_glyphs / sample_bytes,
+                'wire_bytes_per_byte': len(zwsp.encode(sample, mode).encode('utf-8')) / sample_bytes,
+                'encode_mb_s': text_bytes / encode_time / 1e6,
+                'decode_mb_s': text_bytes / decode_time / 1e6,
+                # MODE_FULL memotong codepoint >= 5^7, sehingga emoji tidak kembali utuh
+                'lossless': zwsp.decode(encoded, mode)[0] == text,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mode encoding ZWSP.')
+    parser.add_argument('--size', type=int, default=64 * 1024, help='Ukuran payload throughput dalam byte (default: 64 KiB).')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (default: 5).')
+    args = parser.parse_args()
+
+    print('{0:<8} {1:<12} {2:>12} {3:>12} {4:>12} {5:>12} {6:>9}'.format(
+        'mode', 'payload', 'glyph/byte', 'wire/byte', 'enc MB/s', 'dec MB/s', 'lossless'))
+    for row in run(args.size, args.repeat):
+        print('{mode:<8} {payload:<12} {glyphs_per_byte:>12.2f} {wire_bytes_per_byte:>12.2f} '
+              '{encode_mb_s:>12.2f} {decode_mb_s:>12.2f} {lossless!s:>9}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
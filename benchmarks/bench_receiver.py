@@ -0,0 +1,133 @@
+# Benchmark end-to-end receiver: endpoint `/receive` dan handler MQTT `receive_message_mqtt`
+# dijalankan in-process dengan N client WebSocket tiruan yang terhubung ke `ws_manager`.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_receiver
+import argparse
+import asyncio
+import time
+
+import zwsp
+
+from benchmarks._common import percentile
+
+CLIENT_COUNTS = [0, 10, 100]
+QUICK_CLIENT_COUNTS = [0, 10]
+
+
+class FakeWebSocket:
+    """
+    WebSocket tiruan: menerima frame tanpa I/O jaringan dan hanya menghitung jumlah frame.
+    """
+
+    def __init__(self):
+        self.frames = 0
+
+    async def accept(self, *args, **kwargs):
+        pass
+
+    async def send_json(self, data, mode='text'):
+        self.frames += 1
+
+    async def send_text(self, data):
+        self.frames += 1
+
+    async def send_bytes(self, data):
+        self.frames += 1
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+def _messages(count):
+    return [
+        'Pesan ke-{0} dari sender{1}'.format(idx, zwsp.encode(str(20 + idx % 15), zwsp.MODE_ZWSP))
+        for idx in range(count)
+    ]
+
+
+async def _wait_delivered(sockets, expected, timeout=10.0):
+    # Fan-out bisa berjalan di task terpisah; tunggu sampai semua frame diterima client tiruan
+    deadline = time.perf_counter() + timeout
+    while sum(ws.frames for ws in sockets) < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0)
+
+
+async def _run(messages, clients):
+    import httpx
+    from app.receiver import main as receiver
+
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    for ws in sockets:
+        await receiver.ws_manager.connect(ws)
+
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=receiver.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            latencies = []
+            start = time.perf_counter()
+            for msg in messages:
+                sent = time.perf_counter()
+                response = await client.post('/receive', json={'message': msg})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - sent)
+            await _wait_delivered(sockets, len(messages) * clients)
+            results.append(('http_receive', time.perf_counter() - start, latencies))
+
+        for ws in sockets:
+            ws.frames = 0
+        payloads = [msg.encode('utf-8') for msg in messages]
+        latencies = []
+        start = time.perf_counter()
+        for payload in payloads:
+            sent = time.perf_counter()
+            await receiver.receive_message_mqtt(None, 'zwsp', payload, 0, {})
+            latencies.append(time.perf_counter() - sent)
+        await _wait_delivered(sockets, len(messages) * clients)
+        results.append(('mqtt_on_message', time.perf_counter() - start, latencies))
+    finally:
+        for ws in sockets:
+            if ws in receiver.ws_manager.active_connections:
+                receiver.ws_manager.disconnect(ws)
+
+    return [{
+        'path': path,
+        'clients': str(clients),
+        'msgs_per_s': len(messages) / elapsed,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+    } for path, elapsed, latencies in results]
+
+
+def run(client_counts=None, messages=2000):
+    """
+    Menjalankan benchmark receiver untuk setiap jumlah client WebSocket.
+
+    Parameters:
+    client_counts (list[int]): Jumlah client WebSocket tiruan (default: `CLIENT_COUNTS`).
+    messages (int): Jumlah pesan per pengukuran.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+    """
+    batch = _messages(messages)
+    results = []
+    for clients in client_counts or CLIENT_COUNTS:
+        results.extend(asyncio.run(_run(batch, clients)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark end-to-end receiver ZWSP.')
+    parser.add_argument('--clients', type=int, action='append', help='Jumlah client WebSocket (boleh diulang).')
+    parser.add_argument('--messages', type=int, default=2000, help='Jumlah pesan (default: 2000).')
+    args = parser.parse_args()
+
+    print('{0:<16} {1:>8} {2:>12} {3:>10} {4:>10}'.format('path', 'clients', 'msg/s', 'p50 us', 'p99 us'))
+    for row in run(args.clients, args.messages):
+        print('{path:<16} {clients:>8} {msgs_per_s:>12.1f} {p50_us:>10.1f} {p99_us:>10.1f}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Benchmark skala horizontal receiver: N process receiver (`uvicorn app.receiver.main:app`) berbagi satu
+# shared subscription MQTT v5 (`MQTT_SHARED_GROUP`) pada broker lokal (benchmarks.mqtt_broker), sementara
+# producer mengirim pesan ke topik shard `zwsp/<shard>` menggunakan TopicRouter milik sender. Setiap pesan
+# melewati jalur receiver yang sebenarnya (client MQTT, callback, dedup, decode executor, broadcast);
+# jumlah pesan yang selesai ditangani setiap receiver dibaca dari `/metrics`.
+#
+# Throughput hanya dapat naik hampir linear jika jumlah core minimal N + 2 (broker dan producer juga
+# memakai CPU); kolom `cpus` mencatat jumlah core saat pengukuran. Membutuhkan dependensi aplikasi
+# (fastapi, fastapi-mqtt, uvicorn, httpx).
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_scaling --workers 1 --workers 2 --workers 4
+import argparse
+import asyncio
+import os
+import time
+
+import zwsp
+from app.sender.topics import TopicRouter
+
+from benchmarks.loadgen import LocalStack
+from benchmarks.mqtt_broker import Client
+
+WORKER_COUNTS = [1, 2, 4]
+QUICK_WORKER_COUNTS = [1, 2]
+SHARED_GROUP = 'bench'
+# Counter histogram yang bertambah setelah receiver selesai mendekode dan menyiarkan satu pesan MQTT
+HANDLED_METRIC = 'zwsp_receive_seconds_count{source="mqtt"}'
+
+
+class ReceiverPool(LocalStack):
+    """
+    Broker MQTT minimal dan N process receiver dalam satu shared subscription (tanpa sender).
+    """
+
+    def __init__(self, workers, shared_group=SHARED_GROUP, extra_env=None):
+        super().__init__(extra_env=extra_env)
+        self.workers = workers
+        self.shared_group = shared_group
+        self.receiver_ports = []
+
+    async def start(self):
+        """
+        Menjalankan broker dan semua receiver, lalu menunggu sampai semua receiver siap.
+
+        Raises:
+        ImportError: Jika dependensi receiver tidak tersedia.
+        """
+        for module in ('fastapi', 'fastapi_mqtt', 'uvicorn', 'httpx'):
+            __import__(module)
+
+        self.mqtt_port = self._free_port()
+        env = dict(os.environ)
+        env.update({
+            'MQTT_HOST': '127.0.0.1',
+            'MQTT_PORT': str(self.mqtt_port),
+            'MQTT_TOPIC': 'zwsp',
+            'MQTT_SHARED_GROUP': self.shared_group,
+            'ZWSP_MODE': 'zwsp',
+            # Setiap pesan harus benar-benar didekode, bukan dilayani dari cache
+            'DECODE_CACHE_SIZE': '0',
+            'LOG_LEVEL': 'WARNING',
+        })
+        env.update(self.extra_env)
+
+        self._spawn(['benchmarks.mqtt_broker', '--port', str(self.mqtt_port)], env)
+        await asyncio.sleep(0.5)
+        uvicorn = ['uvicorn', '--host', '127.0.0.1', '--log-level', 'warning']
+        self.receiver_ports = [self._free_port() for _ in range(self.workers)]
+        for port in self.receiver_ports:
+            self._spawn(uvicorn + ['--port', str(port), 'app.receiver.main:app'], env)
+        for port in self.receiver_ports:
+            await self._wait_ready('http://127.0.0.1:{0}/'.format(port))
+
+    async def handled(self, client):
+        """
+        Membaca jumlah pesan MQTT yang sudah selesai ditangani setiap receiver.
+
+        Parameters:
+        client (httpx.AsyncClient): Client HTTP.
+
+        Returns:
+        list[int]: Jumlah pesan per receiver.
+        """
+        counts = []
+        for port in self.receiver_ports:
+            text = (await client.get('http://127.0.0.1:{0}/metrics'.format(port))).text
+            counts.append(sum(int(float(line.rsplit(' ', 1)[1]))
+                              for line in text.splitlines() if line.startswith(HANDLED_METRIC)))
+        return counts
+
+
+async def _wait_handled(pool, client, total, timeout):
+    deadline = time.perf_counter() + timeout
+    while True:
+        counts = await pool.handled(client)
+        if sum(counts) >= total or time.perf_counter() > deadline:
+            return counts
+        await asyncio.sleep(0.05)
+
+
+async def _run(workers, messages, timeout=120.0):
+    import httpx
+
+    pool = ReceiverPool(workers)
+    try:
+        await pool.start()
+        producer = await Client.connect('127.0.0.1', pool.mqtt_port, 'producer')
+        async with httpx.AsyncClient() as client:
+            # Pesan pemanasan memastikan subscription setiap receiver sudah aktif sebelum pengukuran
+            warmup = 0
+            deadline = time.perf_counter() + timeout
+            while min(await pool.handled(client)) == 0:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError('Not every receiver joined the shared subscription')
+                topic, payload = messages[warmup % len(messages)]
+                producer.publish(topic, payload)
+                await producer.writer.drain()
+                warmup += 1
+                await asyncio.sleep(0.05)
+            before = await _wait_handled(pool, client, warmup, timeout)
+
+            start = time.perf_counter()
+            for idx, (topic, payload) in enumerate(messages):
+                producer.publish(topic, payload)
+                if idx % 64 == 0:
+                    await producer.writer.drain()
+            await producer.writer.drain()
+            after = await _wait_handled(pool, client, sum(before) + len(messages), timeout)
+            elapsed = time.perf_counter() - start
+        await producer.close()
+    finally:
+        pool.stop()
+    return elapsed, [end - begin for begin, end in zip(before, after)]
+
+
+def run(worker_counts=None, messages=2000, hidden_size=1000, shards=8):
+    """
+    Mengukur throughput receiver untuk setiap jumlah process receiver.
+
+    Parameters:
+    worker_counts (list[int]): Jumlah process receiver (default: `WORKER_COUNTS`).
+    messages (int): Jumlah pesan yang dikirim producer.
+    hidden_size (int): Panjang pesan tersembunyi (karakter) setiap pesan.
+    shards (int): Jumlah shard topik di sisi producer.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+
+    Raises:
+    ImportError: Jika dependensi receiver tidak tersedia.
+    RuntimeError: Jika ada pesan yang tidak ditangani receiver sebelum batas waktu.
+    """
+    router = TopicRouter('zwsp', shards)
+    hidden = ('suhu-27.5;' * (hidden_size // 10 + 1))[:hidden_size]
+    batch = [
+        (router.topic('device-{0}'.format(idx % 64)),
+         ('Pesan ke-{0} '.format(idx) + zwsp.encode(hidden, zwsp.MODE_ZWSP)).encode('utf-8'))
+        for idx in range(messages)
+    ]
+
+    results = []
+    baseline = None
+    for workers in worker_counts or WORKER_COUNTS:
+        elapsed, counts = asyncio.run(_run(workers, batch))
+        if sum(counts) != messages:
+            raise RuntimeError('{0} of {1} messages handled by {2} receivers'.format(sum(counts), messages, workers))
+        throughput = messages / elapsed
+        baseline = baseline or throughput
+        results.append({
+            'workers': str(workers),
+            'cpus': str(os.cpu_count()),
+            'msgs_per_s': throughput,
+            'speedup': throughput / baseline,
+            # Bagian terkecil/terbesar yang ditangani satu receiver; 1/workers berarti pembagian merata
+            'min_share': min(counts) / messages,
+            'max_share': max(counts) / messages,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark skala horizontal receiver ZWSP.')
+    parser.add_argument('--workers', type=int, action='append', help='Jumlah process receiver (boleh diulang).')
+    parser.add_argument('--messages', type=int, default=2000, help='Jumlah pesan (default: 2000).')
+    parser.add_argument('--hidden-size', type=int, default=1000, help='Panjang pesan tersembunyi (default: 1000).')
+    parser.add_argument('--shards', type=int, default=8, help='Jumlah shard topik (default: 8).')
+    args = parser.parse_args()
+
+    print('{0:>8} {1:>6} {2:>12} {3:>8} {4:>10} {5:>10}'.format('workers', 'cpus', 'msg/s', 'speedup', 'min share', 'max share'))
+    for row in run(args.workers, args.messages, args.hidden_size, args.shards):
+        print('{workers:>8} {cpus:>6} {msgs_per_s:>12.1f} {speedup:>8.2f} {min_share:>10.2f} {max_share:>10.2f}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Benchmark hot path sender: endpoint `/send` (ambil nilai tersembunyi, encode, publish) dijalankan
+# in-process. Nilai tersembunyi dibaca dari file lokal (HIDDEN_SOURCE=file) dan MQTT diganti fungsi
+# tiruan agar yang terukur hanya biaya di dalam proses.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_sender
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import types
+
+from benchmarks._common import percentile
+
+
+def _import_sender():
+    reading = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    with reading:
+        json.dump({'temperature': 27.4, 'timestamp': 1720000000}, reading)
+    os.environ['HIDDEN_SOURCE'] = 'file'
+    os.environ['HIDDEN_SOURCE_PATH'] = reading.name
+
+    from app.sender import main as sender
+    sender.fast_mqtt.set(types.SimpleNamespace(publish=lambda *args, **kwargs: None))
+    return sender
+
+
+async def _run_direct(sender, messages):
+    latencies = []
+    start = time.perf_counter()
+    for msg in messages:
+        sent = time.perf_counter()
+        await sender.send_message(sender.Message(message=msg))
+        latencies.append(time.perf_counter() - sent)
+    return time.perf_counter() - start, latencies
+
+
+async def _run_http(sender, messages):
+    import httpx
+
+    transport = httpx.ASGITransport(app=sender.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        latencies = []
+        start = time.perf_counter()
+        for msg in messages:
+            sent = time.perf_counter()
+            response = await client.post('/send', json={'message': msg})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - sent)
+        return time.perf_counter() - start, latencies
+
+
+def run(messages=2000):
+    """
+    Mengukur throughput dan latensi `/send`, dipanggil langsung dan melalui HTTP (ASGI in-process).
+
+    Parameters:
+    messages (int): Jumlah pesan per pengukuran.
+
+    Returns:
+    list[dict]: Hasil pengukuran.
+    """
+    sender = _import_sender()
+    batch = ['Pesan ke-{0} dari sender'.format(idx) for idx in range(messages)]
+
+    results = [
+        ('send_direct',) + asyncio.run(_run_direct(sender, batch)),
+        ('http_send',) + asyncio.run(_run_http(sender, batch)),
+    ]
+
+    return [{
+        'path': path,
+        'msgs_per_s': len(batch) / elapsed,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+    } for path, elapsed, latencies in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot path sender ZWSP.')
+    parser.add_argument('--messages', type=int, default=2000, help='Jumlah pesan (default: 2000).')
+    args = parser.parse_args()
+
+    print('{0:<12} {1:>12} {2:>10} {3:>10}'.format('path', 'msg/s', 'p50 us', 'p99 us'))
+    for row in run(args.messages):
+        print('{path:<12} {msgs_per_s:>12.1f} {p50_us:>10.1f} {p99_us:>10.1f}'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Benchmark cold start sender dan receiver: setiap pengukuran menjalankan process Python baru yang
+# mengimport modul aplikasi lalu melayani `GET /` melalui ASGI in-process (tanpa lifespan). MQTT dan
+# Firebase diinisialisasi secara lazy di lifespan, sehingga keduanya tidak tersentuh; nilai tersembunyi
+# dibaca dari file lokal (HIDDEN_SOURCE=file).
+#
+# Target: import + request pertama < 300 ms, tidak termasuk import framework (fase `import:fastapi`, yaitu
+# fastapi, starlette, dan pydantic). Import framework tidak dapat dipangkas aplikasi (sekitar 410 ms saat
+# diukur, sebagian besar untuk membangun model pydantic `fastapi.openapi.models`), sehingga dilaporkan
+# terpisah di kolom `framework ms`.
+#
+# Jalankan dari root repository:
+#   python -m benchmarks.bench_startup
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVICES = {
+    'sender': 'app.sender.main',
+    'receiver': 'app.receiver.main',
+}
+TARGET_MS = 300.0
+# Fase startup yang berisi import framework (tidak dihitung dalam target)
+FRAMEWORK_PHASES = ('import:fastapi',)
+# Modul berat yang seharusnya belum diimport setelah import aplikasi
+LAZY_MODULES = ('fastapi_mqtt', 'gmqtt', 'firebase_admin', 'numpy')
+
+_CHILD = '''
+import asyncio, importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+eager = [name for name in sys.argv[2].split(',') if name in sys.modules]
+
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=module.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://startup') as client:
+        sent = time.perf_counter()
+        response = await client.get('/')
+        response.raise_for_status()
+        return time.perf_counter() - sent
+
+served = asyncio.run(first_request())
+print(json.dumps({
+    'import_s': imported - start,
+    'first_request_s': served,
+    'phases': module.startup.phases,
+    'eager': eager,
+}))
+'''
+
+
+def _measure(module, env):
+    """
+    Menjalankan satu cold start di process baru.
+
+    Returns:
+    dict: Hasil dari process anak ditambah `process_s` (waktu total process, termasuk interpreter).
+
+    Raises:
+    ImportError: Jika dependensi aplikasi tidak tersedia.
+    RuntimeError: Jika process anak gagal karena alasan lain.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', _CHILD, module, ','.join(LAZY_MODULES)],
+                          capture_output=True, text=True, env=env)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ['unknown error'])[-1]
+        if 'ModuleNotFoundError' in last or 'ImportError' in last:
+            raise ImportError(last)
+        raise RuntimeError('{0} failed: {1}'.format(module, last))
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_s'] = elapsed
+    return result
+
+
+def run(services=None, repeat=5):
+    """
+    Mengukur waktu import dan request pertama setiap service (median dari `repeat` process baru).
+
+    Parameters:
+    services (list[str]): Nama service (`sender`, `receiver`), default semua.
+    repeat (int): Jumlah process per service.
+
+    Returns:
+    list[dict]: Hasil pengukuran per service.
+    """
+    reading = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    with reading:
+        json.dump({'temperature': 27.4, 'timestamp': 1720000000}, reading)
+    env = dict(os.environ, HIDDEN_SOURCE='file', HIDDEN_SOURCE_PATH=reading.name, LOG_LEVEL='WARNING')
+    env.pop('WS_LOG_DIR', None)
+
+    rows = []
+    try:
+        for service in services or list(SERVICES):
+            samples = [_measure(SERVICES[service], env) for _ in range(repeat)]
+            total = statistics.median(s['import_s'] + s['first_request_s'] for s in samples)
+            app_total = statistics.median(
+                s['import_s'] + s['first_request_s'] - sum(s['phases'].get(name, 0.0) for name in FRAMEWORK_PHASES)
+                for s in samples)
+            rows.append({
+                'service': service,
+                'import_ms': statistics.median(s['import_s'] for s in samples) * 1000,
+                'first_request_ms': statistics.median(s['first_request_s'] for s in samples) * 1000,
+                'total_ms': total * 1000,
+                'framework_ms': (total - app_total) * 1000,
+                'app_ms': app_total * 1000,
+                'process_ms': statistics.median(s['process_s'] for s in samples) * 1000,
+                'within_target': app_total * 1000 < TARGET_MS,
+                'eager_modules': sorted(set().union(*(s['eager'] for s in samples))),
+                'phases_ms': {name: round(statistics.median(s['phases'].get(name, 0.0) for s in samples) * 1000, 2)
+                              for name in samples[0]['phases']},
+            })
+    finally:
+        os.unlink(reading.name)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start sender dan receiver ZWSP.')
+    parser.add_argument('--service', action='append', choices=sorted(SERVICES),
+                        help='Service yang diukur (boleh diulang, default: semua).')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah process per service (default: 5).')
+    args = parser.parse_args()
+
+    print('{0:<10} {1:>10} {2:>12} {3:>10} {4:>12} {5:>8} {6:>11}  {7}'.format(
+        'service', 'import ms', 'first req ms', 'total ms', 'framework ms', 'app ms', 'process ms',
+        'app target {0:.0f} ms'.format(TARGET_MS)))
+    rows = run(args.service, args.repeat)
+    for row in rows:
+        print('{service:<10} {import_ms:>10.1f} {first_request_ms:>12.1f} {total_ms:>10.1f} {framework_ms:>12.1f} '
+              '{app_ms:>8.1f} {process_ms:>11.1f}  {0}'.format('ok' if row['within_target'] else 'MISSED', **row))
+        print('           ' + ', '.join('{0} {1:.1f}'.format(name, ms) for name, ms in row['phases_ms'].items()))
+        if row['eager_modules']:
+            print('           eager: ' + ', '.join(row['eager_modules']))
+    return 0 if all(row['within_target'] for row in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
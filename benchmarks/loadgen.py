@@ -0,0 +1,620 @@
+# Load generator dan soak test untuk pasangan sender/receiver. Pesan dikirim dengan laju tetap (open-loop:
+# jadwal tidak menunggu respons, sehingga server yang lambat terlihat sebagai latensi, bukan laju yang turun)
+# ke `/send` sender, `/receive` receiver, dan/atau langsung ke MQTT, sementara M subscriber WebSocket
+# terhubung ke `/ws` receiver. Setiap interval dilaporkan throughput, persentil latensi, error, latensi
+# sampai pesan diterima subscriber, dan RSS process receiver.
+#
+# Setiap pesan diberi tag `lg-<id> ` di awal teks carrier agar frame WebSocket dapat dicocokkan dengan
+# waktu kirimnya. Membutuhkan `httpx` dan `websockets` (lihat requirements.txt).
+#
+# Contoh (dari root repository):
+#   python -m benchmarks.loadgen --local --target mqtt --rate 500 --duration 60 --subscribers 10
+#   python -m benchmarks.loadgen --target send --rate 50 --requests requests.jsonl --field body
+#   python -m benchmarks.loadgen --target mqtt --mix 40:4,400:64,4000:1000 --output soak.json
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import orjson
+
+import zwsp
+from app.common import tracing
+from app.sender.topics import TopicRouter
+
+from benchmarks._common import percentile
+from benchmarks.mqtt_broker import Client
+
+TARGETS = ('send', 'receive', 'mqtt')
+TAG_PREFIX = 'lg-'
+DEFAULT_MIX = '40:4,400:64,4000:1000'
+# Pesan yang belum diterima subscriber setelah sekian detik tidak lagi dicocokkan (memori tetap terbatas)
+DELIVERY_HORIZON = 60.0
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_requests(path, field='body'):
+    """
+    Membaca file JSON Lines sebagai daftar pesan carrier. Baris berupa objek diambil dari key `field`;
+    baris yang bukan JSON dipakai apa adanya.
+
+    Parameters:
+    path (str): Lokasi file.
+    field (str): Nama key pesan pada baris berbentuk objek.
+
+    Returns:
+    list[tuple[str, None]]: Pasangan (carrier, hidden); pesan rahasia mengikuti default masing-masing target.
+
+    Raises:
+    ValueError: Jika file tidak berisi pesan sama sekali.
+    """
+    items = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                value = line
+            if isinstance(value, dict):
+                value = value.get(field)
+            if isinstance(value, str):
+                items.append((value, None))
+    if not items:
+        raise ValueError('No messages found in {0}'.format(path))
+    return items
+
+
+def synthetic_mix(spec, count=256, seed=0):
+    """
+    Membuat campuran pesan sintetis dari spesifikasi `carrier:hidden` (panjang karakter), misalnya
+    `40:4,400:64`. Setiap kombinasi muncul dengan proporsi yang sama.
+
+    Parameters:
+    spec (str): Daftar pasangan panjang carrier dan panjang pesan rahasia, dipisahkan koma.
+    count (int): Jumlah pesan yang dibuat (dipakai bergiliran).
+    seed (int): Seed random agar campuran dapat diulang.
+
+    Returns:
+    list[tuple[str, str]]: Pasangan (carrier, hidden).
+
+    Raises:
+    ValueError: Jika spesifikasi tidak valid.
+    """
+    try:
+        sizes = [tuple(int(part) for part in pair.split(':')) for pair in spec.split(',')]
+    except ValueError:
+        raise ValueError('Invalid mix {0!r}, expected carrier:hidden[,carrier:hidden...]'.format(spec)) from None
+    if not sizes or any(len(size) != 2 or min(size) < 0 for size in sizes):
+        raise ValueError('Invalid mix {0!r}, expected carrier:hidden[,carrier:hidden...]'.format(spec))
+
+    rng = random.Random(seed)
+    words = ['suhu', 'ruang', 'server', 'normal', 'sensor', 'data', 'hari', 'ini', 'stabil', 'laporan']
+    items = []
+    for idx in range(count):
+        carrier_len, hidden_len = sizes[idx % len(sizes)]
+        carrier = ''
+        while len(carrier) < carrier_len:
+            carrier += rng.choice(words) + ' '
+        hidden = ''.join(rng.choice('0123456789.;') for _ in range(hidden_len))
+        items.append((carrier[:carrier_len], hidden))
+    return items
+
+
+def read_rss(pid):
+    """
+    Membaca RSS sebuah process dari `/proc` (Linux).
+
+    Parameters:
+    pid (int): ID process.
+
+    Returns:
+    float | None: RSS dalam MiB, atau None jika tidak tersedia.
+    """
+    try:
+        with open('/proc/{0}/status'.format(pid)) as handle:
+            for line in handle:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class _Window:
+    """
+    Counter dan sampel latensi untuk satu interval laporan serta totalnya.
+    """
+
+    def __init__(self):
+        self.sent = self.ok = self.errors = self.overload = 0
+        self.latencies = []
+        self.total_sent = self.total_ok = self.total_errors = self.total_overload = 0
+        self.total_latencies = []
+
+    def snapshot(self, elapsed):
+        row = {
+            'sent': self.sent,
+            'ok': self.ok,
+            'errors': self.errors,
+            'overload': self.overload,
+            'ok_per_s': self.ok / elapsed if elapsed > 0 else 0.0,
+            'p50_ms': percentile(self.latencies, 50) * 1000,
+            'p99_ms': percentile(self.latencies, 99) * 1000,
+        }
+        self.total_sent += self.sent
+        self.total_ok += self.ok
+        self.total_errors += self.errors
+        self.total_overload += self.overload
+        self.total_latencies.extend(self.latencies)
+        self.sent = self.ok = self.errors = self.overload = 0
+        self.latencies = []
+        return row
+
+    def summary(self, elapsed):
+        return {
+            'sent': self.total_sent,
+            'ok': self.total_ok,
+            'errors': self.total_errors,
+            'overload': self.total_overload,
+            'error_rate': (self.total_errors + self.total_overload) / self.total_sent if self.total_sent else 0.0,
+            'ok_per_s': self.total_ok / elapsed if elapsed > 0 else 0.0,
+            'p50_ms': percentile(self.total_latencies, 50) * 1000,
+            'p99_ms': percentile(self.total_latencies, 99) * 1000,
+        }
+
+
+class LocalStack:
+    """
+    Menjalankan broker MQTT minimal, receiver, dan sender sebagai process lokal untuk load test tanpa
+    HiveMQ maupun Firebase. Sender membaca pesan rahasia dari file sementara dan mengirim trace.
+    """
+
+    def __init__(self, receiver_port=8000, sender_port=8080, extra_env=None):
+        self.receiver_port = receiver_port
+        self.sender_port = sender_port
+        self.extra_env = extra_env or {}
+        self.mqtt_port = None
+        self.procs = []
+        self.receiver = None
+        self._reading = None
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _spawn(self, args, env):
+        proc = subprocess.Popen([sys.executable, '-m'] + args, cwd=ROOT, env=env)
+        self.procs.append(proc)
+        return proc
+
+    async def _wait_ready(self, url, timeout=30.0):
+        import httpx
+
+        deadline = time.perf_counter() + timeout
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                if time.perf_counter() > deadline or any(proc.poll() is not None for proc in self.procs):
+                    raise RuntimeError('Local stack did not start: {0}'.format(url))
+                await asyncio.sleep(0.2)
+
+    async def start(self):
+        """
+        Menjalankan semua process dan menunggu sampai sender dan receiver siap.
+        """
+        if os.path.exists(os.path.join(ROOT, '.env')):
+            # Aplikasi memanggil load_dotenv(override=True), sehingga isi .env menimpa environment di bawah
+            print('Warning: .env in {0} overrides the local stack environment'.format(ROOT), file=sys.stderr)
+
+        self.mqtt_port = self._free_port()
+        self._reading = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with self._reading:
+            json.dump({'temperature': 27.4, 'timestamp': int(time.time())}, self._reading)
+
+        env = dict(os.environ)
+        env.update({
+            'MQTT_HOST': '127.0.0.1',
+            'MQTT_PORT': str(self.mqtt_port),
+            'HIDDEN_SOURCE': 'file',
+            'HIDDEN_SOURCE_PATH': self._reading.name,
+            'TRACE_ENABLED': 'true',
+            'LOG_LEVEL': 'WARNING',
+        })
+        env.update(self.extra_env)
+
+        self._spawn(['benchmarks.mqtt_broker', '--port', str(self.mqtt_port)], env)
+        await asyncio.sleep(0.5)
+        uvicorn = ['uvicorn', '--host', '127.0.0.1', '--log-level', 'warning']
+        self.receiver = self._spawn(uvicorn + ['--port', str(self.receiver_port), 'app.receiver.main:app'], env)
+        self._spawn(uvicorn + ['--port', str(self.sender_port), 'app.sender.main:app'], env)
+        await self._wait_ready('http://127.0.0.1:{0}/'.format(self.receiver_port))
+        await self._wait_ready('http://127.0.0.1:{0}/'.format(self.sender_port))
+
+    def stop(self):
+        """
+        Menghentikan semua process dan menghapus file sementara.
+        """
+        for proc in reversed(self.procs):
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if self._reading is not None:
+            os.unlink(self._reading.name)
+
+
+class LoadGenerator:
+    """
+    Mengirim pesan dengan laju tetap ke target yang dipilih dan mengukur hasilnya per interval.
+    """
+
+    def __init__(self, items, targets, rate, duration, sender_url, receiver_url, mqtt_host='127.0.0.1',
+                 mqtt_port=1883, topic='zwsp', shards=0, mode=zwsp.MODE_ZWSP, subscribers=0,
+                 ws_format='json', interval=5.0, max_inflight=1000, receiver_pid=None):
+        """
+        Inisialisasi objek LoadGenerator.
+
+        Parameters:
+        items (list[tuple[str, str | None]]): Pasangan (carrier, hidden) yang dikirim bergiliran.
+        targets (list[str]): Target: `send`, `receive`, dan/atau `mqtt`.
+        rate (float): Laju pengiriman per target (pesan per detik).
+        duration (float): Lama pengujian (detik).
+        sender_url (str): URL dasar sender.
+        receiver_url (str): URL dasar receiver.
+        mqtt_host (str): Host broker MQTT untuk target `mqtt`.
+        mqtt_port (int): Port broker MQTT.
+        topic (str): Topik dasar MQTT.
+        shards (int): Jumlah shard topik (seperti `MQTT_TOPIC_SHARDS` di sender).
+        mode (int): Mode encoding untuk target `receive` dan `mqtt`.
+        subscribers (int): Jumlah subscriber WebSocket yang terhubung ke `/ws`.
+        ws_format (str): Format frame subscriber (`json` atau `binary`).
+        interval (float): Jarak antar laporan (detik).
+        max_inflight (int): Jumlah request HTTP maksimal yang belum selesai per target; kelebihannya
+            dihitung sebagai `overload` dan tidak dikirim.
+        receiver_pid (int): ID process receiver untuk pengukuran RSS (opsional).
+
+        Raises:
+        ValueError: Jika target tidak dikenal atau `rate` tidak positif.
+        """
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise ValueError('Unknown target(s): {0}'.format(', '.join(sorted(unknown))))
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+
+        self.items = items
+        self.targets = list(targets)
+        self.rate = rate
+        self.duration = duration
+        self.sender_url = sender_url.rstrip('/')
+        self.receiver_url = receiver_url.rstrip('/')
+        self.mqtt_host = mqtt_host
+        self.mqtt_port = mqtt_port
+        self.router = TopicRouter(topic, shards)
+        self.mode = mode
+        self.subscribers = subscribers
+        self.ws_format = ws_format
+        self.interval = interval
+        self.max_inflight = max_inflight
+        self.receiver_pid = receiver_pid
+
+        self.windows = {target: _Window() for target in self.targets}
+        self.delivery = _Window()
+        self.rows = []
+        # id tag -> waktu jadwal kirim (urut sesuai id), dan jumlah pesan yang diterima subscriber pertama
+        self._scheduled = {}
+        self._delivered_first = 0
+        self._ids = itertools.count()
+        self._encoded = {}
+        self._stamper = tracing.TraceStamper('loadgen-{0}'.format(os.getpid()))
+        self._running = True
+
+    def _next(self):
+        """
+        Mengambil pesan berikutnya: (id tag, carrier bertag, hidden).
+        """
+        msg_id = next(self._ids)
+        carrier, hidden = self.items[msg_id % len(self.items)]
+        return msg_id, '{0}{1} {2}'.format(TAG_PREFIX, msg_id, carrier), hidden
+
+    def _encoded_hidden(self, hidden):
+        # Hasil encode pesan rahasia yang sama dipakai ulang agar load generator tidak menjadi bottleneck
+        hidden = '27.4' if hidden is None else hidden
+        encoded = self._encoded.get(hidden)
+        if encoded is None:
+            encoded = self._encoded[hidden] = zwsp.encode(hidden, self.mode)
+        return encoded
+
+    async def _request(self, client, target, scheduled):
+        loop = asyncio.get_running_loop()
+        window = self.windows[target]
+        msg_id, carrier, hidden = self._next()
+        self._scheduled[msg_id] = scheduled
+        window.sent += 1
+        try:
+            if target == 'send':
+                response = await client.post(self.sender_url + '/send', json={'message': carrier})
+            else:
+                message = carrier + self._encoded_hidden(hidden)
+                response = await client.post(self.receiver_url + '/receive', json={'message': message})
+            response.raise_for_status()
+        except Exception:
+            window.errors += 1
+            return
+        window.ok += 1
+        window.latencies.append(loop.time() - scheduled)
+
+    async def _drive_http(self, target):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        limits = httpx.Limits(max_connections=self.max_inflight, max_keepalive_connections=100)
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            async for scheduled in self._schedule(loop):
+                if len(tasks) >= self.max_inflight:
+                    self.windows[target].sent += 1
+                    self.windows[target].overload += 1
+                    continue
+                task = asyncio.ensure_future(self._request(client, target, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _drive_mqtt(self):
+        loop = asyncio.get_running_loop()
+        window = self.windows['mqtt']
+        client = await Client.connect(self.mqtt_host, self.mqtt_port, 'loadgen-{0}'.format(os.getpid()))
+        try:
+            async for scheduled in self._schedule(loop):
+                msg_id, carrier, hidden = self._next()
+                self._scheduled[msg_id] = scheduled
+                window.sent += 1
+                topic = self.router.topic(carrier)
+                payload = (carrier + self._encoded_hidden(hidden)).encode('utf-8')
+                try:
+                    client.publish(topic, payload, self._stamper.properties(topic))
+                    await client.writer.drain()
+                except ConnectionError:
+                    window.errors += 1
+                    continue
+                # MQTT QoS 0 tidak memiliki respons; latensi diukur sampai publish masuk ke socket
+                window.ok += 1
+                window.latencies.append(loop.time() - scheduled)
+        finally:
+            await client.close()
+
+    async def _schedule(self, loop):
+        """
+        Menghasilkan waktu jadwal setiap pesan dengan jarak tetap 1/rate (open-loop).
+        """
+        start = loop.time()
+        for idx in itertools.count():
+            scheduled = start + idx / self.rate
+            if scheduled - start >= self.duration:
+                return
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield scheduled
+
+    def _on_frame(self, index, frame):
+        loop = asyncio.get_running_loop()
+        data = orjson.loads(frame)
+        messages = data.get('messages', ()) if data.get('type') == 'batch' else (data,)
+        now = loop.time()
+        for message in messages:
+            carrier = message.get('carrier_message', '') if isinstance(message, dict) else ''
+            if not carrier.startswith(TAG_PREFIX):
+                continue
+            try:
+                msg_id = int(carrier[len(TAG_PREFIX):carrier.index(' ')])
+            except ValueError:
+                continue
+            scheduled = self._scheduled.get(msg_id)
+            if scheduled is None:
+                continue
+            self.delivery.ok += 1
+            self.delivery.latencies.append(now - scheduled)
+            if index == 0:
+                self._delivered_first += 1
+
+    async def _subscriber(self, index, connected):
+        import websockets
+
+        url = self.receiver_url.replace('http', 'ws', 1) + '/ws?format=' + self.ws_format
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                connected.release()
+                async for frame in ws:
+                    self._on_frame(index, frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            connected.release()
+            self.delivery.errors += 1
+            print('Subscriber {0} failed: {1!r}'.format(index, exc), file=sys.stderr)
+
+    async def _reporter(self, start):
+        loop = asyncio.get_running_loop()
+        last = start
+        while self._running:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self._report(now - start, now - last)
+            last = now
+
+    def _expire(self):
+        horizon = asyncio.get_running_loop().time() - DELIVERY_HORIZON
+        scheduled = self._scheduled
+        while scheduled:
+            msg_id = next(iter(scheduled))
+            if scheduled[msg_id] >= horizon:
+                break
+            del scheduled[msg_id]
+
+    def _report(self, elapsed, window_seconds):
+        self._expire()
+        row = {'t': round(elapsed, 3), 'rss_mb': None if self.receiver_pid is None else read_rss(self.receiver_pid)}
+        for target, window in self.windows.items():
+            row[target] = window.snapshot(window_seconds)
+        if self.subscribers:
+            row['ws'] = self.delivery.snapshot(window_seconds)
+        self.rows.append(row)
+
+        parts = ['{0:>7.1f}s'.format(elapsed)]
+        for target in self.windows:
+            stats = row[target]
+            parts.append('{0} {1:.0f}/s p50 {2:.1f}ms p99 {3:.1f}ms err {4}'.format(
+                target, stats['ok_per_s'], stats['p50_ms'], stats['p99_ms'], stats['errors'] + stats['overload']))
+        if self.subscribers:
+            parts.append('ws {0:.0f}/s p50 {1:.1f}ms p99 {2:.1f}ms'.format(
+                row['ws']['ok_per_s'], row['ws']['p50_ms'], row['ws']['p99_ms']))
+        if row['rss_mb'] is not None:
+            parts.append('rss {0:.1f}MiB'.format(row['rss_mb']))
+        print(' | '.join(parts), flush=True)
+
+    async def _receiver_trace(self):
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(self.receiver_url + '/trace')
+                response.raise_for_status()
+                return response.json()
+        except httpx.HTTPError:
+            return None
+
+    async def run(self, drain=2.0):
+        """
+        Menjalankan pengujian dan mengembalikan ringkasan.
+
+        Parameters:
+        drain (float): Waktu tunggu (detik) setelah pengiriman selesai agar frame terakhir diterima subscriber.
+
+        Returns:
+        dict: Baris per interval (`intervals`), ringkasan per target, subscriber, dan trace receiver.
+        """
+        loop = asyncio.get_running_loop()
+        connected = asyncio.Semaphore(0)
+        subscribers = [asyncio.ensure_future(self._subscriber(idx, connected)) for idx in range(self.subscribers)]
+        for _ in subscribers:
+            await connected.acquire()
+
+        start = loop.time()
+        reporter = asyncio.ensure_future(self._reporter(start))
+        drivers = [self._drive_mqtt() if target == 'mqtt' else self._drive_http(target) for target in self.targets]
+        await asyncio.gather(*drivers)
+        await asyncio.sleep(drain)
+        elapsed = loop.time() - start
+
+        self._running = False
+        reporter.cancel()
+        for task in subscribers:
+            task.cancel()
+        await asyncio.gather(reporter, *subscribers, return_exceptions=True)
+        self._report(elapsed, elapsed - (self.rows[-1]['t'] if self.rows else 0))
+
+        sent_total = sum(window.total_sent - window.total_overload for window in self.windows.values())
+        summary = {
+            'config': {
+                'targets': self.targets,
+                'rate': self.rate,
+                'duration': self.duration,
+                'subscribers': self.subscribers,
+                'messages': len(self.items),
+            },
+            'intervals': self.rows,
+            'targets': {target: window.summary(self.duration) for target, window in self.windows.items()},
+            'receiver_trace': await self._receiver_trace(),
+        }
+        if self.subscribers:
+            delivery = self.delivery.summary(self.duration)
+            # Pesan yang tidak pernah diterima subscriber pertama (termasuk request HTTP yang gagal)
+            delivery['lost'] = sent_total - self._delivered_first
+            summary['ws'] = delivery
+        rss = [row['rss_mb'] for row in self.rows if row['rss_mb'] is not None]
+        if rss:
+            summary['rss_mb'] = {'first': rss[0], 'last': rss[-1], 'max': max(rss)}
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator dan soak test sender/receiver ZWSP.')
+    parser.add_argument('--target', action='append', choices=TARGETS, help='Target (boleh diulang, default: send).')
+    parser.add_argument('--rate', type=float, default=100, help='Pesan per detik per target (default: 100).')
+    parser.add_argument('--duration', type=float, default=30, help='Lama pengujian dalam detik (default: 30).')
+    parser.add_argument('--requests', help='File JSON Lines yang di-replay (default: campuran sintetis).')
+    parser.add_argument('--field', default='body', help='Key pesan pada file --requests (default: body).')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='Campuran sintetis carrier:hidden (default: {0}).'.format(DEFAULT_MIX))
+    parser.add_argument('--mode', default='zwsp', choices=['zwsp', 'full', 'packed'],
+                        help='Mode encoding untuk target receive dan mqtt (default: zwsp).')
+    parser.add_argument('--subscribers', type=int, default=1, help='Jumlah subscriber WebSocket (default: 1).')
+    parser.add_argument('--ws-format', default='json', choices=['json', 'binary'], help='Format frame subscriber.')
+    parser.add_argument('--sender-url', default='http://127.0.0.1:8080')
+    parser.add_argument('--receiver-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--mqtt-host', default='127.0.0.1')
+    parser.add_argument('--mqtt-port', type=int, default=1883)
+    parser.add_argument('--topic', default='zwsp', help='Topik dasar MQTT (default: zwsp).')
+    parser.add_argument('--shards', type=int, default=0, help='Jumlah shard topik untuk target mqtt.')
+    parser.add_argument('--interval', type=float, default=5, help='Jarak antar laporan dalam detik (default: 5).')
+    parser.add_argument('--max-inflight', type=int, default=1000, help='Request HTTP maksimal yang belum selesai.')
+    parser.add_argument('--receiver-pid', type=int, help='PID receiver untuk pengukuran RSS.')
+    parser.add_argument('--local', action='store_true',
+                        help='Jalankan broker minimal, receiver, dan sender sebagai process lokal.')
+    parser.add_argument('--output', help='Simpan ringkasan dan baris per interval ke file JSON.')
+    args = parser.parse_args()
+
+    items = load_requests(args.requests, args.field) if args.requests else synthetic_mix(args.mix)
+
+    async def run():
+        stack = None
+        mqtt_host, mqtt_port, receiver_pid = args.mqtt_host, args.mqtt_port, args.receiver_pid
+        sender_url, receiver_url = args.sender_url, args.receiver_url
+        if args.local:
+            stack = LocalStack(extra_env={'MQTT_TOPIC': args.topic, 'MQTT_TOPIC_SHARDS': str(args.shards)})
+            await stack.start()
+            mqtt_host, mqtt_port, receiver_pid = '127.0.0.1', stack.mqtt_port, stack.receiver.pid
+            sender_url = 'http://127.0.0.1:{0}'.format(stack.sender_port)
+            receiver_url = 'http://127.0.0.1:{0}'.format(stack.receiver_port)
+        try:
+            generator = LoadGenerator(
+                items, args.target or ['send'], args.rate, args.duration, sender_url, receiver_url,
+                mqtt_host=mqtt_host, mqtt_port=mqtt_port, topic=args.topic, shards=args.shards,
+                mode=zwsp.MODE_NAMES[args.mode], subscribers=args.subscribers, ws_format=args.ws_format,
+                interval=args.interval, max_inflight=args.max_inflight, receiver_pid=receiver_pid,
+            )
+            return await generator.run()
+        finally:
+            if stack is not None:
+                stack.stop()
+
+    summary = asyncio.run(run())
+    print(json.dumps({key: value for key, value in summary.items() if key != 'intervals'}, indent=2))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(summary, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
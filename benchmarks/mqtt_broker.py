@@ -0,0 +1,310 @@
+# Broker MQTT v5 minimal untuk benchmark lokal (pengganti HiveMQ). Mendukung CONNECT, SUBSCRIBE termasuk
+# shared subscription `$share/<grup>/<filter>` (pesan dibagi round-robin di antara anggota grup),
+# UNSUBSCRIBE, PUBLISH QoS 0/1/2 dari client, PINGREQ, dan DISCONNECT. Pesan selalu diteruskan ke
+# subscriber dengan QoS 0 beserta properties-nya (misalnya user property trace dari sender); retained
+# message, will, session, dan autentikasi tidak didukung.
+#
+# Jalankan sebagai broker mandiri (misalnya untuk sender/receiver lokal):
+#   python -m benchmarks.mqtt_broker --port 1883
+import argparse
+import asyncio
+import itertools
+import struct
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 10, 11, 12, 13, 14
+USER_PROPERTY = 0x26
+
+
+def encode_varint(value):
+    """
+    Mengenkode Variable Byte Integer MQTT.
+    """
+    out = bytearray()
+    while True:
+        byte, value = value % 128, value // 128
+        out.append(byte | (0x80 if value else 0))
+        if not value:
+            return bytes(out)
+
+
+def decode_varint(data, pos):
+    """
+    Mendekode Variable Byte Integer MQTT mulai dari `pos`; mengembalikan (nilai, posisi berikutnya).
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_string(text):
+    raw = text.encode('utf-8')
+    return struct.pack('!H', len(raw)) + raw
+
+
+def decode_string(data, pos):
+    length = struct.unpack_from('!H', data, pos)[0]
+    return bytes(data[pos + 2:pos + 2 + length]).decode('utf-8'), pos + 2 + length
+
+
+def encode_user_properties(pairs):
+    """
+    Mengenkode pasangan (nama, nilai) menjadi blok properties MQTT v5 (panjang + isi).
+    """
+    body = b''.join(bytes([USER_PROPERTY]) + encode_string(name) + encode_string(value) for name, value in pairs)
+    return encode_varint(len(body)) + body
+
+
+def decode_user_properties(properties):
+    """
+    Mengambil pasangan (nama, nilai) user property dari blok properties MQTT v5 (panjang + isi).
+    Berhenti pada property jenis lain karena panjangnya tidak diketahui oleh broker minimal ini.
+    """
+    length, pos = decode_varint(properties, 0)
+    end = pos + length
+    pairs = []
+    while pos < end and properties[pos] == USER_PROPERTY:
+        name, pos = decode_string(properties, pos + 1)
+        value, pos = decode_string(properties, pos)
+        pairs.append((name, value))
+    return pairs
+
+
+def packet(kind, flags, body):
+    """
+    Membentuk satu paket MQTT dari jenis, flag, dan isi (variable header + payload).
+    """
+    return bytes([kind << 4 | flags]) + encode_varint(len(body)) + body
+
+
+def publish_packet(topic, payload, qos=0, packet_id=0, properties=b'\x00'):
+    header = encode_string(topic) + (struct.pack('!H', packet_id) if qos else b'')
+    # `properties` berisi panjang properties diikuti isinya (default: kosong)
+    return packet(PUBLISH, qos << 1, header + properties + payload)
+
+
+def parse_publish(flags, body):
+    """
+    Mengurai isi paket PUBLISH MQTT v5; mengembalikan (topik, payload, qos, packet_id, properties) dengan
+    properties berupa blok mentah (panjang + isi) yang dapat diteruskan apa adanya.
+    """
+    qos = flags >> 1 & 0x03
+    topic, pos = decode_string(body, 0)
+    packet_id = 0
+    if qos:
+        packet_id = struct.unpack_from('!H', body, pos)[0]
+        pos += 2
+    props_len, props_start = decode_varint(body, pos)
+    end = props_start + props_len
+    return topic, bytes(body[end:]), qos, packet_id, bytes(body[pos:end])
+
+
+async def read_packet(reader):
+    """
+    Membaca satu paket MQTT; mengembalikan (jenis, flag, isi).
+
+    Raises:
+    asyncio.IncompleteReadError: Jika koneksi ditutup.
+    """
+    first = (await reader.readexactly(1))[0]
+    length = shift = 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    body = await reader.readexactly(length) if length else b''
+    return first >> 4, first & 0x0F, body
+
+
+def topic_matches(topic_filter, topic):
+    """
+    Mencocokkan topik dengan filter MQTT (wildcard `+` dan `#`).
+    """
+    filter_levels = topic_filter.split('/')
+    topic_levels = topic.split('/')
+    for idx, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if idx >= len(topic_levels) or (level != '+' and level != topic_levels[idx]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+class Broker:
+    """
+    Broker MQTT v5 minimal berbasis asyncio.
+    """
+
+    def __init__(self):
+        # filter -> set writer (subscription biasa)
+        self.subscriptions = {}
+        # (grup, filter) -> list writer dan iterator round-robin
+        self.shared = {}
+        self._round_robin = {}
+        self.delivered = 0
+        self.connections = 0
+
+    def _subscribe(self, writer, topic_filter):
+        if topic_filter.startswith('$share/'):
+            _, group, shared_filter = topic_filter.split('/', 2)
+            members = self.shared.setdefault((group, shared_filter), [])
+            if writer not in members:
+                members.append(writer)
+            self._round_robin[(group, shared_filter)] = itertools.count()
+        else:
+            self.subscriptions.setdefault(topic_filter, set()).add(writer)
+
+    def _unsubscribe(self, writer, topic_filter=None):
+        for key, writers in list(self.subscriptions.items()):
+            if topic_filter in (None, key):
+                writers.discard(writer)
+        for key, members in list(self.shared.items()):
+            if topic_filter in (None, '$share/{0}/{1}'.format(*key)) and writer in members:
+                members.remove(writer)
+
+    def route(self, topic, payload, properties=b'\x00'):
+        """
+        Meneruskan pesan ke semua subscriber biasa dan ke satu anggota setiap grup shared subscription.
+        """
+        data = publish_packet(topic, payload, properties=properties)
+        targets = set()
+        for topic_filter, writers in self.subscriptions.items():
+            if topic_matches(topic_filter, topic):
+                targets.update(writers)
+        for (group, topic_filter), members in self.shared.items():
+            if members and topic_matches(topic_filter, topic):
+                turn = next(self._round_robin[(group, topic_filter)])
+                targets.add(members[turn % len(members)])
+        for writer in targets:
+            writer.write(data)
+        self.delivered += len(targets)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            kind, _, _ = await read_packet(reader)
+            if kind != CONNECT:
+                return
+            # CONNACK: session present 0, reason code 0, properties kosong
+            writer.write(packet(CONNACK, 0, b'\x00\x00\x00'))
+            while True:
+                kind, flags, body = await read_packet(reader)
+                if kind == PUBLISH:
+                    topic, payload, qos, packet_id, properties = parse_publish(flags, body)
+                    self.route(topic, payload, properties)
+                    if qos == 1:
+                        writer.write(packet(PUBACK, 0, struct.pack('!H', packet_id)))
+                    elif qos == 2:
+                        writer.write(packet(PUBREC, 0, struct.pack('!H', packet_id)))
+                    await writer.drain()
+                elif kind == PUBREL:
+                    writer.write(packet(PUBCOMP, 0, body[:2]))
+                elif kind in (SUBSCRIBE, UNSUBSCRIBE):
+                    packet_id = body[:2]
+                    props_len, pos = decode_varint(body, 2)
+                    pos += props_len
+                    codes = bytearray()
+                    while pos < len(body):
+                        topic_filter, pos = decode_string(body, pos)
+                        if kind == SUBSCRIBE:
+                            pos += 1  # subscription options
+                            self._subscribe(writer, topic_filter)
+                        else:
+                            self._unsubscribe(writer, topic_filter)
+                        codes.append(0)
+                    reply = SUBACK if kind == SUBSCRIBE else UNSUBACK
+                    writer.write(packet(reply, 0, packet_id + b'\x00' + bytes(codes)))
+                elif kind == PINGREQ:
+                    writer.write(packet(PINGRESP, 0, b''))
+                elif kind == DISCONNECT:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            self._unsubscribe(writer)
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=1883):
+        """
+        Menjalankan broker dan mengembalikan objek server asyncio.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+
+class Client:
+    """
+    Client MQTT v5 minimal (QoS 0) untuk benchmark.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._packet_ids = itertools.count(1)
+
+    @classmethod
+    async def connect(cls, host, port, client_id):
+        reader, writer = await asyncio.open_connection(host, port)
+        # Protocol name, level 5, clean start, keepalive 60 detik, properties kosong
+        header = encode_string('MQTT') + b'\x05\x02' + struct.pack('!H', 60) + b'\x00'
+        writer.write(packet(CONNECT, 0, header + encode_string(client_id)))
+        kind, _, _ = await read_packet(reader)
+        if kind != CONNACK:
+            raise ConnectionError('Expected CONNACK')
+        return cls(reader, writer)
+
+    async def subscribe(self, *topic_filters):
+        body = struct.pack('!H', next(self._packet_ids)) + b'\x00'
+        for topic_filter in topic_filters:
+            body += encode_string(topic_filter) + b'\x00'
+        self.writer.write(packet(SUBSCRIBE, 0x02, body))
+        while (await read_packet(self.reader))[0] != SUBACK:
+            pass
+
+    def publish(self, topic, payload, user_properties=None):
+        properties = encode_user_properties(user_properties) if user_properties else b'\x00'
+        self.writer.write(publish_packet(topic, payload, properties=properties))
+
+    async def messages(self, with_properties=False):
+        """
+        Menghasilkan (topik, payload) untuk setiap PUBLISH yang diterima, atau (topik, payload, user
+        property) jika `with_properties` bernilai True.
+        """
+        while True:
+            kind, flags, body = await read_packet(self.reader)
+            if kind == PUBLISH:
+                topic, payload, _, _, properties = parse_publish(flags, body)
+                if with_properties:
+                    yield topic, payload, decode_user_properties(properties)
+                else:
+                    yield topic, payload
+
+    async def close(self):
+        self.writer.write(packet(DISCONNECT, 0, b''))
+        await self.writer.drain()
+        self.writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Broker MQTT v5 minimal untuk pengujian lokal.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1883)
+    args = parser.parse_args()
+
+    async def run():
+        server = await Broker().serve(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
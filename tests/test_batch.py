@@ -0,0 +1,59 @@
+# encode_many/decode_many harus identik dengan encode/decode per pesan, termasuk untuk Codec sendiri.
+import pytest
+
+import zwsp
+from zwsp import batch
+
+MESSAGES = ['', 'abc', 'suhu 27.5 °C', 'ä€\U00012000', '\ud800 surrogate']
+
+CODECS = [
+    zwsp.MODE_ZWSP,
+    zwsp.MODE_FULL,
+    zwsp.CODEC_ZWSP,
+    zwsp.CODEC_FULL,
+    zwsp.Codec(['⁠', '﻿']),
+    zwsp.Codec(['⁠', '﻿', '​', '‌']),
+    zwsp.Codec(['⁠', '﻿'], padding=40),
+]
+IDS = ['zwsp', 'full', 'codec-zwsp', 'codec-full', 'codec-2', 'codec-4', 'codec-2-pad40']
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numpy')
+        batch._numpy()
+    else:
+        monkeypatch.setattr(batch, '_numpy', lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize('mode', CODECS, ids=IDS)
+def test_matches_scalar(backend, mode):
+    encoded = zwsp.encode_many(MESSAGES, mode)
+    assert encoded == [zwsp.encode(msg, mode) for msg in MESSAGES]
+    carried = ['c{0}'.format(idx) + msg for idx, msg in enumerate(encoded)]
+    results = zwsp.decode_many(carried, mode)
+    expected = [zwsp.decode(msg, mode) for msg in carried]
+    assert results == expected
+    assert [result.mode for result in results] == [result.mode for result in expected]
+
+
+def test_codec_mode_is_reported_as_mode_constant(backend):
+    assert zwsp.decode_many(['a'], zwsp.CODEC_ZWSP)[0].mode == zwsp.MODE_ZWSP
+    codec = zwsp.Codec(['⁠', '﻿'])
+    assert zwsp.decode_many(['a'], codec)[0].mode is codec
+
+
+def test_out_of_range_group_raises_type_error(backend):
+    codec = zwsp.Codec(['⁠', '﻿'], padding=24)
+    msg = '﻿' * 24
+    with pytest.raises(TypeError):
+        zwsp.decode(msg, codec)
+    with pytest.raises(TypeError):
+        zwsp.decode_many([msg], codec)
+
+
+def test_invalid_length_raises_type_error(backend):
+    with pytest.raises(TypeError):
+        zwsp.decode_many(['ok', zwsp.encode('x', zwsp.MODE_ZWSP)[1:]], zwsp.MODE_ZWSP)
@@ -0,0 +1,41 @@
+import pytest
+
+import zwsp
+from zwsp import cli
+
+
+def test_window_must_be_positive(tmp_path, capsys):
+    path = tmp_path / 'input.txt'
+    path.write_text('abc', encoding='utf-8')
+    for window in ('0', '-1', 'x'):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(['encode', str(path), '--window', window])
+        assert exc.value.code == 2
+    assert '--window' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_encode_invalid_utf8_is_reported(tmp_path, capsys, workers):
+    path = tmp_path / 'input.txt'
+    path.write_bytes(b'abc \xff\xfe def')
+    assert cli.main(['encode', str(path), '-o', str(tmp_path / 'out'), '--workers', workers]) == 1
+    assert capsys.readouterr().err.startswith("error: 'utf-8' codec can't decode")
+
+
+def test_decode_keeps_invalid_utf8_carrier(tmp_path):
+    # Pesan pembawa disalin apa adanya (bytes), hanya rangkaian glyph yang didekode
+    path = tmp_path / 'input.txt'
+    path.write_bytes(b'abc \xff ' + zwsp.encode('hi').encode('utf-8'))
+    out, carrier = tmp_path / 'hidden.txt', tmp_path / 'carrier.txt'
+    assert cli.main(['decode', str(path), '-o', str(out), '--carrier-output', str(carrier)]) == 0
+    assert out.read_bytes() == b'hi'
+    assert carrier.read_bytes() == b'abc \xff '
+
+
+def test_decode_roundtrip_small_windows(tmp_path):
+    hidden = 'pesan rahasia ✓ ' * 50
+    path = tmp_path / 'input.txt'
+    path.write_text('pembawa ' + zwsp.encode(hidden, zwsp.MODE_ZWSP), encoding='utf-8')
+    out = tmp_path / 'hidden.txt'
+    assert cli.main(['decode', str(path), '-m', 'zwsp', '--window', '7', '-o', str(out)]) == 0
+    assert out.read_text(encoding='utf-8') == hidden
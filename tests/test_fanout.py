@@ -0,0 +1,173 @@
+# Bus frame multi-process (FANOUT_ROLE): catch-up lalu live tanpa celah, pemutusan worker lambat, koneksi
+# ulang dari nomor urut terakhir, dan penerusan `POST /receive` dari worker ke process ingest.
+import asyncio
+import importlib
+import types
+
+import orjson
+import pytest
+
+from app.receiver import fanout
+from app.receiver.history import MessageHistory, RingBuffer
+
+
+class FakeWorker:
+    """
+    Pengganti ConnectionManager di process worker: mencatat nomor urut frame yang diterima.
+    """
+
+    def __init__(self, since=0, delay=0.0):
+        self.history = types.SimpleNamespace(seq=since)
+        self.delay = delay
+        self.seqs = []
+
+    async def broadcast_frame(self, payload, seq=0):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        assert orjson.loads(payload)['seq'] == seq
+        self.seqs.append(seq)
+        self.history.seq = seq
+
+
+class Ingest:
+    """
+    Sisi process ingest: riwayat dan bus frame, dengan `broadcast` seperti `ConnectionManager.broadcast_json`.
+    """
+
+    def __init__(self, path, max_buffer=64 * 1024 * 1024, on_forward=None, ring_size=10000):
+        self.history = MessageHistory(RingBuffer(ring_size, 1024 ** 3))
+        self.server = fanout.FrameBusServer(str(path), self.history, max_buffer=max_buffer, on_forward=on_forward)
+
+    def broadcast(self, data):
+        _, encoded = self.history.append(data)
+        self.server.publish(encoded, self.history.seq)
+
+
+async def _wait(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError('timed out')
+        await asyncio.sleep(0.005)
+
+
+def test_catch_up_then_live_is_gapless(tmp_path):
+    async def scenario():
+        ingest = Ingest(tmp_path / 'bus.sock')
+        await ingest.server.start()
+        for idx in range(20):
+            ingest.broadcast({'i': idx})
+
+        # Worker sudah memiliki frame sampai seq 7; frame live terus dikirim selama worker terhubung
+        worker = FakeWorker(since=7)
+        client = fanout.FrameBusClient(ingest.server.path, worker)
+        client.start()
+        for idx in range(20, 300):
+            ingest.broadcast({'i': idx})
+            await asyncio.sleep(0)
+        await _wait(lambda: worker.seqs[-1:] == [300])
+        await client.close()
+        await ingest.server.close()
+        return worker.seqs
+
+    assert asyncio.run(scenario()) == list(range(8, 301))
+
+
+def test_live_only_worker_skips_history(tmp_path):
+    async def scenario():
+        ingest = Ingest(tmp_path / 'bus.sock')
+        await ingest.server.start()
+        for idx in range(5):
+            ingest.broadcast({'i': idx})
+        reader, writer = await asyncio.open_unix_connection(ingest.server.path)
+        writer.write(fanout._HELLO.pack(-1))
+        await _wait(lambda: ingest.server.worker_count() == 1)
+        ingest.broadcast({'i': 5})
+        length, seq = fanout._FRAME.unpack(await reader.readexactly(fanout._FRAME.size))
+        payload = await reader.readexactly(length)
+        writer.close()
+        await ingest.server.close()
+        return seq, orjson.loads(payload)
+
+    assert asyncio.run(scenario()) == (6, {'i': 5, 'seq': 6})
+
+
+def test_slow_worker_is_disconnected_and_catches_up(tmp_path):
+    async def scenario():
+        ingest = Ingest(tmp_path / 'bus.sock', max_buffer=64 * 1024)
+        await ingest.server.start()
+        # Worker lambat: setiap frame membutuhkan 1 ms, sehingga buffer kirim ingest terus bertambah
+        worker = FakeWorker(delay=0.001)
+        client = fanout.FrameBusClient(ingest.server.path, worker, reconnect_delay=0.01)
+        client.start()
+        await _wait(lambda: ingest.server.worker_count() == 1)
+
+        filler = 'x' * 4096
+        for idx in range(2000):
+            ingest.broadcast({'i': idx, 'filler': filler})
+            if idx % 50 == 0:
+                await asyncio.sleep(0)
+        await _wait(lambda: worker.seqs[-1:] == [2000], timeout=30)
+        await client.close()
+        await ingest.server.close()
+        return worker.seqs, ingest.server.disconnects, client.reconnects
+
+    seqs, disconnects, reconnects = asyncio.run(scenario())
+    assert disconnects >= 1
+    assert reconnects >= 1
+    # Koneksi ulang dimulai dari nomor urut terakhir yang diterima: tanpa celah maupun duplikat
+    assert seqs == list(range(1, 2001))
+
+
+def test_forward_reaches_ingest(tmp_path):
+    async def scenario():
+        forwarded = []
+
+        async def on_forward(msg):
+            forwarded.append(msg)
+
+        ingest = Ingest(tmp_path / 'bus.sock', on_forward=on_forward)
+        client = fanout.FrameBusClient(str(tmp_path / 'bus.sock'), FakeWorker(), reconnect_delay=0.01)
+        assert not client.forward('pesan')
+        await ingest.server.start()
+        client.start()
+        await _wait(lambda: client.connected)
+        assert client.forward('pesan \u200b\u200c \ud800')
+        await _wait(lambda: forwarded)
+        await client.close()
+        await ingest.server.close()
+        return forwarded, ingest.server.forwarded
+
+    assert asyncio.run(scenario()) == (['pesan \u200b\u200c \ud800'], 1)
+
+
+def test_worker_receive_forwards_without_decoding(tmp_path, monkeypatch):
+    for module in ('fastapi', 'dotenv'):
+        pytest.importorskip(module)
+    monkeypatch.delenv('WS_LOG_DIR', raising=False)
+    main = importlib.import_module('app.receiver.main')
+
+    async def no_decode(*args, **kwargs):
+        raise AssertionError('worker must not decode forwarded messages')
+
+    monkeypatch.setattr(main.decoder, 'decode', no_decode)
+
+    async def scenario():
+        forwarded = []
+
+        async def on_forward(msg):
+            forwarded.append(msg)
+
+        ingest = Ingest(tmp_path / 'bus.sock', on_forward=on_forward)
+        await ingest.server.start()
+        client = fanout.FrameBusClient(ingest.server.path, FakeWorker(), reconnect_delay=0.01)
+        monkeypatch.setattr(main, 'bus_client', client)
+        client.start()
+        await _wait(lambda: client.connected)
+        response = await main.receive_message(main.CodedMessage(message='halo\u200b'))
+        await _wait(lambda: forwarded)
+        await client.close()
+        await ingest.server.close()
+        return response, forwarded
+
+    assert asyncio.run(scenario()) == ({'status': 'forwarded'}, ['halo\u200b'])
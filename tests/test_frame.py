@@ -0,0 +1,109 @@
+# Container berbingkai: beberapa frame dalam satu pesan pembawa, offset `index`, dan frame yang rusak.
+import pytest
+
+import zwsp
+from zwsp.frame import FRAME_HEADER_GROUPS
+from zwsp.zwsp import _tables
+
+PADDING = _tables(zwsp.MODE_FULL).padding
+ALPHABET = _tables(zwsp.MODE_FULL).alphabet
+PAYLOAD_OFFSET = 1 + FRAME_HEADER_GROUPS * PADDING
+
+
+def _carrier(*hidden):
+    frames = [zwsp.encode_frame(msg) for msg in hidden]
+    parts = ['Halo', ' dunia', ', apa', ' kabar']
+    text = parts[0]
+    for frame, part in zip(frames, parts[1:]):
+        text += frame + part
+    return text, frames
+
+
+def test_multiple_frames_per_carrier():
+    text, _ = _carrier('23.5', '{"temperature": 27.4}', 'ä€\U00010400')
+    result = zwsp.decode_frames(text)
+    assert result.messages == ['23.5', '{"temperature": 27.4}', 'ä€\U00010400']
+    assert result.carrier == 'Halo dunia, apa kabar'
+    assert result.errors == []
+
+
+def test_adjacent_frames():
+    text = 'a' + zwsp.encode_frame('x') + zwsp.encode_frame('y') + 'b'
+    assert zwsp.decode_frames(text) == (['x', 'y'], 'ab', [])
+
+
+def test_index_offsets_and_random_access():
+    text, frames = _carrier('satu', 'dua', 'tiga')
+    infos = zwsp.index(text)
+    assert [info.error for info in infos] == [None, None, None]
+    start = len('Halo')
+    for info, frame, part in zip(infos, frames, [' dunia', ', apa', ' kabar']):
+        assert (info.start, info.end) == (start, start + len(frame))
+        assert text[info.start] == zwsp.FRAME_MARKER
+        assert info.length * PADDING == len(frame) - PAYLOAD_OFFSET
+        start = info.end + len(part)
+    assert zwsp.decode_frame(text, infos[1]) == 'dua'
+
+
+def test_compressed_frame():
+    hidden = 'suhu 27.5;' * 50
+    frame = zwsp.encode_frame(hidden, 'zlib')
+    assert len(frame) < len(zwsp.encode_frame(hidden))
+    assert zwsp.decode_frames('c' + frame).messages == [hidden]
+
+
+def test_dropped_glyph_is_skipped_and_reported():
+    text, frames = _carrier('satu', 'dua', 'tiga')
+    infos = zwsp.index(text)
+    # Satu glyph payload frame kedua hilang: frame tersebut terpotong, frame lain tetap terbaca
+    drop = infos[1].start + PAYLOAD_OFFSET + 3
+    damaged = text[:drop] + text[drop + 1:]
+    result = zwsp.decode_frames(damaged)
+    assert result.messages == ['satu', 'tiga']
+    assert result.carrier == 'Halo dunia, apa kabar'
+    assert len(result.errors) == 1
+    error = result.errors[0]
+    assert (error.start, error.end) == (infos[1].start, infos[1].end - 1)
+    assert 'truncated payload' in error.reason
+    assert zwsp.index(damaged)[1].error == 'truncated payload'
+
+
+def test_dropped_header_glyph_is_reported():
+    text, _ = _carrier('satu', 'dua')
+    info = zwsp.index(text)[0]
+    damaged = text[:info.start + 2] + text[info.start + 3:]
+    result = zwsp.decode_frames(damaged)
+    assert result.messages == ['dua']
+    assert len(result.errors) == 1
+
+
+def test_flipped_glyph_fails_checksum():
+    text, _ = _carrier('satu', 'dua', 'tiga')
+    infos = zwsp.index(text)
+    pos = infos[2].start + PAYLOAD_OFFSET + PADDING + 1
+    flipped = ALPHABET[(ALPHABET.index(text[pos]) + 1) % len(ALPHABET)]
+    damaged = text[:pos] + flipped + text[pos + 1:]
+    # Struktur frame tetap utuh, sehingga kerusakan baru terdeteksi oleh CRC32 saat decode
+    assert [info.error for info in zwsp.index(damaged)] == [None, None, None]
+    result = zwsp.decode_frames(damaged)
+    assert result.messages == ['satu', 'dua']
+    assert [(error.start, error.end, error.reason) for error in result.errors] == \
+        [(infos[2].start, infos[2].end, 'Corrupted frame: checksum mismatch')]
+    with pytest.raises(TypeError):
+        zwsp.decode_frame(damaged, zwsp.index(damaged)[2])
+
+
+def test_truncated_header():
+    frame = zwsp.encode_frame('x')
+    result = zwsp.decode_frames('a' + frame[:PADDING] + 'b')
+    assert result.messages == []
+    assert result.carrier == 'ab'
+    assert [error.reason for error in result.errors] == ['Corrupted frame: truncated header']
+
+
+def test_no_frames_and_type_errors():
+    assert zwsp.index('teks biasa') == []
+    assert zwsp.decode_frames('teks biasa') == ([], 'teks biasa', [])
+    for func in (zwsp.encode_frame, zwsp.index, zwsp.decode_frames):
+        with pytest.raises(TypeError):
+            func(b'bytes')
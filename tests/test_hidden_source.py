@@ -0,0 +1,176 @@
+# CachedSource dengan backend offline (file dan SQLite): cache TTL, nilai basi saat backend gagal, dan push.
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.sender.sources import CachedSource, FileSource, SQLiteSource
+
+
+def _sqlite(path, *temperatures):
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS readings (temperature REAL, timestamp INTEGER)')
+        conn.executemany('INSERT INTO readings VALUES (?, ?)',
+                         [(value, idx) for idx, value in enumerate(temperatures, start=1)])
+    return SQLiteSource(str(path))
+
+
+def test_file_source_formats(tmp_path):
+    path = tmp_path / 'hidden'
+    path.write_text('{"temperature": 20.2, "timestamp": 2}\n{"temperature": 31.9, "timestamp": 1}\n')
+    assert FileSource(path).fetch() == '20'
+    path.write_text('rahasia\n')
+    assert FileSource(path).fetch() == 'rahasia'
+
+
+def test_sqlite_source_latest(tmp_path):
+    assert _sqlite(tmp_path / 'db.sqlite', 25.4, 27.9).fetch() == '27'
+
+
+def test_ttl_hit_does_not_fetch(tmp_path):
+    path = tmp_path / 'hidden'
+    path.write_text('27')
+    cache = CachedSource(FileSource(path), ttl=60, refresh_interval=0)
+
+    async def scenario():
+        await cache.start()
+        path.write_text('30')
+        values = [await cache.get() for _ in range(3)]
+        await cache.stop()
+        return values
+
+    assert asyncio.run(scenario()) == ['27', '27', '27']
+    assert (cache.refreshes, cache.hits) == (1, 3)
+
+
+def test_expired_value_is_refreshed_once(tmp_path):
+    source = _sqlite(tmp_path / 'db.sqlite', 25)
+    cache = CachedSource(source, ttl=60, refresh_interval=0)
+
+    async def scenario():
+        await cache.start()
+        _sqlite(tmp_path / 'db.sqlite', 26, 29)
+        cache.updated_at -= 120
+        # Pengambilan yang bersamaan digabung menjadi satu refresh
+        values = await asyncio.gather(*(cache.get() for _ in range(5)))
+        await cache.stop()
+        return values
+
+    assert asyncio.run(scenario()) == ['29'] * 5
+    assert cache.refreshes == 2
+
+
+def test_stale_value_served_when_backend_fails(tmp_path):
+    db = tmp_path / 'db.sqlite'
+    cache = CachedSource(_sqlite(db, 27), ttl=60, refresh_interval=0)
+
+    async def scenario():
+        await cache.start()
+        with sqlite3.connect(db) as conn:
+            conn.execute('DROP TABLE readings')
+        cache.updated_at -= 120
+        value = await cache.get()
+        await cache.stop()
+        return value
+
+    assert asyncio.run(scenario()) == '27'
+    assert (cache.errors, cache.stale_served) == (1, 1)
+    assert cache.stats()['stale']
+
+
+def test_failed_fetch_without_value_raises(tmp_path):
+    cache = CachedSource(FileSource(tmp_path / 'missing'), ttl=60, refresh_interval=0)
+
+    async def scenario():
+        await cache.start()
+        try:
+            await cache.get()
+        finally:
+            await cache.stop()
+
+    with pytest.raises(OSError):
+        asyncio.run(scenario())
+    assert cache.errors == 2
+
+
+class PushFileSource(FileSource):
+    """
+    FileSource dengan listener push: `push()` memanggil callback dari thread lain seperti listener Firebase.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.callback = None
+        self.closed = False
+
+    def listen(self, callback):
+        self.callback = callback
+        return self.close
+
+    def close(self):
+        self.closed = True
+
+    def push(self):
+        thread = threading.Thread(target=lambda: self.callback(self.fetch()))
+        thread.start()
+        thread.join()
+
+
+def test_push_updates_cache(tmp_path):
+    path = tmp_path / 'hidden'
+    path.write_text('27')
+    source = PushFileSource(path)
+    cache = CachedSource(source, ttl=60, refresh_interval=0)
+
+    async def scenario():
+        await cache.start()
+        path.write_text('31')
+        source.push()
+        await asyncio.sleep(0)
+        value = await cache.get()
+        await cache.stop()
+        return value
+
+    assert asyncio.run(scenario()) == '31'
+    assert (cache.pushes, cache.refreshes) == (1, 1)
+    assert source.closed
+
+
+class UnreachableSource(FileSource):
+    """
+    Backend yang tidak dapat dihubungi saat start: fetch dan listen gagal sampai `online` diaktifkan.
+    """
+
+    online = False
+
+    def fetch(self):
+        if not self.online:
+            raise ConnectionError('unreachable')
+        return super().fetch()
+
+    def listen(self, callback):
+        raise ConnectionError('unreachable')
+
+
+def test_start_survives_unreachable_backend(tmp_path):
+    path = tmp_path / 'hidden'
+    path.write_text('27')
+    source = UnreachableSource(path)
+    cache = CachedSource(source, ttl=60, refresh_interval=0.01)
+
+    async def scenario():
+        await cache.start()
+        assert cache._task is not None and not cache._task.done()
+        source.online = True
+        for _ in range(100):
+            if cache.value is not None:
+                break
+            await asyncio.sleep(0.01)
+        value = await cache.get()
+        await cache.stop()
+        return value
+
+    assert asyncio.run(scenario()) == '27'
+    assert cache._task is None
+    assert cache.errors >= 1
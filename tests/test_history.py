@@ -0,0 +1,22 @@
+# MessageHistory memberi nomor urut pada salinan data, bukan pada dict milik pemanggil.
+import orjson
+
+from app.receiver.history import MessageHistory, RingBuffer
+
+
+def test_append_does_not_mutate_caller_data():
+    history = MessageHistory(RingBuffer(4))
+    data = {'hidden_message': 'rahasia'}
+    framed, payload = history.append(data)
+    assert data == {'hidden_message': 'rahasia'}
+    assert framed == {'hidden_message': 'rahasia', 'seq': 1}
+    assert orjson.loads(payload) == framed
+    assert history.ring.since(0, 1) == [(1, payload)]
+
+
+def test_append_numbers_frames_in_order():
+    history = MessageHistory(RingBuffer(4))
+    data = {'hidden_message': ''}
+    seqs = [history.append(data)[0]['seq'] for _ in range(3)]
+    assert seqs == [1, 2, 3]
+    assert 'seq' not in data
@@ -0,0 +1,36 @@
+# Pembagian beban receiver melalui shared subscription MQTT v5 (lihat `benchmarks.bench_scaling`).
+import pytest
+
+from app.common.topics import subscription
+
+
+def test_subscription_filter():
+    assert subscription('zwsp') == 'zwsp/#'
+    assert subscription('zwsp', 'receivers') == '$share/receivers/zwsp/#'
+    for topic, group in (('zwsp/#', None), ('', None), ('zwsp', 'a/b'), ('zwsp', '')):
+        with pytest.raises(ValueError):
+            subscription(topic, group)
+
+
+def test_subscription_from_env(monkeypatch):
+    from app.common.topics import subscription_from_env
+
+    monkeypatch.setenv('MQTT_TOPIC', 'sensor')
+    monkeypatch.delenv('MQTT_SHARED_GROUP', raising=False)
+    assert subscription_from_env() == 'sensor/#'
+    monkeypatch.setenv('MQTT_SHARED_GROUP', 'receivers')
+    assert subscription_from_env() == '$share/receivers/sensor/#'
+
+
+def test_receivers_split_load_evenly():
+    # Menjalankan process receiver yang sebenarnya (client MQTT, callback, dan decode) dalam satu shared
+    # subscription, lalu membandingkan jumlah pesan yang ditangani setiap receiver dari `/metrics`
+    for module in ('fastapi', 'fastapi_mqtt', 'uvicorn', 'httpx'):
+        pytest.importorskip(module)
+    from benchmarks import bench_scaling
+
+    rows = bench_scaling.run([1, 2], messages=400, hidden_size=100)
+    for row in rows:
+        share = 1 / int(row['workers'])
+        assert row['min_share'] >= share - 0.01
+        assert row['max_share'] <= share + 0.01
@@ -0,0 +1,80 @@
+# `POST /send/batch` harus membaca body NDJSON maupun JSON array selama response NDJSON dikirim.
+import importlib
+
+import orjson
+import pytest
+
+import zwsp
+
+pytest.importorskip('fastapi')
+pytest.importorskip('dotenv')
+pytest.importorskip('httpx')
+
+
+@pytest.fixture
+def sender(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    hidden = tmp_path / 'hidden.txt'
+    hidden.write_text('27', encoding='utf-8')
+    monkeypatch.setenv('HIDDEN_SOURCE', 'file')
+    monkeypatch.setenv('HIDDEN_SOURCE_PATH', str(hidden))
+    monkeypatch.setenv('ZWSP_MODE', 'zwsp')
+    main = importlib.import_module('app.sender.main')
+    monkeypatch.setattr(main, 'hidden_source', main.sources.from_env())
+    published = []
+    monkeypatch.setattr(main, 'publish', lambda topic, payload, qos=0, endpoint='send':
+                        published.append((topic, payload, qos, endpoint)))
+    # Tanpa `with`, lifespan (koneksi MQTT) tidak dijalankan
+    return TestClient(main.app), published
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_ndjson_body(sender):
+    client, published = sender
+    body = b'"a"\n{"message": "b", "hidden": "x"}\n\n{"message": 1}\nnot json\n{"message": "c"}'
+    lines = _lines(client.post('/send/batch?qos=1', content=body, timeout=10))
+
+    assert [line.get('status') for line in lines[:-1]] == ['sent', 'sent', 'error', 'error', 'sent']
+    assert [line['index'] for line in lines[:-1]] == [0, 1, 2, 3, 4]
+    assert lines[0]['encoded_message'] == 'a' + zwsp.encode('27', zwsp.MODE_ZWSP)
+    assert lines[1]['encoded_message'] == 'b' + zwsp.encode('x', zwsp.MODE_ZWSP)
+    summary = lines[-1]['summary']
+    assert (summary['count'], summary['sent'], summary['errors']) == (5, 3, 2)
+    assert [(payload, qos, endpoint) for _, payload, qos, endpoint in published] == \
+        [(line['encoded_message'], 1, 'batch') for line in lines if line.get('status') == 'sent']
+
+
+def test_json_array_body(sender):
+    client, published = sender
+    body = orjson.dumps(['a', {'body': 'b', 'key': 'device-1'}])
+    lines = _lines(client.post('/send/batch?field=body', content=body, timeout=10))
+
+    assert [line['status'] for line in lines[:-1]] == ['sent', 'sent']
+    assert lines[-1]['summary']['sent'] == 2
+    assert [payload for _, payload, _, _ in published] == [line['encoded_message'] for line in lines[:-1]]
+
+
+def test_large_ndjson_body_is_streamed(sender):
+    client, published = sender
+    count = 5000
+    body = b''.join(orjson.dumps({'message': 'pesan {0}'.format(idx)}) + b'\n' for idx in range(count))
+    lines = _lines(client.post('/send/batch', content=body, timeout=30))
+
+    assert len(lines) == count + 1
+    assert lines[-1]['summary']['sent'] == count
+    assert len(published) == count
+
+
+def test_invalid_array_reports_error(sender):
+    client, published = sender
+    lines = _lines(client.post('/send/batch', content=b'["a", ', timeout=10))
+
+    assert lines[-1]['summary']['count'] == 0
+    assert 'error' in lines[-1]['summary']
+    assert published == []
@@ -0,0 +1,64 @@
+# Encoder/decoder bertahap: hasil per potongan sama dengan `zwsp.encode`/`zwsp.decode`, dengan buffer terbatas.
+import pytest
+
+import zwsp
+from zwsp.zwsp import _tables
+
+MODES = [zwsp.MODE_ZWSP, zwsp.MODE_FULL]
+HIDDEN = '{"temperature": 27.4} ä€\U00012000'
+
+
+@pytest.mark.parametrize('mode', MODES, ids=['zwsp', 'full'])
+def test_decode_one_char_chunks(mode):
+    msg = 'Halo dunia' + zwsp.encode(HIDDEN, mode) + ' selesai'
+    padding = _tables(mode).padding
+    decoder = zwsp.StreamDecoder(mode)
+    hidden, carrier = [], []
+    for char in msg:
+        part_hidden, part_carrier = decoder.feed(char)
+        hidden.append(part_hidden)
+        carrier.append(part_carrier)
+        # Hanya kelompok glyph yang belum lengkap yang disimpan
+        assert len(decoder._pending) < padding
+    assert decoder.close() == ('', '')
+    assert (''.join(hidden), ''.join(carrier)) == tuple(zwsp.decode(msg, mode))
+
+
+@pytest.mark.parametrize('mode', MODES, ids=['zwsp', 'full'])
+def test_decode_uneven_chunks(mode):
+    msg = 'carrier ' + zwsp.encode(HIDDEN * 20, mode)
+    chunks = [msg[idx:idx + 13] for idx in range(0, len(msg), 13)]
+    results = list(zwsp.StreamDecoder(mode).iterdecode(chunks))
+    assert ''.join(hidden for hidden, _ in results) == HIDDEN * 20
+    assert ''.join(carrier for _, carrier in results) == 'carrier '
+
+
+@pytest.mark.parametrize('mode', MODES, ids=['zwsp', 'full'])
+def test_close_rejects_incomplete_group(mode):
+    encoded = zwsp.encode('ab', mode)
+    decoder = zwsp.StreamDecoder(mode)
+    assert decoder.feed(encoded[:-1]) == ('a', '')
+    with pytest.raises(TypeError):
+        decoder.close()
+    # Sisa kelompok dibuang, sehingga decoder dapat dipakai untuk stream berikutnya
+    assert decoder.close() == ('', '')
+    with pytest.raises(TypeError):
+        list(zwsp.StreamDecoder(mode).iterdecode([encoded[:3], encoded[3:-1]]))
+
+
+@pytest.mark.parametrize('mode', MODES, ids=['zwsp', 'full'])
+def test_encode_chunks(mode):
+    text = HIDDEN * 5
+    encoder = zwsp.StreamEncoder(mode)
+    chunks = [text[idx:idx + 7] for idx in range(0, len(text), 7)] + ['']
+    encoded = ''.join(encoder.iterencode(chunks)) + encoder.close()
+    assert encoded == zwsp.encode(text, mode)
+
+
+@pytest.mark.parametrize('cls', [zwsp.StreamDecoder, zwsp.StreamEncoder])
+def test_invalid_mode_and_input(cls):
+    for mode in (zwsp.MODE_PACKED, zwsp.MODE_AUTO):
+        with pytest.raises(ValueError):
+            cls(mode)
+    with pytest.raises(TypeError):
+        cls(zwsp.MODE_FULL).feed(b'bytes')
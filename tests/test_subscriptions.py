@@ -0,0 +1,139 @@
+# Filter langganan WebSocket: proyeksi topik, field, dan has_hidden, serta satu serialisasi per kelompok filter.
+import asyncio
+
+import orjson
+import pytest
+
+from app.receiver import subscriptions
+from app.receiver.subscriptions import Subscription, topic_matches
+
+
+def _message(topic='zwsp/3', hidden='27', mode='zwsp', seq=4):
+    data = {
+        'encoded_message': 'halo',
+        'decoded_message': 'halo' + hidden,
+        'hidden_message': hidden,
+        'carrier_message': 'halo',
+        'mode': mode,
+        'seq': seq,
+    }
+    if topic is not None:
+        data['topic'] = topic
+    return data
+
+
+@pytest.mark.parametrize('pattern,topic,expected', [
+    ('zwsp/#', 'zwsp', True),
+    ('zwsp/#', 'zwsp/3', True),
+    ('zwsp/+', 'zwsp/3', True),
+    ('zwsp/+', 'zwsp/3/a', False),
+    ('zwsp/3', 'zwsp/4', False),
+    ('+/3', 'zwsp/3', True),
+])
+def test_topic_matches(pattern, topic, expected):
+    assert topic_matches(pattern, topic) is expected
+
+
+def test_topic_filter():
+    subscription = Subscription(topics=['zwsp/+'])
+    assert subscription.apply(_message('zwsp/3')) == _message('zwsp/3')
+    assert subscription.apply(_message('other/3')) is None
+    # Pesan dari `POST /receive` tidak memiliki topik
+    assert subscription.apply(_message(None)) is None
+
+
+def test_field_projection_keeps_seq():
+    subscription = Subscription(fields=['hidden_message'])
+    assert subscription.apply(_message()) == {'hidden_message': '27', 'seq': 4}
+    # Tanpa riwayat pesan tidak memiliki `seq`
+    assert subscription.apply({'hidden_message': '30', 'mode': 'zwsp'}) == {'hidden_message': '30'}
+
+
+def test_has_hidden_and_modes():
+    with_hidden = Subscription(has_hidden=True)
+    without_hidden = Subscription(has_hidden=False)
+    assert with_hidden.apply(_message(hidden='27')) is not None
+    assert with_hidden.apply(_message(hidden='')) is None
+    assert without_hidden.apply(_message(hidden='')) is not None
+    assert Subscription(modes=['full']).apply(_message(mode='zwsp')) is None
+
+
+def test_batch_frame_is_filtered_per_message():
+    subscription = Subscription(topics=['zwsp/1'], fields=['hidden_message'])
+    batch = {'type': 'batch', 'count': 3, 'seq': 9,
+             'messages': [_message('zwsp/1', '20'), _message('zwsp/2', '21'), _message('zwsp/1', '22')]}
+    assert subscription.apply(batch) == {
+        'type': 'batch', 'count': 2, 'seq': 9,
+        'messages': [{'hidden_message': '20', 'seq': 4}, {'hidden_message': '22', 'seq': 4}],
+    }
+    assert Subscription(topics=['zwsp/5']).apply(batch) is None
+
+
+def test_same_filter_same_key():
+    a = Subscription(topics=['b', 'a'], fields=['mode', 'topic'])
+    b = Subscription(topics=['a', 'b', 'a'], fields=['topic', 'mode'])
+    assert a.key == b.key
+    assert a.key != Subscription(topics=['a']).key
+
+
+@pytest.mark.parametrize('raw', [
+    'not json', '[]', '{"type": "other"}', '{"type": "subscribe", "topics": "zwsp"}',
+    '{"type": "subscribe", "topics": ["zwsp/#/x"]}', '{"type": "subscribe", "fields": ["secret"]}',
+    '{"type": "subscribe", "has_hidden": "yes"}',
+])
+def test_parse_rejects_invalid(raw):
+    with pytest.raises(ValueError):
+        subscriptions.parse(raw)
+
+
+def test_parse():
+    assert subscriptions.parse('{"type": "unsubscribe"}') is None
+    subscription = subscriptions.parse(b'{"type": "subscribe", "fields": ["hidden_message"], "has_hidden": true}')
+    assert subscription.describe() == {'topics': None, 'fields': ['hidden_message'], 'has_hidden': True, 'modes': None}
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.sent.append(frame)
+
+    send_bytes = send_text
+
+    async def close(self, code=1000):
+        pass
+
+
+def test_one_serialization_per_filter_group():
+    pytest.importorskip('fastapi')
+    from app.receiver.websocket_manager import ConnectionManager
+
+    async def scenario():
+        manager = ConnectionManager()
+        first, second, other, plain = (RecordingWebSocket() for _ in range(4))
+        for ws in (first, second, other, plain):
+            await manager.connect(ws)
+        control = b'{"type": "subscribe", "fields": ["hidden_message"], "has_hidden": true}'
+        manager.handle_message(first, control)
+        manager.handle_message(second, control)
+        manager.handle_message(other, b'{"type": "subscribe", "topics": ["zwsp/9"]}')
+        groups = manager.group_count()
+        await manager.broadcast_json(_message('zwsp/3'))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await manager.close()
+        return groups, first, second, other, plain
+
+    groups, first, second, other, plain = asyncio.run(scenario())
+    assert groups == 3
+    assert orjson.loads(first.sent[0])['type'] == 'subscribed'
+    assert orjson.loads(first.sent[-1]) == {'hidden_message': '27', 'seq': 4}
+    # Koneksi dengan filter yang sama menerima objek frame yang sama (serialisasi satu kali)
+    assert first.sent[-1] is second.sent[-1]
+    # Topik tidak cocok: hanya frame konfirmasi yang diterima
+    assert [orjson.loads(frame)['type'] for frame in other.sent] == ['subscribed']
+    assert orjson.loads(plain.sent[-1]) == _message('zwsp/3')
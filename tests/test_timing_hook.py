@@ -0,0 +1,59 @@
+# Timing hook `zwsp` juga harus menerima waktu operasi batch NumPy dan decode di process pool receiver.
+import asyncio
+
+import pytest
+
+import zwsp
+from app.receiver.decoder import DecodeExecutor
+
+
+@pytest.fixture
+def calls():
+    recorded = []
+    previous = zwsp.set_timing_hook(lambda *args: recorded.append(args))
+    yield recorded
+    zwsp.set_timing_hook(previous)
+
+
+def test_get_timing_hook(calls):
+    assert zwsp.get_timing_hook() is not None
+
+
+def test_batch_numpy_path_is_timed(calls):
+    pytest.importorskip('numpy')
+    msgs = ['abc', 'de']
+    encoded = zwsp.encode_many(msgs, zwsp.MODE_ZWSP)
+    zwsp.decode_many(encoded, zwsp.MODE_ZWSP)
+    assert [(call[0], call[1], call[3], call[4]) for call in calls] == [
+        ('encode_many', zwsp.MODE_ZWSP, 5, 55),
+        ('decode_many', zwsp.MODE_ZWSP, 55, 5),
+    ]
+    assert all(call[2] >= 0 for call in calls)
+
+
+def test_batch_per_message_path_is_timed(calls):
+    encoded = zwsp.encode_many(['abc'], zwsp.MODE_PACKED)
+    zwsp.decode_many(encoded, zwsp.MODE_AUTO)
+    assert [(call[0], call[1]) for call in calls] == [('encode', zwsp.MODE_PACKED), ('decode', zwsp.MODE_PACKED)]
+
+
+def test_process_pool_decode_is_timed(calls):
+    executor = DecodeExecutor(zwsp.MODE_ZWSP, inline_limit=0, process_limit=1, processes=1)
+    msg = 'carrier' + zwsp.encode('23.5', zwsp.MODE_ZWSP)
+    del calls[:]
+
+    async def run():
+        single = await executor.decode(msg)
+        many = await executor.decode_many([msg, msg])
+        return single, many
+
+    try:
+        single, many = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert single == ('23.5', 'carrier')
+    assert many == [('23.5', 'carrier')] * 2
+    assert executor.counts['process'] == 2
+    assert calls[0][:2] == ('decode', zwsp.MODE_ZWSP)
+    assert calls[0][3:] == (len(msg), 4)
+    assert [call[0] for call in calls[1:]] in (['decode_many'], ['decode', 'decode'])
@@ -0,0 +1,120 @@
+# Antrean keluar per koneksi WebSocket: kebijakan overflow untuk client yang macet dan pembuangan koneksi mati.
+import asyncio
+
+import orjson
+import pytest
+
+pytest.importorskip('fastapi')
+
+from app.receiver.websocket_manager import (  # noqa: E402
+    CLOSE_SLOW_CONSUMER, ConnectionManager, POLICY_DISCONNECT, POLICY_DROP_NEWEST, POLICY_DROP_OLDEST,
+)
+
+
+class StalledWebSocket:
+    """
+    WebSocket palsu yang macet di pengiriman pertama sampai `release()` dipanggil.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+        self._gate = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await self._gate.wait()
+        self.sent.append(frame)
+
+    send_bytes = send_text
+
+    async def close(self, code=1000):
+        self.closed = code
+
+    def release(self):
+        self._gate.set()
+
+
+class BrokenWebSocket(StalledWebSocket):
+    async def send_text(self, frame):
+        raise ConnectionResetError('client went away')
+
+    send_bytes = send_text
+
+
+async def _stalled(policy):
+    manager = ConnectionManager(queue_size=2, overflow_policy=policy)
+    ws = StalledWebSocket()
+    await manager.connect(ws)
+    for idx in range(5):
+        await manager.broadcast_text(str(idx))
+        # Writer task mengambil frame 0 lalu macet di send; frame berikutnya mengisi antrean
+        await asyncio.sleep(0)
+    conn = manager.active_connections.get(ws)
+    state = {
+        'connected': conn is not None,
+        'queued': manager.queue_depths(),
+        'dropped': manager.dropped_total,
+        'groups': manager.group_count(),
+    }
+    ws.release()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    state['sent'] = ws.sent
+    state['closed'] = ws.closed
+    await manager.close()
+    return state
+
+
+def test_drop_oldest_keeps_latest_frames():
+    state = asyncio.run(_stalled(POLICY_DROP_OLDEST))
+    assert state['connected'] and state['queued'] == [2]
+    assert state['dropped'] == 2
+    assert state['sent'] == ['0', '3', '4']
+
+
+def test_drop_newest_keeps_queued_frames():
+    state = asyncio.run(_stalled(POLICY_DROP_NEWEST))
+    assert state['connected'] and state['queued'] == [2]
+    assert state['dropped'] == 2
+    assert state['sent'] == ['0', '1', '2']
+
+
+def test_disconnect_prunes_slow_client():
+    state = asyncio.run(_stalled(POLICY_DISCONNECT))
+    assert not state['connected']
+    assert state['queued'] == []
+    assert state['groups'] == 0
+    assert state['dropped'] == 1
+    assert state['closed'] == CLOSE_SLOW_CONSUMER
+    # Writer task dibatalkan saat diputus, sehingga frame yang macet tidak pernah terkirim
+    assert state['sent'] == []
+
+
+def test_failed_send_prunes_connection():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2)
+        broken, healthy = BrokenWebSocket(), StalledWebSocket()
+        healthy.release()
+        await manager.connect(broken)
+        await manager.connect(healthy)
+        await manager.broadcast_json({'hidden_message': '27'})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        result = (list(manager.active_connections), manager.group_count(), healthy.sent)
+        await manager.close()
+        return result, healthy
+
+    (active, groups, sent), healthy = asyncio.run(scenario())
+    assert active == [healthy]
+    assert groups == 1
+    assert [orjson.loads(frame) for frame in sent] == [{'hidden_message': '27'}]
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        ConnectionManager(queue_size=0)
+    with pytest.raises(ValueError):
+        ConnectionManager(overflow_policy='block')
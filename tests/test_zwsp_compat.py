@@ -0,0 +1,108 @@
+# Uji regresi: engine encode/decode berbasis tabel harus menghasilkan output yang sama persis dengan
+# implementasi awal untuk setiap codepoint BMP pada MODE_ZWSP dan MODE_FULL.
+import pytest
+
+import zwsp
+from zwsp.zwsp import list_FULL, list_ZWSP, get_padding_len
+
+BMP = range(0x10000)
+
+
+# --- Implementasi awal (disalin apa adanya, tanpa komentar) -------------------------------------------
+
+def old_to_base(num, b, numerals='0123456789abcdefghijklmnopqrstuvwxyz'):
+    return ((num == 0) and numerals[0]) or (old_to_base(num // b, b, numerals).lstrip(numerals[0]) + numerals[num % b])
+
+
+def old_encode(msg, mode=zwsp.MODE_FULL):
+    if not isinstance(msg, str):
+        raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+    alphabet = list_ZWSP if mode == zwsp.MODE_ZWSP else list_FULL
+    padding = get_padding_len(mode)
+    encoded = ''
+    if (len(msg) == 0):
+        return ''
+    for msg_char in msg:
+        code = '{0}{1}'.format(
+            '0' * padding, int(str(old_to_base(ord(msg_char), len(alphabet)))))
+        code = code[len(code) - padding:]
+        for code_char in code:
+            idx = int(code_char)
+            encoded = encoded+alphabet[idx]
+    return encoded
+
+
+def old_decode(msg, mode=zwsp.MODE_FULL):
+    if not isinstance(msg, str):
+        raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+    alphabet = list_ZWSP if mode == zwsp.MODE_ZWSP else list_FULL
+    padding = get_padding_len(mode)
+    encoded = ''
+    decoded = ''
+    original = ''
+    for msg_char in msg:
+        if msg_char in alphabet:
+            encoded = encoded + str(alphabet.index(msg_char))
+        else:
+            original = original+msg_char
+    if (len(encoded) % padding != 0):
+        raise TypeError('Unknown encoding detected!')
+    cur_encoded_char = ''
+    for idx, encoded_char in enumerate(encoded):
+        cur_encoded_char = cur_encoded_char + encoded_char
+        if idx > 0 and (idx + 1) % padding == 0:
+            decoded = decoded + chr(int(cur_encoded_char, len(alphabet)))
+            cur_encoded_char = ''
+    return (decoded, original)
+
+
+# --- Pengujian -------------------------------------------------------------------------------------------
+
+@pytest.fixture(scope='module', params=[zwsp.MODE_ZWSP, zwsp.MODE_FULL], ids=['zwsp', 'full'])
+def bmp_encoded(request):
+    mode = request.param
+    return mode, [old_encode(chr(codepoint), mode) for codepoint in BMP]
+
+
+def test_encode_every_bmp_codepoint(bmp_encoded):
+    mode, expected = bmp_encoded
+    for codepoint in BMP:
+        assert zwsp.encode(chr(codepoint), mode) == expected[codepoint], hex(codepoint)
+
+
+def test_encode_whole_bmp_in_one_message(bmp_encoded):
+    mode, expected = bmp_encoded
+    text = ''.join(map(chr, BMP))
+    assert zwsp.encode(text, mode) == ''.join(expected)
+
+
+def test_decode_every_bmp_codepoint(bmp_encoded):
+    mode, expected = bmp_encoded
+    for codepoint in BMP:
+        carrier = 'carrier {0}'.format(codepoint)
+        msg = carrier[:4] + expected[codepoint] + carrier[4:]
+        assert tuple(zwsp.decode(msg, mode)) == old_decode(msg, mode), hex(codepoint)
+
+
+def test_decode_whole_bmp_in_one_message(bmp_encoded):
+    mode, expected = bmp_encoded
+    msg = 'head ' + ''.join(expected) + ' tail'
+    assert tuple(zwsp.decode(msg, mode)) == old_decode(msg, mode)
+
+
+@pytest.mark.parametrize('mode', [zwsp.MODE_ZWSP, zwsp.MODE_FULL], ids=['zwsp', 'full'])
+def test_decode_invalid_length_matches(mode):
+    msg = 'abc' + old_encode('x', mode)[1:]
+    with pytest.raises(TypeError):
+        old_decode(msg, mode)
+    with pytest.raises(TypeError):
+        zwsp.decode(msg, mode)
+
+
+@pytest.mark.parametrize('mode', [zwsp.MODE_ZWSP, zwsp.MODE_FULL], ids=['zwsp', 'full'])
+def test_empty_and_non_string_inputs_match(mode):
+    assert zwsp.encode('', mode) == old_encode('', mode) == ''
+    assert tuple(zwsp.decode('', mode)) == old_decode('', mode) == ('', '')
+    for func in (zwsp.encode, zwsp.decode, old_encode, old_decode):
+        with pytest.raises(TypeError):
+            func(b'abc', mode)
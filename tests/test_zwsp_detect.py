@@ -0,0 +1,65 @@
+import pytest
+
+import zwsp
+from zwsp.zwsp import LEFT_TO_RIGHT_MARK, RIGHT_TO_LEFT_MARK
+
+SAMPLES = ['23.5', 'pesan rahasia', '\U00010400abc', 'ä€\U00012000 campuran', '{"temperature": 27.4}']
+
+
+@pytest.mark.parametrize('mode', [zwsp.MODE_ZWSP, zwsp.MODE_FULL, zwsp.MODE_PACKED], ids=['zwsp', 'full', 'packed'])
+@pytest.mark.parametrize('hidden', SAMPLES)
+def test_auto_roundtrip(mode, hidden):
+    msg = 'carrier ' + zwsp.encode(hidden, mode) + ' text'
+    result = zwsp.decode(msg, zwsp.MODE_AUTO)
+    assert result == (hidden, 'carrier  text')
+    assert result.mode == mode
+
+
+@pytest.mark.parametrize('mark', [LEFT_TO_RIGHT_MARK, RIGHT_TO_LEFT_MARK])
+def test_zwsp_payload_with_direction_mark_in_carrier(mark):
+    carrier = 'שלום' + mark + ' abc'
+    msg = carrier + zwsp.encode('23.5', zwsp.MODE_ZWSP)
+    expected = zwsp.decode(msg, zwsp.MODE_ZWSP)
+    assert expected == ('23.5', carrier)
+    result = zwsp.decode(msg, zwsp.MODE_AUTO)
+    assert result == expected
+    assert result.mode == zwsp.MODE_ZWSP
+
+
+def test_direction_mark_without_payload():
+    msg = 'שלום' + RIGHT_TO_LEFT_MARK + ' abc'
+    result = zwsp.decode(msg, zwsp.MODE_AUTO)
+    assert result == ('', msg)
+    assert result.mode is None
+
+
+def test_full_payload_starting_above_bmp_is_not_packed():
+    msg = zwsp.encode('\U00010400abc', zwsp.MODE_FULL)
+    assert zwsp.detect_mode(msg) == zwsp.MODE_FULL
+    result = zwsp.decode(msg, zwsp.MODE_AUTO)
+    assert result == ('\U00010400abc', '')
+    assert result.mode == zwsp.MODE_FULL
+
+
+def test_full_payload_with_header_like_first_group_falls_back_to_full():
+    # U+10001 terlihat seperti header MODE_PACKED yang valid, tetapi payload-nya bukan UTF-8 yang valid
+    hidden = '\U00010001\udc80'
+    msg = zwsp.encode(hidden, zwsp.MODE_FULL)
+    assert zwsp.detect_mode(msg) == zwsp.MODE_PACKED
+    result = zwsp.decode(msg, zwsp.MODE_AUTO)
+    assert result == (hidden, '')
+    assert result.mode == zwsp.MODE_FULL
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'lzma', 'zdict'])
+def test_packed_with_compression_is_detected(compression):
+    hidden = '{"temperature": 27.4, "status": "ok"}'
+    result = zwsp.decode('x' + zwsp.encode(hidden, zwsp.MODE_PACKED, compression), zwsp.MODE_AUTO)
+    assert result == (hidden, 'x')
+    assert result.mode == zwsp.MODE_PACKED
+
+
+def test_invalid_length_still_raises():
+    msg = zwsp.encode('abc', zwsp.MODE_ZWSP)[:-1]
+    with pytest.raises(TypeError):
+        zwsp.decode(msg, zwsp.MODE_AUTO)
@@ -1,3 +1,7 @@
 __version__ = '1.0.0'
 
-from zwsp.zwsp import encode, decode, MODE_FULL, MODE_ZWSP
+from zwsp.zwsp import encode, decode, detect_mode, set_timing_hook, get_timing_hook, Codec, CODEC_ZWSP, CODEC_FULL, DecodeResult, MODE_FULL, MODE_ZWSP, MODE_PACKED, MODE_AUTO, MODE_NAMES
+from zwsp.compression import register_codec, codec_names
+from zwsp.batch import encode_many, decode_many
+from zwsp.stream import StreamDecoder, StreamEncoder
+from zwsp.frame import encode_frame, decode_frame, decode_frames, index, FRAME_MARKER
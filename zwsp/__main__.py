@@ -0,0 +1,5 @@
+import sys
+
+from zwsp.cli import main
+
+sys.exit(main())
@@ -0,0 +1,232 @@
+# Encode/decode banyak pesan sekaligus (batch).
+#
+# Jika NumPy tersedia, seluruh batch diubah menjadi satu array codepoint dan ekspansi/penggabungan
+# digit basis-3/basis-5 dilakukan sebagai operasi array (matriks padding x N). Jika NumPy tidak
+# tersedia, digunakan fallback Python murni yang memanggil `encode`/`decode` untuk setiap pesan.
+# MODE_PACKED bekerja pada byte UTF-8 per pesan dan MODE_AUTO mendeteksi mode per pesan, sehingga
+# keduanya selalu memakai jalur per pesan.
+#
+# Jalur NumPy tidak memanggil `encode`/`decode`, sehingga waktunya dilaporkan ke timing hook sekali per
+# batch dengan operasi `encode_many`/`decode_many`; jalur per pesan melaporkan setiap pesan seperti biasa.
+#
+# NumPy baru diimport pada batch pertama, bukan saat `import zwsp`: import NumPy memakan puluhan
+# milidetik, sedangkan sebagian besar pemakai (misalnya startup sender/receiver) hanya butuh `encode`/`decode`.
+import time
+
+from zwsp.zwsp import MODE_AUTO, MODE_FULL, MODE_PACKED, DecodeResult, encode, decode, get_timing_hook, _tables
+
+np = None
+_numpy_loaded = False
+
+# Batas codec yang dapat diproses jalur NumPy: digit disimpan sebagai uint8 dan nilai satu karakter
+# (base ** padding) harus muat di uint32; codec lain (misalnya alphabet sendiri dengan padding besar)
+# memakai jalur per pesan
+_MAX_NUMPY_BASE = 256
+_MAX_NUMPY_MODULUS = 2 ** 32
+
+
+def _numpy():
+    """
+    Mengimport NumPy saat pertama kali dibutuhkan.
+
+    Returns:
+    module | None: Modul numpy, atau None jika NumPy tidak tersedia.
+    """
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # pragma: no cover - NumPy bersifat opsional
+            pass
+        _numpy_loaded = True
+    return np
+
+
+def _numpy_supported(mode):
+    """
+    Memeriksa apakah codec untuk mode dapat diproses jalur NumPy.
+
+    Parameters:
+    mode (int | Codec): Mode operasi atau Codec.
+
+    Returns:
+    bool: True jika jalur NumPy memberi hasil identik dengan jalur per pesan.
+    """
+    tables = _tables(mode)
+    return tables.base <= _MAX_NUMPY_BASE and tables.base ** tables.padding < _MAX_NUMPY_MODULUS
+
+
+def _check_messages(msgs):
+    """
+    Memastikan semua elemen batch adalah string, sama seperti pemeriksaan pada `encode`/`decode`.
+
+    Parameters:
+    msgs (list): Daftar pesan.
+
+    Raises:
+    TypeError: Jika ada pesan yang bukan string.
+    """
+    for msg in msgs:
+        if not isinstance(msg, str):
+            raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+
+
+def _to_codepoints(text):
+    """
+    Mengubah string menjadi array NumPy berisi codepoint (uint32).
+
+    Parameters:
+    text (str): Teks yang akan diubah.
+
+    Returns:
+    numpy.ndarray: Array codepoint.
+    """
+    # `surrogatepass` agar surrogate tunggal tetap bisa diproses seperti pada `encode` skalar
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+
+
+def _from_codepoints(codepoints):
+    """
+    Mengubah array codepoint kembali menjadi string.
+
+    Parameters:
+    codepoints (numpy.ndarray): Array codepoint.
+
+    Returns:
+    str: Teks hasil konversi.
+    """
+    return codepoints.astype('<u4').tobytes().decode('utf-32-le', 'surrogatepass')
+
+
+def _split(text, lengths):
+    """
+    Memotong satu string panjang menjadi beberapa bagian sesuai daftar panjang.
+
+    Parameters:
+    text (str): String gabungan.
+    lengths (iterable): Panjang setiap bagian.
+
+    Returns:
+    list: Daftar potongan string.
+    """
+    parts = []
+    pos = 0
+    for length in lengths:
+        parts.append(text[pos:pos + length])
+        pos += length
+    return parts
+
+
+def _encode_many_numpy(msgs, mode):
+    tables = _tables(mode)
+    base, padding = tables.base, tables.padding
+
+    values = _to_codepoints(''.join(msgs)) % np.uint32(base ** padding)
+
+    # Ekspansi digit: setiap baris matriks berisi satu digit (dari digit paling tidak signifikan)
+    digits = np.empty((padding, values.size), dtype=np.uint8)
+    for row in range(padding - 1, -1, -1):
+        values, digits[row] = np.divmod(values, np.uint32(base))
+
+    # Digit diganti glyph zero-width, lalu ditranspose agar glyph setiap karakter berurutan
+    alphabet = np.array([ord(glyph) for glyph in tables.alphabet], dtype='<u4')
+    encoded = _from_codepoints(alphabet[digits.T].ravel())
+
+    return _split(encoded, [len(msg) * padding for msg in msgs])
+
+
+def _decode_many_numpy(msgs, mode):
+    tables = _tables(mode)
+    base, padding = tables.base, tables.padding
+
+    codepoints = _to_codepoints(''.join(msgs))
+
+    # Tabel lookup codepoint glyph -> digit (-1 untuk karakter selain glyph)
+    alphabet = np.array([ord(glyph) for glyph in tables.alphabet], dtype='<u4')
+    offset = int(alphabet.min())
+    lookup = np.full(int(alphabet.max()) - offset + 1, -1, dtype=np.int64)
+    lookup[alphabet - offset] = np.arange(base)
+    in_range = (codepoints >= offset) & (codepoints < offset + lookup.size)
+    digit_values = np.full(codepoints.size, -1, dtype=np.int64)
+    digit_values[in_range] = lookup[codepoints[in_range] - offset]
+    is_glyph = digit_values >= 0
+
+    # Jumlah glyph per pesan dihitung dari cumulative sum mask (aman untuk pesan kosong)
+    ends = np.cumsum([len(msg) for msg in msgs], dtype=np.int64)
+    glyph_total = np.concatenate(([0], np.cumsum(is_glyph, dtype=np.int64)))
+    glyph_counts = glyph_total[ends] - glyph_total[np.concatenate(([0], ends[:-1]))]
+
+    # Sama seperti `decode` skalar: jumlah glyph setiap pesan harus kelipatan `padding`
+    if np.any(glyph_counts % padding):
+        raise TypeError('Unknown encoding detected!')
+
+    # Penggabungan digit: perkalian matriks (N x padding) dengan pangkat basis
+    powers = base ** np.arange(padding - 1, -1, -1, dtype=np.int64)
+    try:
+        hidden = _from_codepoints(digit_values[is_glyph].reshape(-1, padding) @ powers)
+    except UnicodeDecodeError:
+        # Kelompok di luar jangkauan Unicode (codec dengan padding besar), sama seperti `decode` skalar
+        raise TypeError('Unknown encoding detected!') from None
+    carrier = _from_codepoints(codepoints[~is_glyph])
+
+    hidden_parts = _split(hidden, (glyph_counts // padding).tolist())
+    carrier_parts = _split(carrier, [len(msg) - count for msg, count in zip(msgs, glyph_counts.tolist())])
+    return [DecodeResult(hidden, carrier, tables.mode) for hidden, carrier in zip(hidden_parts, carrier_parts)]
+
+
+def encode_many(msgs, mode=MODE_FULL):
+    """
+    Menyandikan banyak pesan sekaligus menjadi karakter zero-width.
+
+    Parameters:
+    msgs (list[str]): Daftar pesan teks yang akan disandikan.
+    mode (int | Codec): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED), atau Codec.
+
+    Returns:
+    list[str]: Daftar pesan tersandi, hasilnya identik dengan `encode` untuk setiap pesan.
+
+    Raises:
+    TypeError: Jika ada pesan yang bukan string.
+    """
+    msgs = list(msgs)
+    _check_messages(msgs)
+    if not msgs or mode == MODE_PACKED or _numpy() is None or not _numpy_supported(mode):
+        return [encode(msg, mode) for msg in msgs]
+    hook = get_timing_hook()
+    if hook is None:
+        return _encode_many_numpy(msgs, mode)
+    start = time.perf_counter()
+    encoded = _encode_many_numpy(msgs, mode)
+    hook('encode_many', _tables(mode).mode, time.perf_counter() - start,
+         sum(map(len, msgs)), sum(map(len, encoded)))
+    return encoded
+
+
+def decode_many(msgs, mode=MODE_FULL):
+    """
+    Mendekodekan banyak pesan sekaligus.
+
+    Parameters:
+    msgs (list[str]): Daftar pesan yang telah disandikan.
+    mode (int | Codec): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED), Codec,
+        atau None (MODE_AUTO) untuk mendeteksi mode setiap pesan.
+
+    Returns:
+    list[DecodeResult]: Daftar tuple (pesan tersembunyi, pesan pembawa), identik dengan `decode` untuk setiap pesan.
+
+    Raises:
+    TypeError: Jika ada pesan yang bukan string atau jika encoding tidak diketahui terdeteksi.
+    """
+    msgs = list(msgs)
+    _check_messages(msgs)
+    if not msgs or mode in (MODE_PACKED, MODE_AUTO) or _numpy() is None or not _numpy_supported(mode):
+        return [decode(msg, mode) for msg in msgs]
+    hook = get_timing_hook()
+    if hook is None:
+        return _decode_many_numpy(msgs, mode)
+    start = time.perf_counter()
+    results = _decode_many_numpy(msgs, mode)
+    hook('decode_many', _tables(mode).mode, time.perf_counter() - start,
+         sum(map(len, msgs)), sum(len(result.hidden) for result in results))
+    return results
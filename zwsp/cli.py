@@ -0,0 +1,351 @@
+# Command-line interface untuk encode/decode/scan file besar: `python -m zwsp <subcommand> ...`
+#
+# Input dibaca melalui `mmap` dan diproses per window berukuran tetap. Batas window selalu digeser
+# ke awal codepoint UTF-8, dan kelompok glyph yang terpotong di antara window disambung kembali,
+# sehingga penggunaan memori tetap datar berapapun ukuran filenya. Dengan `--workers N` setiap
+# window diproses di process pool dengan jumlah tugas yang sedang berjalan dibatasi.
+import argparse
+import mmap
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from zwsp.zwsp import MODE_FULL, MODE_ZWSP, _tables, _glyphs_to_text
+
+# Nama mode yang bisa dipilih dari command line
+MODES = {
+    'zwsp': MODE_ZWSP,
+    'full': MODE_FULL,
+}
+
+DEFAULT_WINDOW = 1 << 20  # 1 MiB per window
+OUTPUT_BUFFER = 1 << 20   # Ukuran buffer writer output
+
+
+def _glyph_patterns(mode):
+    """
+    Membuat pola regex (bytes) untuk glyph zero-width sebuah mode.
+
+    Parameters:
+    mode (int): Mode operasi.
+
+    Returns:
+    tuple: Daftar glyph dalam bentuk bytes UTF-8 dan pola regex untuk satu rangkaian (run) glyph.
+    """
+    glyphs = [glyph.encode('utf-8') for glyph in _tables(mode).alphabet]
+    run = re.compile(b'(?:' + b'|'.join(re.escape(glyph) for glyph in glyphs) + b')+')
+    return glyphs, run
+
+
+def _read(path, start, end):
+    """
+    Membaca potongan file [start, end) melalui mmap.
+
+    Parameters:
+    path (str): Lokasi file.
+    start (int): Offset awal (byte).
+    end (int): Offset akhir (byte).
+
+    Returns:
+    bytes: Isi file pada rentang tersebut.
+    """
+    if start >= end:
+        return b''
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[start:end]
+
+
+def _windows(path, window):
+    """
+    Membagi file menjadi rentang-rentang yang batasnya jatuh di awal codepoint UTF-8.
+
+    Parameters:
+    path (str): Lokasi file.
+    window (int): Ukuran window dalam byte.
+
+    Returns:
+    list: Daftar tuple (start, end).
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = [0]
+            pos = window
+            while pos < size:
+                # Byte lanjutan UTF-8 (10xxxxxx) tidak boleh menjadi awal window
+                while pos < size and mm[pos] & 0xC0 == 0x80:
+                    pos += 1
+                if pos < size:
+                    bounds.append(pos)
+                pos += window
+            bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _ordered_map(fn, tasks, workers):
+    """
+    Menjalankan `fn` untuk setiap tugas dan mengembalikan hasil sesuai urutan tugas.
+
+    Jika `workers` lebih dari 1, tugas dijalankan di process pool dengan maksimal `2 * workers`
+    tugas yang sedang berjalan, sehingga hasil yang menunggu ditulis tidak menumpuk di memori.
+
+    Parameters:
+    fn (callable): Fungsi yang dijalankan (harus bisa di-pickle).
+    tasks (iterable): Daftar argumen (tuple) untuk setiap pemanggilan.
+    workers (int): Jumlah proses worker.
+
+    Yields:
+    Any: Hasil setiap tugas secara berurutan.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield fn(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _encode_window(path, start, end, mode):
+    return _read(path, start, end).decode('utf-8').translate(_tables(mode).glyphs).encode('utf-8')
+
+
+def _count_window(path, start, end, mode):
+    glyphs, _ = _glyph_patterns(mode)
+    data = _read(path, start, end)
+    # Glyph UTF-8 tidak saling tumpang tindih, sehingga `bytes.count` aman dan berjalan di C
+    return sum(data.count(glyph) for glyph in glyphs)
+
+
+def _decode_window(path, start, end, mode, phase):
+    """
+    Mendekode satu window.
+
+    Parameters:
+    path (str): Lokasi file.
+    start (int): Offset awal window.
+    end (int): Offset akhir window.
+    mode (int): Mode operasi.
+    phase (int): Jumlah glyph sebelum window ini modulo `padding`.
+
+    Returns:
+    tuple: (glyph awal untuk melengkapi kelompok dari window sebelumnya, teks tersembunyi,
+    glyph sisa kelompok yang belum lengkap, bytes pesan pembawa).
+    """
+    tables = _tables(mode)
+    padding = tables.padding
+    _, run = _glyph_patterns(mode)
+    data = _read(path, start, end)
+
+    glyphs = b''.join(run.findall(data)).decode('utf-8')
+    carrier = run.sub(b'', data)
+
+    lead = (padding - phase) % padding
+    head, body = glyphs[:lead], glyphs[lead:]
+    cut = len(body) - len(body) % padding
+    return head, _glyphs_to_text(body[:cut], tables), body[cut:], carrier
+
+
+def _scan_window(path, start, end, mode, preview):
+    """
+    Mencari rangkaian glyph zero-width di satu window.
+
+    Returns:
+    list: Daftar [offset, panjang byte, jumlah glyph, glyph awal] untuk setiap rangkaian.
+    """
+    tables = _tables(mode)
+    _, run = _glyph_patterns(mode)
+    data = _read(path, start, end)
+    runs = []
+    for match in run.finditer(data):
+        glyphs = match.group().decode('utf-8')
+        runs.append([
+            start + match.start(),
+            match.end() - match.start(),
+            len(glyphs),
+            glyphs[:preview * tables.padding],
+        ])
+    return runs
+
+
+def cmd_encode(args, out):
+    mode = MODES[args.mode]
+    if args.carrier:
+        out.write(args.carrier.encode('utf-8'))
+    # Output encode jauh lebih besar dari input, sehingga window dikecilkan sebesar `padding`
+    window = max(4096, args.window // _tables(mode).padding)
+    tasks = ((args.input, start, end, mode) for start, end in _windows(args.input, window))
+    for encoded in _ordered_map(_encode_window, tasks, args.workers):
+        out.write(encoded)
+
+
+def cmd_decode(args, out):
+    mode = MODES[args.mode]
+    tables = _tables(mode)
+    padding = tables.padding
+    windows = _windows(args.input, args.window)
+
+    # Fase (posisi glyph di dalam kelompok) setiap window. Secara sekuensial fase dihitung sambil
+    # jalan; dengan worker, jumlah glyph setiap window dihitung dulu secara paralel.
+    if args.workers > 1:
+        count_tasks = ((args.input, start, end, mode) for start, end in windows)
+        phases = []
+        total = 0
+        for count in _ordered_map(_count_window, count_tasks, args.workers):
+            phases.append(total % padding)
+            total += count
+        tasks = ((args.input, start, end, mode, phase) for (start, end), phase in zip(windows, phases))
+        results = _ordered_map(_decode_window, tasks, args.workers)
+    else:
+        results = _decode_sequential(args.input, windows, mode)
+
+    carrier_out = open(args.carrier_output, 'wb', buffering=OUTPUT_BUFFER) if args.carrier_output else None
+    try:
+        pending = ''
+        for head, hidden, tail, carrier in results:
+            pending += head
+            if len(pending) == padding:
+                out.write(_glyphs_to_text(pending, tables).encode('utf-8', 'surrogatepass'))
+                pending = ''
+            out.write(hidden.encode('utf-8', 'surrogatepass'))
+            pending += tail
+            if carrier_out is not None:
+                carrier_out.write(carrier)
+        if pending:
+            raise TypeError('Unknown encoding detected!')
+    finally:
+        if carrier_out is not None:
+            carrier_out.close()
+
+
+def _decode_sequential(path, windows, mode):
+    padding = _tables(mode).padding
+    phase = 0
+    for start, end in windows:
+        head, hidden, tail, carrier = _decode_window(path, start, end, mode, phase)
+        phase = (phase + len(head) + len(hidden) * padding + len(tail)) % padding
+        yield head, hidden, tail, carrier
+
+
+def cmd_scan(args, out):
+    mode = MODES[args.mode]
+    tables = _tables(mode)
+    padding = tables.padding
+    min_glyphs = args.min_glyphs if args.min_glyphs is not None else padding
+    tasks = ((args.input, start, end, mode, args.preview) for start, end in _windows(args.input, args.window))
+
+    def report(found):
+        offset, length, count, glyphs = found
+        if count < min_glyphs:
+            return
+        status = 'ok' if count % padding == 0 else 'partial'
+        complete = len(glyphs) - len(glyphs) % padding
+        preview = _glyphs_to_text(glyphs[:complete], tables)
+        out.write('{0}\t{1}\t{2}\t{3}\t{4!r}\n'.format(offset, length, count, status, preview).encode('utf-8', 'backslashreplace'))
+
+    current = None
+    for runs in _ordered_map(_scan_window, tasks, args.workers):
+        for found in runs:
+            # Rangkaian yang terpotong batas window disambung kembali
+            if current is not None and current[0] + current[1] == found[0]:
+                current[1] += found[1]
+                current[2] += found[2]
+                current[3] = (current[3] + found[3])[:args.preview * padding]
+                continue
+            if current is not None:
+                report(current)
+            current = found
+    if current is not None:
+        report(current)
+
+
+def _positive_int(value):
+    """
+    Tipe argumen argparse untuk bilangan bulat > 0.
+
+    Parameters:
+    value (str): Nilai dari command line.
+
+    Returns:
+    int: Nilai yang sudah divalidasi.
+
+    Raises:
+    argparse.ArgumentTypeError: Jika nilai bukan bilangan bulat > 0.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value: {0!r}'.format(value)) from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError('must be greater than 0: {0!r}'.format(value))
+    return number
+
+
+def build_parser():
+    """
+    Membuat parser argumen command line.
+
+    Returns:
+    argparse.ArgumentParser: Parser argumen.
+    """
+    parser = argparse.ArgumentParser(prog='python -m zwsp', description='Encode, decode dan scan pesan ZWSP pada file besar.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(sub):
+        sub.add_argument('input', help='File input (UTF-8).')
+        sub.add_argument('-o', '--output', help='File output (default: stdout).')
+        sub.add_argument('-m', '--mode', choices=sorted(MODES), default='full', help='Mode encoding (default: full).')
+        sub.add_argument('-w', '--workers', type=int, default=1, help='Jumlah proses worker (default: 1).')
+        sub.add_argument('--window', type=_positive_int, default=DEFAULT_WINDOW, help='Ukuran window dalam byte (default: 1 MiB).')
+
+    encode_parser = subparsers.add_parser('encode', help='Menyandikan isi file menjadi glyph zero-width.')
+    add_common(encode_parser)
+    encode_parser.add_argument('--carrier', default='', help='Pesan pembawa yang ditulis sebelum glyph.')
+    encode_parser.set_defaults(func=cmd_encode)
+
+    decode_parser = subparsers.add_parser('decode', help='Mendekode pesan tersembunyi dari file.')
+    add_common(decode_parser)
+    decode_parser.add_argument('--carrier-output', help='File untuk menyimpan pesan pembawa.')
+    decode_parser.set_defaults(func=cmd_decode)
+
+    scan_parser = subparsers.add_parser('scan', help='Mencari lokasi rangkaian glyph zero-width di file.')
+    add_common(scan_parser)
+    scan_parser.add_argument('--min-glyphs', type=int, help='Jumlah glyph minimal yang dilaporkan (default: padding mode).')
+    scan_parser.add_argument('--preview', type=int, default=32, help='Jumlah karakter tersembunyi yang ditampilkan (default: 32).')
+    scan_parser.set_defaults(func=cmd_scan)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point command line.
+
+    Parameters:
+    argv (list): Argumen command line (default: `sys.argv[1:]`).
+
+    Returns:
+    int: Exit code.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        if args.output:
+            with open(args.output, 'wb', buffering=OUTPUT_BUFFER) as out:
+                args.func(args, out)
+        else:
+            args.func(args, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+    except (TypeError, UnicodeDecodeError) as exc:
+        # UnicodeDecodeError: input bukan UTF-8 yang valid
+        print('error: {0}'.format(exc), file=sys.stderr)
+        return 1
+    return 0
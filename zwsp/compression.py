@@ -0,0 +1,175 @@
+# Tahap kompresi opsional sebelum payload disandikan menjadi glyph zero-width.
+#
+# Kompresi bekerja pada byte UTF-8 sehingga hanya tersedia untuk MODE_PACKED. ID codec disimpan di
+# flag header MODE_PACKED, sehingga `decode` dapat mendeteksi dan mendekompresi payload secara otomatis.
+import lzma
+import zlib
+
+CODEC_NONE = 0   # Tanpa kompresi
+CODEC_ZLIB = 1   # Deflate (raw, tanpa header zlib)
+CODEC_LZMA = 2   # LZMA2 (raw, tanpa container xz)
+CODEC_ZDICT = 3  # Deflate dengan preset dictionary untuk pesan pendek
+
+# ID codec terbesar yang muat di flag header MODE_PACKED (0x10000 + (id << 1) + 1 < 5^7)
+MAX_CODEC_ID = (5 ** 7 - 1 - 0x10000) // 2
+
+# Batas default ukuran hasil dekompresi (melindungi receiver dari "decompression bomb")
+MAX_DECOMPRESSED_SIZE = 16 * 1024 * 1024
+
+# Preset dictionary untuk pesan pendek (pembacaan sensor, potongan JSON). Deflate lebih murah
+# mereferensikan data di akhir dictionary, sehingga potongan yang paling sering muncul diletakkan di akhir.
+PRESET_DICTIONARY = (
+    b'"status": "ok", "unit": "celsius", "sensor": "device_id": "value": '
+    b'0123456789.-: , true, false, null}, {"message": "'
+    b'"humidity": "timestamp": {"temperature": '
+)
+
+# Dictionary kecil: payload pendek, dan inisialisasi encoder LZMA dengan dictionary besar mahal
+_LZMA_FILTERS = [{'id': lzma.FILTER_LZMA2, 'preset': 6, 'dict_size': 1 << 16}]
+
+
+def _zlib_compress(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _zlib_decompress(data, max_size):
+    decompressor = zlib.decompressobj(-15)
+    result = decompressor.decompress(data, max_size + 1)
+    if len(result) > max_size or not decompressor.eof:
+        raise ValueError('decompressed payload too large or truncated')
+    return result
+
+
+def _zdict_compress(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=PRESET_DICTIONARY)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _zdict_decompress(data, max_size):
+    decompressor = zlib.decompressobj(-15, zdict=PRESET_DICTIONARY)
+    result = decompressor.decompress(data, max_size + 1)
+    if len(result) > max_size or not decompressor.eof:
+        raise ValueError('decompressed payload too large or truncated')
+    return result
+
+
+def _lzma_compress(data):
+    return lzma.compress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+
+
+def _lzma_decompress(data, max_size):
+    decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    result = decompressor.decompress(data, max_size + 1)
+    if len(result) > max_size:
+        raise ValueError('decompressed payload too large')
+    return result
+
+
+# Registry codec: nama -> (id, fungsi kompresi, fungsi dekompresi)
+_codecs = {}
+_codec_ids = {}
+
+
+def register_codec(name, codec_id, compress, decompress):
+    """
+    Mendaftarkan codec kompresi baru.
+
+    Parameters:
+    name (str): Nama codec (dipakai pada parameter `compression` dan konfigurasi).
+    codec_id (int): ID codec yang disimpan di header (1 - MAX_CODEC_ID, 0 berarti tanpa kompresi).
+    compress (callable): Fungsi `compress(data: bytes) -> bytes`.
+    decompress (callable): Fungsi `decompress(data: bytes, max_size: int) -> bytes`.
+
+    Raises:
+    ValueError: Jika nama atau ID codec sudah terdaftar atau ID di luar jangkauan.
+    """
+    if not 0 <= codec_id <= MAX_CODEC_ID:
+        raise ValueError('Codec id must be between 0 and {0}'.format(MAX_CODEC_ID))
+    if name in _codecs or codec_id in _codec_ids:
+        raise ValueError('Codec {0!r} ({1}) is already registered'.format(name, codec_id))
+    _codecs[name] = (codec_id, compress, decompress)
+    _codec_ids[codec_id] = (name, compress, decompress)
+
+
+def codec_names():
+    """
+    Mengembalikan nama semua codec yang terdaftar.
+
+    Returns:
+    list[str]: Daftar nama codec, termasuk 'none'.
+    """
+    return list(_codecs)
+
+
+def is_codec_id(codec_id):
+    """
+    Memeriksa apakah ID codec (dari header MODE_PACKED) terdaftar.
+
+    Parameters:
+    codec_id (int): ID codec.
+
+    Returns:
+    bool: True jika codec terdaftar.
+    """
+    return codec_id in _codec_ids
+
+
+def compress_payload(data, codec):
+    """
+    Mengompresi payload dengan codec yang dipilih.
+
+    Parameters:
+    data (bytes): Payload (byte UTF-8).
+    codec (str): Nama codec, atau 'auto' untuk memilih hasil terkecil dari semua codec.
+
+    Returns:
+    tuple: ID codec dan payload hasil kompresi.
+
+    Raises:
+    ValueError: Jika codec tidak dikenal.
+    """
+    if codec == 'auto':
+        best = (CODEC_NONE, data)
+        for codec_id, compress, _ in _codecs.values():
+            if codec_id == CODEC_NONE:
+                continue
+            compressed = compress(data)
+            if len(compressed) < len(best[1]):
+                best = (codec_id, compressed)
+        return best
+
+    if codec not in _codecs:
+        raise ValueError('Unknown compression codec {0!r}'.format(codec))
+    codec_id, compress, _ = _codecs[codec]
+    return codec_id, compress(data)
+
+
+def decompress_payload(data, codec_id, max_size=None):
+    """
+    Mendekompresi payload berdasarkan ID codec dari header.
+
+    Parameters:
+    data (bytes): Payload hasil kompresi.
+    codec_id (int): ID codec dari header MODE_PACKED.
+    max_size (int): Batas ukuran hasil dekompresi (default: `MAX_DECOMPRESSED_SIZE`).
+
+    Returns:
+    bytes: Payload asli.
+
+    Raises:
+    ValueError: Jika codec tidak dikenal, data rusak, atau hasil dekompresi melebihi batas.
+    """
+    if codec_id not in _codec_ids:
+        raise ValueError('Unknown compression codec id {0}'.format(codec_id))
+    _, _, decompress = _codec_ids[codec_id]
+    try:
+        return decompress(data, MAX_DECOMPRESSED_SIZE if max_size is None else max_size)
+    except (zlib.error, lzma.LZMAError) as exc:
+        raise ValueError('Corrupted compressed payload: {0}'.format(exc)) from None
+
+
+register_codec('none', CODEC_NONE, lambda data: data, lambda data, max_size: data)
+register_codec('zlib', CODEC_ZLIB, _zlib_compress, _zlib_decompress)
+register_codec('lzma', CODEC_LZMA, _lzma_compress, _lzma_decompress)
+register_codec('zdict', CODEC_ZDICT, _zdict_compress, _zdict_decompress)
@@ -0,0 +1,180 @@
+# Container berbingkai (framed) untuk beberapa payload dalam satu pesan pembawa.
+#
+# Format satu frame:
+#   FRAME_MARKER (U+2060 WORD JOINER)
+#   4 kelompok glyph MODE_FULL: panjang payload (word atas, word bawah) dan CRC32 (word atas, word bawah)
+#   payload MODE_PACKED (kelompok header + kelompok data), sepanjang `length` kelompok
+#
+# Panjang dihitung dalam kelompok glyph, sehingga akhir frame diketahui tanpa mendekode payload, dan
+# CRC32 dihitung dari nilai kelompok payload sehingga glyph yang hilang atau rusak terdeteksi.
+import re
+import zlib
+from collections import namedtuple
+
+from zwsp.zwsp import MODE_FULL, _tables, _glyphs_to_text, _encode_packed, _decode_packed
+
+FRAME_MARKER = '\u2060'  # Word joiner, tidak dipakai oleh alphabet mode manapun
+FRAME_HEADER_GROUPS = 4
+
+# Informasi satu frame hasil `index`: posisi karakter [start, end), panjang payload (kelompok),
+# dan alasan kerusakan (None jika frame utuh secara struktur)
+FrameInfo = namedtuple('FrameInfo', ['start', 'end', 'length', 'error'])
+# Frame yang dilewati karena rusak
+FrameError = namedtuple('FrameError', ['start', 'end', 'reason'])
+# Hasil `decode_frames`
+FramesResult = namedtuple('FramesResult', ['messages', 'carrier', 'errors'])
+
+
+def _frame_pattern():
+    alphabet = ''.join(_tables(MODE_FULL).alphabet)
+    return re.compile('{0}[{1}]*'.format(FRAME_MARKER, alphabet))
+
+
+_FRAME = _frame_pattern()
+
+
+def _words(text):
+    """
+    Mengubah teks hasil dekode kelompok header menjadi bytes word 16-bit (big-endian).
+
+    Returns:
+    bytes: Word dalam bentuk bytes, atau None jika ada nilai di luar 16-bit.
+    """
+    data = text.encode('utf-16-be', 'surrogatepass')
+    return data if len(data) == 2 * len(text) else None
+
+
+def _checksum(payload, tables):
+    """
+    Menghitung CRC32 dari nilai setiap kelompok payload (termasuk kelompok header MODE_PACKED).
+
+    Returns:
+    int: CRC32 payload.
+    """
+    return zlib.crc32(_glyphs_to_text(payload, tables).encode('utf-32-be', 'surrogatepass'))
+
+
+def encode_frame(msg, compression=None):
+    """
+    Menyandikan pesan menjadi satu frame (marker, panjang, CRC32 dan payload MODE_PACKED).
+
+    Parameters:
+    msg (str): Pesan teks yang akan disandikan.
+    compression (str): Codec kompresi (lihat `zwsp.compression`), atau None.
+
+    Returns:
+    str: Frame dalam bentuk karakter zero-width, siap disisipkan di pesan pembawa.
+
+    Raises:
+    TypeError: Jika pesan yang diberikan bukan string.
+    ValueError: Jika codec kompresi tidak dikenal.
+    """
+    if not isinstance(msg, str):
+        raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+
+    tables = _tables(MODE_FULL)
+    payload = _encode_packed(msg, tables, compression)
+    padding = tables.padding
+    length = len(payload) // padding
+    crc = _checksum(payload, tables)
+
+    header = ''.join(tables.glyphs[word] for word in (length >> 16, length & 0xFFFF, crc >> 16, crc & 0xFFFF))
+    return FRAME_MARKER + header + payload
+
+
+def index(text):
+    """
+    Mencari semua frame di dalam teks dalam satu kali jalan tanpa mendekode payload.
+
+    Parameters:
+    text (str): Teks yang berisi frame.
+
+    Returns:
+    list[FrameInfo]: Posisi dan panjang setiap frame. Frame yang terpotong tetap dilaporkan dengan
+    `error` berisi alasannya; CRC32 baru diperiksa saat frame didekode.
+
+    Raises:
+    TypeError: Jika teks yang diberikan bukan string.
+    """
+    if not isinstance(text, str):
+        raise TypeError('Cannot encode {0}'.format(type(text).__name__))
+
+    tables = _tables(MODE_FULL)
+    padding = tables.padding
+    header_len = FRAME_HEADER_GROUPS * padding
+    frames = []
+    for match in _FRAME.finditer(text):
+        start, run_end = match.span()
+        glyph_count = run_end - start - 1
+        if glyph_count < header_len:
+            frames.append(FrameInfo(start, run_end, 0, 'truncated header'))
+            continue
+
+        header = _words(_glyphs_to_text(text[start + 1:start + 1 + header_len], tables))
+        if header is None:
+            frames.append(FrameInfo(start, run_end, 0, 'invalid header'))
+            continue
+        length = int.from_bytes(header[:4], 'big')
+        end = start + 1 + header_len + length * padding
+        if end > run_end:
+            frames.append(FrameInfo(start, run_end, length, 'truncated payload'))
+            continue
+        frames.append(FrameInfo(start, end, length, None))
+    return frames
+
+
+def decode_frame(text, info):
+    """
+    Mendekode satu frame berdasarkan hasil `index` (akses acak tanpa mendekode frame lain).
+
+    Parameters:
+    text (str): Teks yang berisi frame.
+    info (FrameInfo): Informasi frame dari `index`.
+
+    Returns:
+    str: Pesan tersembunyi di dalam frame.
+
+    Raises:
+    TypeError: Jika frame rusak (terpotong, CRC32 tidak cocok, atau payload tidak valid).
+    """
+    if info.error is not None:
+        raise TypeError('Corrupted frame: {0}'.format(info.error))
+
+    tables = _tables(MODE_FULL)
+    header_len = FRAME_HEADER_GROUPS * tables.padding
+    header = _words(_glyphs_to_text(text[info.start + 1:info.start + 1 + header_len], tables))
+    payload = text[info.start + 1 + header_len:info.end]
+
+    if header is None or _checksum(payload, tables) != int.from_bytes(header[4:], 'big'):
+        raise TypeError('Corrupted frame: checksum mismatch')
+    return _decode_packed(payload, tables)
+
+
+def decode_frames(text):
+    """
+    Mendekode semua frame di dalam teks. Frame yang rusak dilewati dan dilaporkan, bukan menggagalkan
+    seluruh proses decode.
+
+    Parameters:
+    text (str): Teks yang berisi frame.
+
+    Returns:
+    FramesResult: Daftar pesan tersembunyi (urut sesuai posisi), pesan pembawa (teks tanpa frame),
+    dan daftar FrameError untuk frame yang dilewati.
+
+    Raises:
+    TypeError: Jika teks yang diberikan bukan string.
+    """
+    messages = []
+    errors = []
+    carrier = []
+    pos = 0
+    for info in index(text):
+        carrier.append(text[pos:info.start])
+        pos = info.end
+        try:
+            messages.append(decode_frame(text, info))
+        except TypeError as exc:
+            errors.append(FrameError(info.start, info.end, str(exc)))
+    carrier.append(text[pos:])
+    return FramesResult(messages, ''.join(carrier), errors)
@@ -0,0 +1,147 @@
+# Encoder/decoder bertahap (streaming) untuk payload yang datang dalam potongan (chunk),
+# misalnya body HTTP chunked, file besar, atau payload MQTT yang terpecah ke beberapa frame.
+from zwsp.zwsp import MODE_AUTO, MODE_FULL, MODE_PACKED, _tables, _glyphs_to_text
+
+
+class StreamDecoder:
+    """
+    Decoder bertahap: menerima pesan dalam potongan dan mendekode setiap kelompok glyph yang sudah lengkap.
+
+    Di antara pemanggilan `feed`, hanya kelompok glyph yang belum lengkap (kurang dari
+    `padding` glyph) yang disimpan, sehingga penggunaan memori konstan berapapun besar inputnya.
+    """
+
+    def __init__(self, mode=MODE_FULL):
+        """
+        Inisialisasi objek StreamDecoder.
+
+        Parameters:
+        mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL).
+
+        Raises:
+        ValueError: Jika mode yang dipilih adalah MODE_PACKED (header-nya bergantung pada seluruh payload)
+            atau MODE_AUTO (deteksi mode membutuhkan seluruh payload).
+        """
+        if mode == MODE_PACKED or mode is MODE_AUTO:
+            raise ValueError('Streaming requires MODE_ZWSP or MODE_FULL')
+        self.mode = mode
+        self._tables = _tables(mode)
+        # Kelompok glyph yang belum lengkap
+        self._pending = ''
+
+    def feed(self, chunk):
+        """
+        Memproses satu potongan pesan.
+
+        Parameters:
+        chunk (str): Potongan pesan yang telah disandikan.
+
+        Returns:
+        tuple: Pesan tersembunyi dan pesan pembawa yang berhasil didekode dari potongan ini.
+
+        Raises:
+        TypeError: Jika potongan yang diberikan bukan string.
+        """
+        if not isinstance(chunk, str):
+            raise TypeError('Cannot encode {0}'.format(type(chunk).__name__))
+
+        tables = self._tables
+        carrier = tables.glyph_run.sub('', chunk)
+        glyphs = self._pending + tables.non_glyph.sub('', chunk)
+
+        # Hanya kelompok yang lengkap yang didekode, sisanya disimpan untuk potongan berikutnya
+        complete = len(glyphs) - len(glyphs) % tables.padding
+        self._pending = glyphs[complete:]
+        return (_glyphs_to_text(glyphs[:complete], tables), carrier)
+
+    def close(self):
+        """
+        Mengakhiri stream.
+
+        Returns:
+        tuple: Tuple kosong ('', '') karena semua kelompok lengkap sudah dikembalikan oleh `feed`.
+
+        Raises:
+        TypeError: Jika masih ada kelompok glyph yang tidak lengkap (encoding tidak diketahui).
+        """
+        pending, self._pending = self._pending, ''
+        if pending:
+            raise TypeError('Unknown encoding detected!')
+        return ('', '')
+
+    def iterdecode(self, chunks):
+        """
+        Mendekode iterator potongan pesan secara lazy.
+
+        Parameters:
+        chunks (iterable): Iterator berisi potongan pesan (str).
+
+        Yields:
+        tuple: Pesan tersembunyi dan pesan pembawa untuk setiap potongan.
+        """
+        for chunk in chunks:
+            yield self.feed(chunk)
+        self.close()
+
+
+class StreamEncoder:
+    """
+    Encoder bertahap: menyandikan potongan teks satu per satu tanpa menggabungkan seluruh input.
+    """
+
+    def __init__(self, mode=MODE_FULL):
+        """
+        Inisialisasi objek StreamEncoder.
+
+        Parameters:
+        mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL).
+
+        Raises:
+        ValueError: Jika mode yang dipilih adalah MODE_PACKED (header-nya bergantung pada seluruh payload)
+            atau MODE_AUTO (deteksi mode membutuhkan seluruh payload).
+        """
+        if mode == MODE_PACKED or mode is MODE_AUTO:
+            raise ValueError('Streaming requires MODE_ZWSP or MODE_FULL')
+        self.mode = mode
+        self._tables = _tables(mode)
+
+    def feed(self, chunk):
+        """
+        Menyandikan satu potongan teks.
+
+        Parameters:
+        chunk (str): Potongan teks yang akan disandikan.
+
+        Returns:
+        str: Glyph zero-width untuk potongan tersebut.
+
+        Raises:
+        TypeError: Jika potongan yang diberikan bukan string.
+        """
+        if not isinstance(chunk, str):
+            raise TypeError('Cannot encode {0}'.format(type(chunk).__name__))
+        return chunk.translate(self._tables.glyphs)
+
+    def close(self):
+        """
+        Mengakhiri stream. Setiap karakter disandikan secara independen, sehingga tidak ada sisa output.
+
+        Returns:
+        str: String kosong.
+        """
+        return ''
+
+    def iterencode(self, chunks):
+        """
+        Menyandikan iterator potongan teks secara lazy.
+
+        Parameters:
+        chunks (iterable): Iterator berisi potongan teks (str).
+
+        Yields:
+        str: Glyph zero-width untuk setiap potongan.
+        """
+        for chunk in chunks:
+            encoded = self.feed(chunk)
+            if encoded:
+                yield encoded
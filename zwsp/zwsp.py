@@ -1,6 +1,31 @@
+import collections
+import re
+import threading
+import time
+
+from zwsp.compression import compress_payload, decompress_payload, is_codec_id
+
 # Mode operasi yang digunakan untuk menentukan karakter zero-width mana yang digunakan
 MODE_ZWSP = 0  # Mode menggunakan 3 karakter zero-width
 MODE_FULL = 1  # Mode menggunakan 5 karakter zero-width
+MODE_PACKED = 2  # Mode bit-packed: byte UTF-8 dipadatkan ke glyph MODE_FULL (2 byte per 7 glyph)
+
+MODE_AUTO = None  # Hanya untuk decode: mode dideteksi otomatis dari glyph di dalam pesan
+
+# Nama mode yang dapat dipakai pada konfigurasi (misalnya variabel environment `ZWSP_MODE`)
+MODE_NAMES = {
+    'zwsp': MODE_ZWSP,
+    'full': MODE_FULL,
+    'packed': MODE_PACKED,
+    'auto': MODE_AUTO,
+}
+
+# Nilai kelompok header MODE_PACKED. Word data selalu < 0x10000, sedangkan header >= 0x10000,
+# sehingga header selalu dapat dibedakan dari data. Bit 0 header menandai jumlah byte ganjil,
+# bit selanjutnya berisi ID codec kompresi (lihat `zwsp.compression`).
+PACKED_HEADER = 0x10000
+PACKED_FLAG_ODD = 0x1
+PACKED_CODEC_SHIFT = 1
 
 # Unicode karakter zero-width
 ZERO_WIDTH_SPACE = '\u200b'         # Zero-width space
@@ -8,6 +33,11 @@ ZERO_WIDTH_NON_JOINER = '\u200c'    # Zero-width non-joiner
 ZERO_WIDTH_JOINER = '\u200d'        # Zero-width joiner
 LEFT_TO_RIGHT_MARK = '\u200e'       # Left-to-right mark
 RIGHT_TO_LEFT_MARK = '\u200f'       # Right-to-left mark
+WORD_JOINER = '\u2060'              # Word joiner (dipakai `zwsp.frame` sebagai marker frame)
+ZERO_WIDTH_NO_BREAK_SPACE = '\ufeff'  # Zero-width no-break space (BOM)
+
+# Codepoint Unicode terbesar; padding minimal sebuah Codec harus dapat menampung semua codepoint
+MAX_CODEPOINT = 0x10FFFF
 
 # Daftar unicode karakter zero-width jika mode yang dipilih MODE_ZWSP
 list_ZWSP = [
@@ -30,10 +60,10 @@ def get_padding_len(mode):
     Mengembalikan panjang padding berdasarkan mode.
 
     Parameters:
-    mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL).
+    mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED).
 
     Returns:
-    int: Panjang padding (11 untuk MODE_ZWSP, 7 untuk MODE_FULL).
+    int: Panjang padding (11 untuk MODE_ZWSP, 7 untuk MODE_FULL dan MODE_PACKED).
     """
     return 11 if mode == MODE_ZWSP else 7
 
@@ -64,62 +94,516 @@ def to_base(num, b, numerals='0123456789abcdefghijklmnopqrstuvwxyz'):
     return ((num == 0) and numerals[0]) or (to_base(num // b, b, numerals).lstrip(numerals[0]) + numerals[num % b])
 
 
-def encode(msg, mode=MODE_FULL):
+class Codec:
+    """
+    Codec zero-width untuk alphabet tertentu dengan tabel encode/decode yang dibangun sekali.
+
+    Setiap karakter disandikan menjadi `padding` glyph (digit dalam basis panjang alphabet). Tanpa
+    `padding`, dipakai padding minimal yang dapat menampung semua codepoint Unicode (lihat `min_padding`).
+    Instance disimpan di registry LRU berdasarkan (alphabet, padding), sehingga `Codec(...)` dengan
+    argumen yang sama mengembalikan objek yang sama tanpa membangun tabel ulang. MODE_ZWSP dan MODE_FULL
+    adalah instance yang sudah dibuat sebelumnya (`CODEC_ZWSP` dan `CODEC_FULL`).
+
+    Attributes:
+    alphabet (list): Daftar karakter zero-width.
+    base (int): Basis bilangan (panjang alphabet).
+    padding (int): Jumlah glyph zero-width untuk setiap karakter.
+    mode (int | Codec): Nilai `mode` pada hasil `decode` (konstanta MODE_* untuk codec bawaan,
+        atau codec itu sendiri).
+    glyphs (_GlyphTable): Tabel codepoint -> glyph zero-width, dipakai oleh `str.translate` saat encode.
+    groups (_GroupTable): Tabel kelompok glyph -> karakter, dipakai saat decode.
+    glyph_run (re.Pattern): Pola rangkaian glyph zero-width (untuk memisahkan pesan pembawa).
+    non_glyph (re.Pattern): Pola untuk membuang semua karakter selain glyph zero-width.
+    group (re.Pattern): Pola satu kelompok `padding` glyph.
+    """
+
+    def __new__(cls, alphabet, padding=None):
+        """
+        Mengambil codec dari registry, atau membangunnya jika belum ada.
+
+        Parameters:
+        alphabet (Sequence[str]): Karakter (masing-masing satu codepoint) yang dipakai sebagai digit.
+        padding (int): Jumlah glyph per karakter; default-nya `min_padding(len(alphabet))`.
+
+        Returns:
+        Codec: Codec untuk alphabet dan padding tersebut.
+
+        Raises:
+        ValueError: Jika alphabet berisi kurang dari 2 karakter, karakter ganda, atau elemen yang bukan
+            satu karakter, atau jika `padding` < 1.
+        """
+        alphabet = list(alphabet)
+        if len(alphabet) < 2 or len(set(alphabet)) != len(alphabet) or \
+                any(not isinstance(glyph, str) or len(glyph) != 1 for glyph in alphabet):
+            raise ValueError('Alphabet must contain at least 2 distinct single characters')
+        if padding is None:
+            padding = cls.min_padding(len(alphabet))
+        if padding < 1:
+            raise ValueError('padding must be at least 1')
+
+        key = (''.join(alphabet), padding)
+        codec = _codec_pinned.get(key)
+        if codec is not None:
+            return codec
+        with _codec_lock:
+            codec = _codec_registry.get(key)
+            if codec is not None:
+                _codec_registry.move_to_end(key)
+                return codec
+
+        codec = super().__new__(cls)
+        codec._build(alphabet, padding)
+        with _codec_lock:
+            # Thread lain mungkin sudah membangun codec yang sama; yang pertama disimpan yang dipakai
+            codec = _codec_registry.setdefault(key, codec)
+            _codec_registry.move_to_end(key)
+            while len(_codec_registry) > CODEC_REGISTRY_SIZE:
+                _codec_registry.popitem(last=False)
+        return codec
+
+    def _build(self, alphabet, padding):
+        self.alphabet = alphabet
+        self.base = len(alphabet)
+        self.padding = padding
+        self.mode = self
+        self.glyphs = _GlyphTable(alphabet, padding)
+        self.groups = _GroupTable(alphabet)
+        glyph_class = ''.join(re.escape(glyph) for glyph in alphabet)
+        self.glyph_run = re.compile('[{0}]+'.format(glyph_class))
+        self.non_glyph = re.compile('[^{0}]+'.format(glyph_class))
+        self.group = re.compile('.{{{0}}}'.format(padding), re.DOTALL)
+
+    def __getnewargs__(self):
+        # Pickle (misalnya ke worker process) membuat ulang codec melalui registry
+        return (self.alphabet, self.padding)
+
+    def __getstate__(self):
+        return None
+
+    def __repr__(self):
+        return 'Codec([{0}], padding={1})'.format(
+            ', '.join('U+{0:04X}'.format(ord(glyph)) for glyph in self.alphabet), self.padding)
+
+    @staticmethod
+    def min_padding(base, max_codepoint=MAX_CODEPOINT):
+        """
+        Menghitung padding minimal agar semua codepoint sampai `max_codepoint` dapat disandikan.
+
+        Parameters:
+        base (int): Basis bilangan (panjang alphabet).
+        max_codepoint (int): Codepoint terbesar yang harus dapat disandikan.
+
+        Returns:
+        int: Jumlah digit minimal.
+        """
+        padding, capacity = 1, base
+        while capacity <= max_codepoint:
+            padding += 1
+            capacity *= base
+        return padding
+
+    def encode(self, msg):
+        """
+        Menyandikan pesan teks menjadi glyph alphabet codec ini.
+
+        Parameters:
+        msg (str): Pesan teks yang akan disandikan.
+
+        Returns:
+        str: Pesan yang telah disandikan.
+
+        Raises:
+        TypeError: Jika pesan yang diberikan bukan string.
+        """
+        if not isinstance(msg, str):
+            raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+        return msg.translate(self.glyphs)
+
+    def decode(self, msg):
+        """
+        Mendekodekan pesan yang disandikan dengan codec ini.
+
+        Parameters:
+        msg (str): Pesan yang telah disandikan.
+
+        Returns:
+        DecodeResult: Pesan tersembunyi dan pesan pembawa, dengan `mode` berisi `self.mode`.
+
+        Raises:
+        TypeError: Jika pesan bukan string atau encoding tidak dikenali.
+        """
+        if not isinstance(msg, str):
+            raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
+        encoded = self.non_glyph.sub('', msg)
+        if len(encoded) % self.padding != 0:
+            raise TypeError('Unknown encoding detected!')
+        return DecodeResult(_glyphs_to_text(encoded, self), self.glyph_run.sub('', msg), self.mode)
+
+
+class _GlyphTable(dict):
+    """
+    Tabel codepoint -> rangkaian glyph zero-width.
+
+    Setiap codepoint hanya dihitung sekali (saat pertama kali dibutuhkan), selanjutnya
+    `str.translate` cukup melakukan lookup dict sehingga encode berjalan linear.
+    """
+
+    def __init__(self, alphabet, padding):
+        super().__init__()
+        self.alphabet = alphabet
+        self.padding = padding
+        # Format lama hanya menyimpan `padding` digit terakhir, sehingga codepoint di luar
+        # jangkauan dipotong modulo base^padding. Perilaku ini dipertahankan.
+        self.modulus = len(alphabet) ** padding
+
+    def __missing__(self, codepoint):
+        base = len(self.alphabet)
+        value = codepoint % self.modulus
+        digits = []
+        for _ in range(self.padding):
+            value, digit = divmod(value, base)
+            digits.append(self.alphabet[digit])
+        glyphs = ''.join(reversed(digits))
+        self[codepoint] = glyphs
+        return glyphs
+
+
+class _GroupTable(dict):
+    """
+    Tabel kelompok glyph zero-width -> karakter hasil dekode.
+
+    Sama seperti `_GlyphTable`, setiap kelompok hanya dihitung sekali, selanjutnya cukup lookup dict.
+    """
+
+    def __init__(self, alphabet):
+        super().__init__()
+        self.index = {glyph: idx for idx, glyph in enumerate(alphabet)}
+        self.base = len(alphabet)
+
+    def __missing__(self, group):
+        value = 0
+        for glyph in group:
+            value = value * self.base + self.index[glyph]
+        try:
+            char = chr(value)
+        except (ValueError, OverflowError):
+            # Hanya mungkin jika base^padding melebihi jangkauan Unicode (codec dengan padding besar)
+            raise TypeError('Unknown encoding detected!') from None
+        self[group] = char
+        return char
+
+
+# Registry LRU codec: (alphabet, padding) -> Codec. Codec bawaan disimpan terpisah agar tidak pernah dibuang.
+CODEC_REGISTRY_SIZE = 64
+_codec_registry = collections.OrderedDict()
+_codec_pinned = {}
+_codec_lock = threading.Lock()
+
+
+def _prebuilt(alphabet, padding, mode):
+    codec = Codec(alphabet, padding)
+    codec.mode = mode
+    _codec_pinned[(''.join(alphabet), padding)] = codec
+    return codec
+
+# Codec bawaan untuk MODE_ZWSP dan MODE_FULL (MODE_PACKED memakai CODEC_FULL)
+CODEC_ZWSP = _prebuilt(list_ZWSP, get_padding_len(MODE_ZWSP), MODE_ZWSP)
+CODEC_FULL = _prebuilt(list_FULL, get_padding_len(MODE_FULL), MODE_FULL)
+
+# Jumlah kelompok glyph yang diproses sekaligus oleh `_glyphs_to_text`
+_GROUPS_PER_BLOCK = 1 << 16
+
+
+def _tables(mode):
+    """
+    Mengembalikan codec untuk mode yang dipilih.
+
+    Parameters:
+    mode (int | Codec): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED), atau Codec.
+
+    Returns:
+    Codec: Codec untuk mode tersebut.
+    """
+    if isinstance(mode, Codec):
+        return mode
+    # Sama seperti sebelumnya, semua mode selain MODE_ZWSP diperlakukan sebagai MODE_FULL
+    # (MODE_PACKED juga memakai alphabet dan kelompok 7 glyph milik MODE_FULL).
+    return CODEC_ZWSP if mode == MODE_ZWSP else CODEC_FULL
+
+
+def _glyphs_to_text(glyphs, tables):
+    """
+    Mengubah rangkaian glyph zero-width menjadi teks, satu karakter per `padding` glyph.
+
+    Parameters:
+    glyphs (str): Rangkaian glyph yang panjangnya kelipatan `padding`.
+    tables (Codec): Codec yang digunakan.
+
+    Returns:
+    str: Teks hasil dekode.
+    """
+    # Pemotongan kelompok (regex) dan lookup tabel (map) keduanya berjalan di C. Payload besar
+    # diproses per blok agar daftar kelompok sementara tidak ikut membesar.
+    lookup = tables.groups.__getitem__
+    findall = tables.group.findall
+    step = tables.padding * _GROUPS_PER_BLOCK
+    if len(glyphs) <= step:
+        return ''.join(map(lookup, findall(glyphs)))
+    return ''.join([
+        ''.join(map(lookup, findall(glyphs, pos, pos + step)))
+        for pos in range(0, len(glyphs), step)
+    ])
+
+
+def _encode_packed(msg, tables, compression=None):
+    """
+    Menyandikan pesan dengan MODE_PACKED.
+
+    Pesan diubah menjadi byte UTF-8 (opsional dikompresi), setiap 2 byte digabung menjadi satu word
+    16-bit, lalu setiap word disandikan menjadi satu kelompok glyph MODE_FULL (5^7 = 78125 > 65536).
+    Kelompok pertama adalah header (>= PACKED_HEADER) yang menandai jumlah byte ganjil dan codec kompresi.
+
+    Parameters:
+    msg (str): Pesan teks yang akan disandikan.
+    tables (Codec): Codec MODE_FULL.
+    compression (str): Nama codec kompresi (lihat `zwsp.compression`), atau None.
+
+    Returns:
+    str: Pesan yang telah disandikan dalam karakter zero-width.
+    """
+    if not msg:
+        return ''
+    data = msg.encode('utf-8', 'surrogatepass')
+    flags = 0
+    if compression is not None:
+        codec_id, data = compress_payload(data, compression)
+        flags |= codec_id << PACKED_CODEC_SHIFT
+    if len(data) % 2:
+        data += b'\0'
+        flags |= PACKED_FLAG_ODD
+    # Decode UTF-16-BE menghasilkan satu karakter per word 16-bit, sehingga tabel glyph yang sama
+    # dengan MODE_FULL bisa dipakai langsung oleh `str.translate`
+    words = data.decode('utf-16-be', 'surrogatepass')
+    return tables.glyphs[PACKED_HEADER + flags] + words.translate(tables.glyphs)
+
+
+def _packed_flags(value):
+    """
+    Mengambil flag dari nilai kelompok pertama MODE_PACKED.
+
+    Parameters:
+    value (int): Nilai kelompok pertama.
+
+    Returns:
+    int | None: Flag header, atau None jika nilai bukan header yang valid (< PACKED_HEADER atau ID
+    codec kompresi tidak terdaftar).
+    """
+    flags = value - PACKED_HEADER
+    if flags < 0 or not is_codec_id(flags >> PACKED_CODEC_SHIFT):
+        return None
+    return flags
+
+
+def _decode_packed(glyphs, tables):
+    """
+    Mendekodekan payload MODE_PACKED menjadi teks.
+
+    Parameters:
+    glyphs (str): Rangkaian glyph (kelipatan `padding`).
+    tables (Codec): Codec MODE_FULL.
+
+    Returns:
+    str: Pesan tersembunyi.
+
+    Raises:
+    TypeError: Jika header atau data tidak valid.
+    """
+    if not glyphs:
+        return ''
+    words = _glyphs_to_text(glyphs, tables)
+    flags = _packed_flags(ord(words[0]))
+    data = words[1:].encode('utf-16-be', 'surrogatepass')
+    # Header harus valid dan setiap word data harus < 0x10000 (satu unit UTF-16)
+    if flags is None or len(data) != 2 * (len(words) - 1):
+        raise TypeError('Unknown encoding detected!')
+    if flags & PACKED_FLAG_ODD:
+        if not data:
+            raise TypeError('Unknown encoding detected!')
+        data = data[:-1]
+    try:
+        codec_id = flags >> PACKED_CODEC_SHIFT
+        if codec_id:
+            data = decompress_payload(data, codec_id)
+        return data.decode('utf-8', 'surrogatepass')
+    except (UnicodeDecodeError, ValueError):
+        raise TypeError('Unknown encoding detected!') from None
+
+
+class DecodeResult(tuple):
+    """
+    Hasil `decode`: tuple (pesan tersembunyi, pesan pembawa) dengan atribut tambahan `mode`.
+
+    Karena tetap berupa tuple dua elemen, kode lama seperti `hidden, carrier = decode(msg)` tetap berjalan.
+
+    Attributes:
+    hidden (str): Pesan tersembunyi.
+    carrier (str): Pesan pembawa.
+    mode (int): Mode yang dipakai untuk decode (hasil deteksi jika `mode=None`), atau None jika
+        pesan tidak berisi glyph zero-width sama sekali saat deteksi otomatis.
+    """
+
+    def __new__(cls, hidden, carrier, mode):
+        result = super().__new__(cls, (hidden, carrier))
+        result.mode = mode
+        return result
+
+    def __getnewargs__(self):
+        return (self[0], self[1], self.mode)
+
+    @property
+    def hidden(self):
+        return self[0]
+
+    @property
+    def carrier(self):
+        return self[1]
+
+
+def _detect(glyphs):
+    """
+    Menentukan mode dari rangkaian glyph zero-width (semua glyph MODE_FULL di dalam pesan).
+
+    Parameters:
+    glyphs (str): Rangkaian glyph zero-width yang diambil dari pesan dengan alphabet MODE_FULL.
+
+    Returns:
+    tuple: (mode atau None jika tidak ada payload, glyph payload, codec untuk memisahkan pesan pembawa).
+    """
+    if LEFT_TO_RIGHT_MARK in glyphs or RIGHT_TO_LEFT_MARK in glyphs:
+        padding = CODEC_FULL.padding
+        if len(glyphs) % padding == 0:
+            if _packed_flags(ord(CODEC_FULL.groups[glyphs[:padding]])) is not None:
+                return MODE_PACKED, glyphs, CODEC_FULL
+            return MODE_FULL, glyphs, CODEC_FULL
+        # Jumlah glyph tidak cocok dengan alphabet 5 karakter: LRM/RLM dianggap bagian dari pesan
+        # pembawa (misalnya teks bahasa Arab/Ibrani), payload hanya berisi 3 karakter zero-width pertama
+        glyphs = CODEC_ZWSP.non_glyph.sub('', glyphs)
+    if not glyphs:
+        return None, glyphs, CODEC_ZWSP
+    if len(glyphs) % CODEC_ZWSP.padding != 0 and len(glyphs) % CODEC_FULL.padding == 0:
+        return MODE_FULL, glyphs, CODEC_ZWSP
+    return MODE_ZWSP, glyphs, CODEC_ZWSP
+
+
+def detect_mode(glyphs):
+    """
+    Menentukan mode dari rangkaian glyph zero-width (semua glyph MODE_FULL di dalam pesan).
+
+    Parameters:
+    glyphs (str): Rangkaian glyph zero-width yang diambil dari pesan.
+
+    Returns:
+    int: MODE_ZWSP, MODE_FULL atau MODE_PACKED, atau None jika tidak ada glyph.
+
+    Penjelasan Teknis:
+    - Jika ada LEFT_TO_RIGHT_MARK/RIGHT_TO_LEFT_MARK dan jumlah glyph kelipatan 7, pesan memakai
+      alphabet 5 karakter: MODE_PACKED jika kelompok pertama adalah header MODE_PACKED yang valid
+      (>= PACKED_HEADER dengan ID codec kompresi yang terdaftar), selain itu MODE_FULL. `decode`
+      kembali ke MODE_FULL jika payload MODE_PACKED ternyata tidak valid.
+    - Jika jumlah glyph tidak cocok, LRM/RLM dianggap teks pembawa dan hanya 3 karakter zero-width
+      pertama yang dihitung.
+    - Jumlah 3 karakter zero-width pertama menentukan padding (11 atau 7). Jika keduanya cocok
+      (kelipatan 77), MODE_ZWSP dipilih karena merupakan default sender.
+    """
+    return _detect(glyphs)[0]
+
+
+# Hook pengukuran waktu opsional (lihat `set_timing_hook`). Saat None, encode/decode hanya menambah satu
+# pengecekan `is None`.
+_timing_hook = None
+
+
+def set_timing_hook(hook):
+    """
+    Memasang hook yang dipanggil setelah setiap `encode`/`decode` berhasil, misalnya untuk metrik.
+
+    Parameters:
+    hook (Callable[[str, int, float, int, int], None] | None): Fungsi `hook(operasi, mode, detik,
+        panjang_input, panjang_output)` dengan operasi 'encode' atau 'decode' dan mode yang dipakai
+        (hasil deteksi untuk MODE_AUTO). None untuk menonaktifkan.
+
+    Returns:
+    Callable | None: Hook sebelumnya.
+    """
+    global _timing_hook
+    previous, _timing_hook = _timing_hook, hook
+    return previous
+
+
+def get_timing_hook():
+    """
+    Mengembalikan hook yang sedang terpasang (lihat `set_timing_hook`), misalnya untuk melaporkan waktu
+    operasi yang tidak melewati `encode`/`decode` (batch NumPy atau decode di process lain).
+
+    Returns:
+    Callable | None: Hook yang terpasang.
+    """
+    return _timing_hook
+
+
+def encode(msg, mode=MODE_FULL, compression=None):
     """
     Menyandikan pesan teks menjadi karakter zero-width berdasarkan mode yang dipilih.
 
     Parameters:
     msg (str): Pesan teks yang akan disandikan.
-    mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL).
+    mode (int | Codec): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED), atau
+        Codec dengan alphabet sendiri.
+    compression (str): Codec kompresi sebelum encoding ('none', 'zlib', 'lzma', 'zdict' atau 'auto').
+        Hanya didukung oleh MODE_PACKED; `decode` mendeteksi codec secara otomatis dari header.
 
     Returns:
     str: Pesan yang telah disandikan dalam karakter zero-width.
 
     Raises:
     TypeError: Jika pesan yang diberikan bukan string.
+    ValueError: Jika mode tidak ditentukan (MODE_AUTO), atau jika kompresi dipakai selain dengan
+        MODE_PACKED atau codec tidak dikenal.
 
     Penjelasan Teknis:
-    Fungsi ini mengubah setiap karakter dalam pesan teks menjadi representasi angka berdasarkan
-    panjang alfabet yang dipilih, kemudian menggantikan angka tersebut dengan karakter zero-width yang sesuai.
+    Setiap karakter diubah menjadi `padding` digit dalam basis panjang alfabet, lalu setiap digit
+    diganti dengan karakter zero-width yang sesuai. Rangkaian glyph untuk setiap codepoint diambil
+    dari tabel yang dibangun sekali per mode, dan seluruh pesan diproses oleh `str.translate`
+    sehingga waktu eksekusi linear terhadap panjang pesan.
     """
 
+    hook = _timing_hook
+    if hook is None:
+        return _encode(msg, mode, compression)
+    start = time.perf_counter()
+    encoded = _encode(msg, mode, compression)
+    hook('encode', mode, time.perf_counter() - start, len(msg), len(encoded))
+    return encoded
+
+
+def _encode(msg, mode, compression):
     # Bagian ini memeriksa apakah `msg` adalah `string`. Jika bukan, akan mengeluarkan kesalahan `TypeError`
     if not isinstance(msg, str):
         raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
 
-    # Pilih alfabet berdasarkan mode
-    # `alphabet` dipilih berdasarkan `mode`. Jika `mode` adalah `MODE_ZWSP`, maka alphabet adalah `list_ZWSP`, jika tidak, alphabet adalah `list_FULL`.
-    alphabet = list_ZWSP if mode == MODE_ZWSP else list_FULL
-    # Dapatkan panjang padding berdasarkan mode
-    # `padding` ditentukan oleh fungsi `get_padding_len(mode)`, yang mengembalikan panjang padding yang sesuai untuk mode yang dipilih.
-    padding = get_padding_len(mode)
-    # Inisialisasi String yang Disandikan
-    encoded = ''
-
-    # Mengembalikan String Kosong jika Pesan Kosong
-    if (len(msg) == 0):
-        return ''
+    if mode is MODE_AUTO:
+        raise ValueError('Encoding requires an explicit mode')
+    if isinstance(mode, Codec):
+        if compression is not None:
+            raise ValueError('Compression requires MODE_PACKED')
+        return mode.encode(msg)
+    if mode == MODE_PACKED:
+        return _encode_packed(msg, _tables(mode), compression)
+    if compression is not None:
+        raise ValueError('Compression requires MODE_PACKED')
 
-    # Mengkonversi Setiap Karakter dalam Pesan
-    for msg_char in msg:
-        # Ubah karakter menjadi kode berbasis panjang alfabet
-        # `ord(msg_char)` mengubah karakter menjadi nilai ASCII-nya
-
-        # `to_base(ord(msg_char), len(alphabet))` mengubah nilai ASCII menjadi representasi dalam basis yang ditentukan oleh panjang alphabet.
-        # `'{0}{1}'.format('0' * padding, int(str(to_base(ord(msg_char), len(alphabet))))` menambahkan padding nol di depan hasil konversi.
-        code = '{0}{1}'.format(
-            '0' * padding, int(str(to_base(ord(msg_char), len(alphabet)))))
-
-        # Mengambil bagian akhir dari `code` dengan panjang `padding`
-        code = code[len(code) - padding:]
-        # Mengganti Setiap Digit Kode dengan Karakter Zero-Width yang Sesuai
-        for code_char in code:
-            # Mengiterasi setiap karakter dalam `code`, mengonversi karakter tersebut ke indeks `int`.
-            idx = int(code_char)
-            # Menambahkan karakter zero-width yang sesuai dari `alphabet` ke string `encoded`.
-            encoded = encoded+alphabet[idx]
-
-    return encoded
+    # `str.translate` mengganti setiap karakter dengan rangkaian glyph-nya dalam satu kali jalan
+    return msg.translate(_tables(mode).glyphs)
 
 
 def decode(msg, mode=MODE_FULL):
@@ -128,62 +612,69 @@ def decode(msg, mode=MODE_FULL):
 
     Parameters:
     msg (str): Pesan yang telah disandikan.
-    mode (int): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL).
+    mode (int | Codec): Mode operasi (0 untuk MODE_ZWSP, 1 untuk MODE_FULL, 2 untuk MODE_PACKED),
+        None (MODE_AUTO) untuk mendeteksi mode secara otomatis, atau Codec dengan alphabet sendiri.
 
     Returns:
-    tuple: Teks asli yang telah didesandikan dan karakter non-zero-width asli.
+    DecodeResult: Tuple berisi teks asli yang telah didesandikan dan karakter non-zero-width asli,
+    dengan atribut `mode` berisi mode yang dipakai.
 
     Raises:
     TypeError: Jika pesan yang diberikan bukan string atau jika encoding tidak diketahui terdeteksi.
 
     Penjelasan Teknis:
-    Fungsi ini mengidentifikasi karakter zero-width dalam pesan yang diberikan dan mengubahnya kembali
-    menjadi representasi angka, yang kemudian diubah menjadi karakter teks asli.
+    Pesan dipisah menjadi pesan pembawa (semua karakter non-zero-width) dan payload (semua glyph
+    zero-width) menggunakan regex. Payload dipotong per `padding` glyph, lalu setiap kelompok
+    dikonversi kembali menjadi satu karakter melalui tabel yang dibangun sekali per mode. Hasil
+    digabung sekali di akhir sehingga waktu eksekusi linear terhadap panjang pesan.
     """
 
+    hook = _timing_hook
+    if hook is None:
+        return _decode(msg, mode)
+    start = time.perf_counter()
+    result = _decode(msg, mode)
+    hook('decode', result.mode, time.perf_counter() - start, len(msg), len(result.hidden))
+    return result
+
+
+def _decode(msg, mode):
     # Bagian ini memeriksa apakah `msg` adalah `string`. Jika bukan, akan mengeluarkan kesalahan `TypeError`
     if not isinstance(msg, str):
         raise TypeError('Cannot encode {0}'.format(type(msg).__name__))
 
-    # Pilih alfabet berdasarkan mode
-    # `alphabet` dipilih berdasarkan `mode`. Jika `mode` adalah `MODE_ZWSP`, maka `alphabet` adalah `list_ZWSP`, jika tidak, `alphabet` adalah `list_FULL`.
-    alphabet = list_ZWSP if mode == MODE_ZWSP else list_FULL
-    # Dapatkan panjang padding berdasarkan mode
-    # `padding` ditentukan oleh fungsi` get_padding_len(mode)`, yang mengembalikan panjang `padding` yang sesuai untuk mode yang dipilih.
-    padding = get_padding_len(mode)
-
-    # Inisialisasi String yang Disandikan dan Teks yang Didekode
-
-    encoded = ''
-    decoded = ''
-    original = ''
-
-    # Bagian ini memeriksa setiap karakter dalam pesan msg dan memisahkan karakter zero-width dan karakter asli
-    for msg_char in msg:
-        # Jika karakter tersebut ada di `alphabet`, ia menambahkan indeks karakter tersebut ke `encoded`.
-        if msg_char in alphabet:
-            encoded = encoded + str(alphabet.index(msg_char))
-        # Jika tidak, ia menambahkan karakter tersebut ke `original`.
-        else:
-            original = original+msg_char
+    if isinstance(mode, Codec):
+        return mode.decode(msg)
+    if mode is MODE_AUTO:
+        # Glyph diambil dengan alphabet terlengkap (MODE_FULL); `_detect` menentukan mode, payload, dan
+        # alphabet pemisah pesan pembawa (LRM/RLM tetap di pesan pembawa jika payload memakai 3 karakter)
+        mode, encoded, split_tables = _detect(CODEC_FULL.non_glyph.sub('', msg))
+        if mode == MODE_PACKED:
+            try:
+                return DecodeResult(_decode_packed(encoded, CODEC_FULL), CODEC_FULL.glyph_run.sub('', msg), MODE_PACKED)
+            except TypeError:
+                # Header yang tampak valid tetapi payload rusak: kemungkinan MODE_FULL (karakter >= U+10000)
+                mode = MODE_FULL
+        tables = _tables(MODE_ZWSP if mode is None else mode)
+    else:
+        split_tables = tables = _tables(mode)
+        # Payload didapat dengan membuang semua karakter selain glyph zero-width
+        encoded = tables.non_glyph.sub('', msg)
+    padding = tables.padding
+
+    # Karakter asli didapat dengan membuang semua glyph zero-width dari pesan
+    original = split_tables.glyph_run.sub('', msg)
 
     # Bagian ini memeriksa apakah panjang `encoded` adalah kelipatan dari `padding`.
     # Jika tidak, ia mengeluarkan kesalahan `TypeError` karena mendeteksi encoding yang tidak diketahui
     if (len(encoded) % padding != 0):
         raise TypeError('Unknown encoding detected!')
 
-    # Decode setiap karakter yang disandikan
-    # Fungsi ini menginisialisasi `cur_encoded_char` sebagai string kosong.
-    cur_encoded_char = ''
-    for idx, encoded_char in enumerate(encoded):
-        # Untuk setiap karakter dalam `encoded`, ia menambahkannya ke `cur_encoded_char`.
-        cur_encoded_char = cur_encoded_char + encoded_char
-
-        # Jika indeks saat ini + 1 adalah kelipatan dari `padding`, ia mengonversi `cur_encoded_char` ke nilai ASCII menggunakan` int(cur_encoded_char, len(alphabet))`, kemudian mengonversi nilai ASCII tersebut ke karakter menggunakan `chr()`.
-        if idx > 0 and (idx + 1) % padding == 0:
-            # Karakter yang didekode ditambahkan ke `decoded`.
-            decoded = decoded + chr(int(cur_encoded_char, len(alphabet)))
-            cur_encoded_char = ''
+    # Setiap kelompok `padding` glyph dikonversi menjadi satu karakter, lalu digabung sekali di akhir
+    if mode == MODE_PACKED:
+        decoded = _decode_packed(encoded, tables)
+    else:
+        decoded = _glyphs_to_text(encoded, tables)
 
     # Fungsi ini mengembalikan tuple yang terdiri dari pesan yang telah didekode (`decoded`) dan karakter asli (`original`).
-    return (decoded, original)
+    return DecodeResult(decoded, original, mode)